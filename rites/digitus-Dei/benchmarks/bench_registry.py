@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Time registry operations across registry sizes.
+
+Usage: bench_registry.py [--sizes=10,1000,100000] [--backend=json|sqlite|sharded]
+                         [--output=results.json] [--baseline=old.json] [--threshold=0.25]
+
+For every operation and size this reports p50/p99 latency, peak Python memory
+(tracemalloc) and bytes written (Linux ``/proc/self/io``), as JSON on stdout or in
+``--output``. With ``--baseline``, any p50 slower than the baseline by more than
+``--threshold`` (and by at least ``MIN_REGRESSION_MS``) is listed and the exit
+status is 1. Add 1000000 to ``--sizes`` for the 1M run; it needs several GB of RAM.
+"""
+
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from registry import RegistryManager, Status
+from selector import weighted_random_select
+from synthetic import populate
+
+DEFAULT_SIZES = (10, 1_000, 100_000)
+# Samples per operation shrink with size so a 100k run stays in minutes
+SAMPLE_BUDGET = 200_000
+MIN_REGRESSION_MS = 0.05
+WORKER = "bench-worker"
+
+
+@dataclass
+class Operation:
+    """``run`` is timed; ``setup`` runs untimed before each sample."""
+
+    name: str
+    run: Callable[[], object]
+    setup: Callable[[], None] = lambda: None
+
+
+def operations(manager: RegistryManager, rng: random.Random) -> list[Operation]:
+    ids = [p["id"] for p in manager.storage.query()]
+    state: dict[str, Any] = {}
+
+    def load_registry() -> None:
+        state["registry"] = manager._load()
+
+    def list_refs() -> None:
+        state["refs"] = manager.list_refs([Status.IDEA], unlocked_only=True)
+
+    def lock_some() -> None:
+        with manager.transaction() as txn:
+            for project_id in rng.sample(ids, min(10, len(ids))):
+                txn.lock(project_id, WORKER)
+
+    return [
+        Operation("load", manager._load),
+        Operation("save", lambda: manager._save(state["registry"]), load_registry),
+        Operation("get", lambda: manager.get(rng.choice(ids))),
+        Operation("update", lambda: manager.update(rng.choice(ids), title="Renamed")),
+        Operation("list", lambda: manager.list([Status.IDEA], unlocked_only=True)),
+        Operation("unlock_all_by_worker", lambda: manager.unlock_all_by_worker(WORKER), lock_some),
+        Operation(
+            "weighted_random_select", lambda: weighted_random_select(state["refs"]), list_refs
+        ),
+    ]
+
+
+def bytes_written() -> int | None:
+    """Bytes this process has passed to write() so far, where the OS reports it."""
+    try:
+        for line in Path("/proc/self/io").read_text().splitlines():
+            if line.startswith("wchar:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def measure(operation: Operation, samples: int) -> dict[str, Any]:
+    timings = []
+    for _ in range(samples):
+        operation.setup()
+        start = time.perf_counter()
+        operation.run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Memory and I/O come from one extra run, so tracing never skews the timings
+    operation.setup()
+    written = bytes_written()
+    tracemalloc.start()
+    operation.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    after = bytes_written()
+
+    timings.sort()
+    return {
+        "samples": samples,
+        "p50_ms": round(statistics.median(timings), 4),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 4),
+        "peak_kib": round(peak / 1024, 1),
+        "bytes_written": None if written is None or after is None else after - written,
+    }
+
+
+def run(sizes: list[int], backend: str = "json", seed: int = 0) -> dict[str, Any]:
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as d:
+            populate(Path(d), size, backend, seed)
+            manager = RegistryManager(d)
+            samples = max(3, min(100, SAMPLE_BUDGET // size))
+            for operation in operations(manager, random.Random(seed)):
+                result = {"op": operation.name, "size": size, **measure(operation, samples)}
+                print(
+                    f"{operation.name:>24} {size:>9}  p50 {result['p50_ms']:>10.3f} ms"
+                    f"  p99 {result['p99_ms']:>10.3f} ms  peak {result['peak_kib']:>10.1f} KiB",
+                    file=sys.stderr,
+                )
+                results.append(result)
+            manager.storage.close()
+    return {
+        "meta": {
+            "backend": backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def regressions(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Describe every (op, size) whose p50 regressed past ``threshold`` vs ``baseline``."""
+    before = {(r["op"], r["size"]): r for r in baseline["results"]}
+    found = []
+    for result in current["results"]:
+        old = before.get((result["op"], result["size"]))
+        if old is None:
+            continue
+        slower = result["p50_ms"] - old["p50_ms"]
+        if slower > MIN_REGRESSION_MS and result["p50_ms"] > old["p50_ms"] * (1 + threshold):
+            found.append(
+                f"{result['op']} @ {result['size']}: p50 {old['p50_ms']} -> {result['p50_ms']} ms"
+            )
+    return found
+
+
+def main(argv: list[str]) -> int:
+    options = dict(a.split("=", 1) for a in argv if a.startswith("--") and "=" in a)
+    sizes = [int(s) for s in options.get("--sizes", ",".join(map(str, DEFAULT_SIZES))).split(",")]
+    report = run(sizes, options.get("--backend", "json"))
+    text = json.dumps(report, indent=2)
+    if "--output" in options:
+        Path(options["--output"]).write_text(text + "\n")
+    else:
+        print(text)
+    if "--baseline" in options:
+        baseline = json.loads(Path(options["--baseline"]).read_text())
+        found = regressions(report, baseline, float(options.get("--threshold", "0.25")))
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Hammer one registry from many processes and count what goes wrong.
+
+Usage: stress_registry.py [--workers=8] [--duration=10] [--projects=4]
+                          [--backend=json|sqlite|sharded] [--atomic] [--journal]
+                          [--durability=none|file|file+dir] [--group-commit-ms=0]
+
+Each worker repeats the cycle a session's command steps perform: wait until a
+random project is free, ``lock`` it, ``get`` it, ``update`` its tech stack with
+a new token derived from what it read, then ``unlock``. Every acknowledged
+update is recorded; tokens missing from the final registry are lost updates.
+``--atomic`` does the read-modify-write inside one optimistic mutation instead,
+which should lose nothing. ``--durability`` and ``--group-commit-ms`` set the
+fsync policy, which mostly costs throughput; with ``--journal`` the JSON backend
+appends to its journal, so concurrent commits can share fsyncs.
+
+The JSON report has ops/s, the lock-wait distribution (time from wanting a
+project to holding its lock), commit retries, errors and lost updates.
+"""
+
+import json
+import multiprocessing
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from registry import RegistryManager
+from synthetic import populate
+
+# How long a worker sleeps between polls while another worker holds the lock
+POLL_INTERVAL = 0.001
+
+
+def worker(
+    registry_dir: str,
+    worker_id: str,
+    duration: float,
+    atomic: bool,
+    seed: int,
+    durability: str = "none",
+    group_commit_ms: float = 0.0,
+) -> dict[str, Any]:
+    """Run lock/get/update/unlock cycles until ``duration`` seconds have passed."""
+    rng = random.Random(seed)
+    manager = RegistryManager(
+        registry_dir, max_retries=1000, durability=durability, group_commit_ms=group_commit_ms
+    )
+    ids = [p["id"] for p in manager.storage.query()]
+    waits: list[float] = []
+    acked: list[tuple[str, str]] = []
+    ops = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        project_id = rng.choice(ids)
+        token = f"{worker_id}-{len(acked)}"
+        try:
+            start = time.perf_counter()
+            free = False
+            while not free and time.monotonic() < deadline:
+                current = manager.get(project_id)
+                ops += 1
+                free = current is None or current.locked_by in (None, worker_id)
+                if not free:
+                    time.sleep(POLL_INTERVAL)
+            if not free:
+                break
+            manager.lock(project_id, worker_id)
+            waits.append(time.perf_counter() - start)
+            try:
+                if atomic:
+                    manager._mutate(
+                        lambda txn, pid=project_id, token=token: txn.update(
+                            pid, tech_stack=[*txn.get(pid).tech_stack, token]
+                        )
+                    )
+                    ops += 2
+                else:
+                    project = manager.get(project_id)
+                    assert project is not None
+                    manager.update(project_id, tech_stack=[*project.tech_stack, token])
+                    ops += 3
+                acked.append((project_id, token))
+            finally:
+                # A failed update must not leave the project locked for the rest of the run
+                manager.unlock(project_id)
+                ops += 1
+        except Exception:
+            errors += 1
+    retries = manager.retries
+    return {"ops": ops, "waits": waits, "acked": acked, "retries": retries, "errors": errors}
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def summarize(
+    results: list[dict[str, Any]], final: dict[str, list[str]], duration: float
+) -> dict[str, Any]:
+    """Combine per-worker results with the final tech stacks into one report."""
+    waits = [w * 1000 for r in results for w in r["waits"]]
+    acked = [pair for r in results for pair in r["acked"]]
+    lost = [(pid, token) for pid, token in acked if token not in final.get(pid, [])]
+    ops = sum(r["ops"] for r in results)
+    return {
+        "workers": len(results),
+        "duration_s": duration,
+        "ops": ops,
+        "ops_per_s": round(ops / duration, 1),
+        "lock_wait_ms": {
+            "p50": round(statistics.median(waits), 3) if waits else 0.0,
+            "p90": round(percentile(waits, 0.9), 3),
+            "p99": round(percentile(waits, 0.99), 3),
+            "max": round(max(waits, default=0.0), 3),
+        },
+        "retries": sum(r["retries"] for r in results),
+        "errors": sum(r["errors"] for r in results),
+        "updates": len(acked),
+        "lost_updates": len(lost),
+    }
+
+
+def stress(
+    workers: int = 8,
+    duration: float = 10.0,
+    projects: int = 4,
+    backend: str = "json",
+    atomic: bool = False,
+    journal: bool = False,
+    durability: str = "none",
+    group_commit_ms: float = 0.0,
+) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as d:
+        populate(Path(d), projects, backend)
+        manager = RegistryManager(d, durability="none", group_commit_ms=0)
+        if journal:
+            manager.enable_journal()
+        for p in manager.list():
+            manager.update(p.id, tech_stack=[], locked_by=None, locked_at=None)
+        ctx = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+        with ctx.Pool(workers) as pool:
+            results = pool.starmap(
+                worker,
+                [
+                    (d, f"w{n}", duration, atomic, n, durability, group_commit_ms)
+                    for n in range(workers)
+                ],
+            )
+        final = {p.id: p.tech_stack for p in manager.list()}
+        manager.storage.close()
+    report = summarize(results, final, duration)
+    report.update(
+        projects=projects,
+        backend=backend,
+        atomic=atomic,
+        journal=journal,
+        durability=durability,
+        group_commit_ms=group_commit_ms,
+    )
+    return report
+
+
+def main(argv: list[str]) -> int:
+    options = dict(a.split("=", 1) for a in argv if a.startswith("--") and "=" in a)
+    report = stress(
+        workers=int(options.get("--workers", "8")),
+        duration=float(options.get("--duration", "10")),
+        projects=int(options.get("--projects", "4")),
+        backend=options.get("--backend", "json"),
+        atomic="--atomic" in argv,
+        journal="--journal" in argv,
+        durability=options.get("--durability", "none"),
+        group_commit_ms=float(options.get("--group-commit-ms", "0")),
+    )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
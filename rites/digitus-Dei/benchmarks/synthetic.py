@@ -0,0 +1,87 @@
+"""Synthetic registries for benchmarks: realistic spec lengths, status mix and stacks."""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from registry import Priority, Project, Registry, RegistryManager, Status
+
+# Observed shape of real registries: most projects are still ideas
+STATUS_MIX = {
+    Status.IDEA: 50,
+    Status.IN_PROGRESS: 10,
+    Status.PAUSED: 10,
+    Status.BLOCKED: 5,
+    Status.COMPLETED: 20,
+    Status.ABANDONED: 5,
+}
+TECH_STACKS = [
+    ["Python"],
+    ["Python", "FastAPI", "PostgreSQL"],
+    ["Python", "Django"],
+    ["TypeScript", "React"],
+    ["TypeScript", "Node.js", "Express"],
+    ["Go"],
+    ["Rust"],
+    ["Rust", "WebAssembly"],
+    ["Swift", "SwiftUI"],
+    ["Kotlin", "Android"],
+    ["Python", "PyTorch"],
+    ["Bash"],
+]
+VOCABULARY = (
+    "build a small tool that tracks parses renders syncs the user data with tests api cli "
+    "service queue cache config report export import schedule notify store index search "
+    "dashboard plugin worker batch stream retry auth login profile billing metrics log"
+)
+WORDS = VOCABULARY.split()
+# Distinct spec texts; real specs are unique, but a pool keeps 1M-project runs in memory
+SPEC_POOL = 1024
+
+
+def _text(rng: random.Random, length: int) -> str:
+    words: list[str] = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def synthetic_projects(size: int, seed: int = 0) -> list[Project]:
+    """``size`` projects; spec lengths are log-normal around 1.2k characters."""
+    rng = random.Random(seed)
+    specs = [
+        _text(rng, min(8000, max(200, int(rng.lognormvariate(7.1, 0.6)))))
+        for _ in range(min(size, SPEC_POOL))
+    ]
+    statuses = list(STATUS_MIX)
+    weights = list(STATUS_MIX.values())
+    projects = []
+    for i in range(size):
+        status = rng.choices(statuses, weights)[0]
+        project = Project(
+            id=f"{i:08x}",
+            title=f"Project {i}",
+            brief=_text(rng, rng.randint(60, 300)),
+            spec=specs[i % len(specs)],
+            status=status,
+            priority=Priority(urgency=rng.randint(1, 4), difficulty=rng.randint(1, 4)),
+            tech_stack=rng.choice(TECH_STACKS),
+            created_at=f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T00:00:00Z",
+        )
+        if status == Status.IN_PROGRESS and rng.random() < 0.5:
+            project.locked_by = f"session-{rng.randint(1, 8)}"
+        projects.append(project)
+    return projects
+
+
+def populate(registry_dir: Path, size: int, backend: str = "json", seed: int = 0) -> None:
+    """Write a synthetic registry of ``size`` projects to ``registry_dir``."""
+    manager = RegistryManager(registry_dir)
+    manager._save(Registry(projects=synthetic_projects(size, seed)))
+    if backend != "json":
+        manager.migrate(backend)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""NDJSON batch mode shared by the registry and project_utils CLIs.
+
+Each input line is one command, e.g. ``{"tool": "registry", "argv": ["lock", "<id>",
+"w"]}``, with an optional ``stdin`` (a non-string value is sent as JSON). ``tool``
+defaults to the CLI that was run. ``{{N}}`` in ``argv`` or ``stdin`` is replaced by
+the output of the Nth command, and ``{{N.key}}`` by one field of its JSON output, so
+a step can use an earlier step's result.
+
+Each command gets one result line, ``{"code": N, "result": ..., "error": "..."}``.
+``result`` is the command's output, parsed when it is JSON. ``error`` is only
+present when the command wrote to stderr.
+"""
+
+import json
+import re
+from collections.abc import Iterable
+from typing import Any, TextIO
+
+from daemon import Handler, run_captured
+
+REFERENCE = re.compile(r"\{\{(\d+)((?:\.\w+)*)\}\}")
+
+
+def _substitute(text: str, outputs: list[str | None]) -> str:
+    def output(match: re.Match[str]) -> str:
+        n = int(match.group(1))
+        if not 1 <= n <= len(outputs):
+            raise ValueError(f"{match.group(0)} does not refer to an earlier command")
+        value = outputs[n - 1]
+        if value is None:
+            raise ValueError(f"command {n} failed")
+        if not match.group(2):
+            return value
+        field: Any = _parse(value)
+        for key in match.group(2)[1:].split("."):
+            if not isinstance(field, dict) or key not in field:
+                raise ValueError(f"{match.group(0)}: no such field")
+            field = field[key]
+        return field if isinstance(field, str) else json.dumps(field)
+
+    return REFERENCE.sub(output, text)
+
+
+def _parse(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def run_batch(lines: Iterable[str], handlers: dict[str, Handler], default: str, out: TextIO) -> int:
+    """Run one command per line, writing one result line each; return the failure count."""
+    outputs: list[str | None] = []
+    failed = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            tool = request.get("tool", default)
+            if tool not in handlers:
+                raise ValueError(f"unknown tool {tool!r}")
+            argv = [_substitute(str(arg), outputs) for arg in request["argv"]]
+            stdin = request.get("stdin", "")
+            stdin = _substitute(stdin if isinstance(stdin, str) else json.dumps(stdin), outputs)
+            response = run_captured(handlers[tool], [f"{tool}.py", *argv], stdin)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            response = {"code": 1, "stdout": "", "stderr": f"Bad batch command: {e}\n"}
+
+        text = response["stdout"].strip()
+        outputs.append(None if response["code"] else text)
+        result = {"code": response["code"], "result": _parse(text)}
+        if response["stderr"]:
+            result["error"] = response["stderr"].strip()
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        failed += bool(response["code"])
+    return failed
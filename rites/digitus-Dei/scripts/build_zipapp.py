@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Bundle the plugin scripts into one executable zipapp.
+
+Usage: build_zipapp.py [output.pyz]   (default: dist/digitus-dei.pyz)
+
+Run the result as ``python3 digitus-dei.pyz <tool> [args]``. Each module ships with
+unchecked-hash bytecode next to its source, so a cold start neither compiles nor
+stats sources.
+"""
+
+import py_compile
+import sys
+import tempfile
+import zipapp
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+TOOLS = ("registry", "selector", "project_utils", "lock_project", "unlock_project")
+# Development-only scripts left out of the bundle
+EXCLUDED = ("build_zipapp.py", "test_plugin.py")
+
+MAIN = f'''"""Entry point: python3 digitus-dei.pyz <tool> [args]."""
+
+import sys
+
+TOOLS = {TOOLS!r}
+
+if len(sys.argv) < 2 or sys.argv[1] not in TOOLS:
+    print(f"Usage: {{sys.argv[0]}} <{{'|'.join(TOOLS)}}> [args]")
+    sys.exit(1)
+tool = sys.argv.pop(1)
+sys.argv[0] = tool + ".py"
+__import__(tool).main()
+'''
+
+
+def build(output: Path, source: Path = SCRIPTS_DIR) -> Path:
+    """Write the zipapp to ``output`` and return its path."""
+    with tempfile.TemporaryDirectory() as staging:
+        root = Path(staging)
+        (root / "__main__.py").write_text(MAIN)
+        for module in sorted(source.glob("*.py")):
+            if module.name not in EXCLUDED:
+                (root / module.name).write_bytes(module.read_bytes())
+        for module in list(root.glob("*.py")):
+            # zipimport looks for name.pyc beside name.py, not in __pycache__
+            py_compile.compile(
+                str(module),
+                cfile=str(module.with_suffix(".pyc")),
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        zipapp.create_archive(root, output, interpreter="/usr/bin/env python3")
+    return output
+
+
+def main() -> None:
+    default = SCRIPTS_DIR.parent / "dist" / "digitus-dei.pyz"
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else default
+    print(build(output))
+
+
+if __name__ == "__main__":
+    main()
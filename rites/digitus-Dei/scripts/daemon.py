@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Unix-socket daemon that runs registry commands against an in-memory registry.
+
+Each connection carries one request line, ``{"argv": [...], "stdin": "..."}``, and
+gets one response line, ``{"code": N, "stdout": "...", "stderr": "..."}``. Requests
+are served one at a time, so command handlers see the same single-writer world as
+the CLI. Clients fall back to direct file access whenever no daemon answers.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+from collections.abc import Callable
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+# Runs one command line, reading sys.stdin and writing sys.stdout/sys.stderr
+Handler = Callable[[list[str]], None]
+
+# Seconds the daemon waits for a request line; requests are served one at a time,
+# so a client that connects and stays silent must not hold up everyone else
+REQUEST_TIMEOUT = 5.0
+# Seconds a client waits for the daemon to reply before running the command itself
+RESPONSE_TIMEOUT = 30.0
+
+
+def run_captured(handler: Handler, argv: list[str], stdin: str) -> dict[str, Any]:
+    """Run ``handler`` with stdin/stdout/stderr swapped for strings; never raises."""
+    out, err = io.StringIO(), io.StringIO()
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin)
+    code = 0
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                handler(argv)
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+    finally:
+        sys.stdin = saved_stdin
+    return {"code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "RegistryServer"
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self) -> None:
+        try:
+            line = self.rfile.readline()
+        except OSError:  # timed out
+            return
+        try:
+            request = json.loads(line)
+            response = run_captured(self.server.handler, request["argv"], request["stdin"])
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"code": 1, "stdout": "", "stderr": f"Bad daemon request: {e}\n"}
+        with contextlib.suppress(OSError):  # the client gave up
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class RegistryServer(socketserver.UnixStreamServer):
+    def __init__(self, path: Path, handler: Handler) -> None:
+        self.handler = handler
+        super().__init__(str(path), _RequestHandler)
+
+
+def is_running(path: Path) -> bool:
+    """Whether something is accepting connections on ``path``."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(
+    path: Path, handler: Handler, ready: Callable[[RegistryServer], None] | None = None
+) -> None:
+    """Serve requests on ``path`` until SIGTERM/SIGINT, then remove the socket.
+
+    A socket file left behind by a daemon that died is replaced.
+    """
+    if is_running(path):
+        raise RuntimeError(f"A registry daemon is already listening on {path}")
+    path.unlink(missing_ok=True)
+    with RegistryServer(path, handler) as server:
+        os.chmod(path, 0o600)
+
+        def stop(signum: int, frame: FrameType | None) -> None:
+            raise KeyboardInterrupt
+
+        with contextlib.suppress(ValueError):  # signals only work in the main thread
+            signal.signal(signal.SIGTERM, stop)
+        try:
+            if ready:
+                ready(server)
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+
+
+def call(
+    path: Path, argv: list[str], stdin: str = "", timeout: float = RESPONSE_TIMEOUT
+) -> dict[str, Any] | None:
+    """Send one command to the daemon on ``path``.
+
+    Returns None if no daemon is listening, or if it closes the connection, replies
+    with garbage or takes longer than ``timeout`` seconds, so the caller runs the
+    command itself.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+            sock.sendall(json.dumps({"argv": argv, "stdin": stdin}).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+    return response if isinstance(response, dict) else None
@@ -8,7 +8,9 @@ import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
-from registry import Project, get_projects_dir
+from registry import Project, RegistryManager, get_projects_dir, get_registry_dir
+from registry import run_command as registry_command
+from tracing import span
 
 
 def slugify(title: str) -> str:
@@ -192,15 +194,15 @@ def get_blocker_content(project_dir: Path) -> str | None:
     return None
 
 
+def _run(args: list[str], project_dir: Path) -> "subprocess.CompletedProcess[str]":
+    with span("subprocess", cmd=" ".join(args[:2])):
+        return subprocess.run(args, cwd=project_dir, check=True, capture_output=True, text=True)
+
+
 def init_git_repo(project_dir: Path) -> bool:
     """Initialize git repository."""
     try:
-        subprocess.run(
-            ["git", "init"],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-        )
+        _run(["git", "init"], project_dir)
 
         gitignore = """# Python
 __pycache__/
@@ -223,18 +225,8 @@ Thumbs.db
 """
         (project_dir / ".gitignore").write_text(gitignore)
 
-        subprocess.run(
-            ["git", "add", "."],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "commit", "-m", "Initial commit - project scaffolding"],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-        )
+        _run(["git", "add", "."], project_dir)
+        _run(["git", "commit", "-m", "Initial commit - project scaffolding"], project_dir)
         return True
     except subprocess.CalledProcessError:
         return False
@@ -244,24 +236,14 @@ def create_github_repo(project_dir: Path) -> str | None:
     """Create private GitHub repository and push."""
     try:
         slug = project_dir.name
-        result = subprocess.run(
-            ["gh", "repo", "create", slug, "--private", "--source=.", "--push"],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            text=True,
+        result = _run(
+            ["gh", "repo", "create", slug, "--private", "--source=.", "--push"], project_dir
         )
         for line in result.stdout.split("\n") + result.stderr.split("\n"):
             if "github.com" in line:
                 return line.strip()
 
-        result = subprocess.run(
-            ["gh", "repo", "view", "--json", "url", "-q", ".url"],
-            cwd=project_dir,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
+        result = _run(["gh", "repo", "view", "--json", "url", "-q", ".url"], project_dir)
         return result.stdout.strip()
     except subprocess.CalledProcessError:
         return None
@@ -289,13 +271,35 @@ def get_project_dir(project: Project, projects_dir: Path) -> Path:
 def main() -> None:
     if len(sys.argv) < 2:
         print("Usage: project_utils.py <command> [args]")
-        print("Commands: init, blocker, wrap-up, get-wrap-up, get-blocker")
+        print("Commands: init, blocker, wrap-up, get-wrap-up, get-blocker, --batch")
         sys.exit(1)
 
-    cmd = sys.argv[1]
+    if sys.argv[1] == "--batch":
+        from batch import run_batch
+        from daemon import Handler
+
+        registry_dir = get_registry_dir()
+        manager = RegistryManager(registry_dir, cache=True)
+        handlers: dict[str, Handler] = {
+            "project_utils": lambda argv: run_command(argv, registry_dir.parent),
+            "registry": lambda argv: registry_command(manager, argv),
+        }
+        sys.exit(1 if run_batch(sys.stdin, handlers, "project_utils", sys.stdout) else 0)
+
+    run_command(sys.argv)
+
+
+def run_command(argv: list[str], projects_dir: Path | None = None) -> None:
+    """Run one ``project_utils.py`` command line; ``init`` defaults to the configured dir."""
+    with span("command", tool="project_utils", cmd=argv[1]):
+        _run_command(argv, projects_dir)
+
+
+def _run_command(argv: list[str], projects_dir: Path | None) -> None:
+    cmd = argv[1]
 
     if cmd == "init":
-        projects_dir = get_projects_dir()
+        projects_dir = projects_dir or get_projects_dir()
         project_data = json.loads(sys.stdin.read())
         project = Project.from_dict(project_data)
         project_dir = init_project_dir(project, projects_dir)
@@ -303,10 +307,10 @@ def main() -> None:
         print(str(project_dir))
 
     elif cmd == "github":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: project_utils.py github <project_dir>")
             sys.exit(1)
-        project_dir = Path(sys.argv[2])
+        project_dir = Path(argv[2])
         url = create_github_repo(project_dir)
         if url:
             print(url)
@@ -314,38 +318,38 @@ def main() -> None:
             sys.exit(1)
 
     elif cmd == "blocker":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: project_utils.py blocker <project_dir> < reason")
             sys.exit(1)
-        project_dir = Path(sys.argv[2])
+        project_dir = Path(argv[2])
         reason = sys.stdin.read()
         path = create_blocker(project_dir, reason)
         print(str(path))
 
     elif cmd == "remove-blocker":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: project_utils.py remove-blocker <project_dir>")
             sys.exit(1)
-        project_dir = Path(sys.argv[2])
+        project_dir = Path(argv[2])
         if remove_blocker(project_dir):
             print("Removed")
         else:
             print("No blocker found")
 
     elif cmd == "wrap-up":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: project_utils.py wrap-up <project_dir> < summary")
             sys.exit(1)
-        project_dir = Path(sys.argv[2])
+        project_dir = Path(argv[2])
         summary = sys.stdin.read()
         path = create_wrap_up(project_dir, summary)
         print(str(path))
 
     elif cmd == "get-wrap-up":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: project_utils.py get-wrap-up <project_dir>")
             sys.exit(1)
-        project_dir = Path(sys.argv[2])
+        project_dir = Path(argv[2])
         content = get_latest_wrap_up(project_dir)
         if content:
             print(content)
@@ -353,10 +357,10 @@ def main() -> None:
             sys.exit(1)
 
     elif cmd == "get-blocker":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: project_utils.py get-blocker <project_dir>")
             sys.exit(1)
-        project_dir = Path(sys.argv[2])
+        project_dir = Path(argv[2])
         content = get_blocker_content(project_dir)
         if content:
             print(content)
@@ -364,10 +368,10 @@ def main() -> None:
             sys.exit(1)
 
     elif cmd == "slugify":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: project_utils.py slugify <title>")
             sys.exit(1)
-        print(slugify(sys.argv[2]))
+        print(slugify(argv[2]))
 
     else:
         print(f"Unknown command: {cmd}", file=sys.stderr)
@@ -1,17 +1,48 @@
 #!/usr/bin/env python3
 """Registry operations for digitus-Dei project management."""
 
-import fcntl
+import io
 import json
-import os
 import sys
-import tempfile
-import uuid
-from dataclasses import asdict, dataclass, field
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, ClassVar, TypeVar, cast
+
+from storage import (
+    STORAGE_BACKENDS,
+    BlobStore,
+    GenerationConflict,
+    JsonFileStorage,
+    ProjectIndex,
+    RegistryStorage,
+    ShardedStorage,
+    lease_held,
+    open_storage,
+    utc_timestamp,
+)
+from tracing import span
+
+T = TypeVar("T")
+
+# Long prose fields stored out of line in the BlobStore
+TEXT_FIELDS = ("spec", "brief")
+
+# Lease on a lock unless the config sets ``lease_ttl`` (seconds); heartbeats extend it
+DEFAULT_LEASE_TTL = 4 * 3600
+
+# Unix socket that ``registry.py serve`` listens on, inside the registry directory
+DAEMON_SOCKET = ".digitus-registry.sock"
+
+# Persisted selection indexes (see selector.SelectionCache), inside the registry directory
+SELECTION_DIR = ".digitus-selection"
+
+# Modules only some commands need (uuid, random, tempfile, shutil, the daemon and
+# batch runners) are imported where used, keeping ``get``/``list`` quick to start.
 
 
 class Status(str, Enum):
@@ -23,24 +54,71 @@ class Status(str, Enum):
     COMPLETED = "completed"
 
 
-@dataclass
 class Priority:
-    urgency: int = 2
-    difficulty: int = 2
+    """Eisenhower urgency and difficulty (1-4 each), packed into one small int.
 
-    def __post_init__(self) -> None:
-        if not 1 <= self.urgency <= 4:
-            raise ValueError(f"urgency must be 1-4, got {self.urgency}")
-        if not 1 <= self.difficulty <= 4:
-            raise ValueError(f"difficulty must be 1-4, got {self.difficulty}")
+    Instances are immutable and interned: all projects with the same priority
+    share one of the 16 possible objects.
+    """
+
+    __slots__ = ("_packed",)
+    _packed: int
+    _interned: ClassVar[dict[tuple[int, int], "Priority"]] = {}
+
+    def __new__(cls, urgency: int = 2, difficulty: int = 2) -> "Priority":
+        # Older registries may hold integral floats such as 2.0
+        urgency, difficulty = cls._level("urgency", urgency), cls._level("difficulty", difficulty)
+        interned = cls._interned.get((urgency, difficulty))
+        if interned is not None:
+            return interned
+        self = super().__new__(cls)
+        self._packed = (urgency - 1) << 2 | (difficulty - 1)
+        cls._interned[(urgency, difficulty)] = self
+        return self
+
+    @staticmethod
+    def _level(name: str, value: int) -> int:
+        level = int(value)
+        if level != value or not 1 <= level <= 4:
+            raise ValueError(f"{name} must be 1-4, got {value}")
+        return level
+
+    @property
+    def urgency(self) -> int:
+        return (self._packed >> 2) + 1
+
+    @property
+    def difficulty(self) -> int:
+        return (self._packed & 3) + 1
+
+    def __repr__(self) -> str:
+        return f"Priority(urgency={self.urgency}, difficulty={self.difficulty})"
+
+    def __reduce__(self) -> tuple[type["Priority"], tuple[int, int]]:
+        return (Priority, (self.urgency, self.difficulty))
+
+    def to_dict(self) -> dict[str, int]:
+        return {"urgency": self.urgency, "difficulty": self.difficulty}
 
     def score(self) -> int:
         """Higher score = higher priority (easy + urgent first)."""
         return (5 - self.urgency) + (5 - self.difficulty)
 
 
-@dataclass
+def _new_project_id() -> str:
+    import uuid
+
+    return str(uuid.uuid4())[:8]
+
+
+@dataclass(slots=True)
 class Project:
+    """One registry entry.
+
+    Slotted, with interned priorities and tech stack names: a project with short
+    text fields and a three-item stack costs about 420 bytes once loaded.
+    """
+
     id: str
     title: str
     brief: str
@@ -54,6 +132,7 @@ class Project:
     repo_url: str | None = None
     locked_by: str | None = None
     locked_at: str | None = None
+    lease_expires_at: str | None = None
     blocked_reason: str | None = None
 
     @classmethod
@@ -67,33 +146,137 @@ class Project:
         difficulty: int = 2,
     ) -> "Project":
         return cls(
-            id=str(uuid.uuid4())[:8],
+            id=_new_project_id(),
             title=title,
             brief=brief,
             spec=spec,
             status=Status.IDEA,
             priority=Priority(urgency=urgency, difficulty=difficulty),
-            tech_stack=tech_stack,
+            tech_stack=[sys.intern(t) for t in tech_stack],
             created_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         )
 
     def to_dict(self) -> dict[str, Any]:
-        data = asdict(self)
-        data["status"] = self.status.value
-        return data
+        return {
+            "id": self.id,
+            "title": self.title,
+            "brief": self.brief,
+            "spec": self.spec,
+            "status": self.status.value,
+            "priority": self.priority.to_dict(),
+            "tech_stack": list(self.tech_stack),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "repo_url": self.repo_url,
+            "locked_by": self.locked_by,
+            "locked_at": self.locked_at,
+            "lease_expires_at": self.lease_expires_at,
+            "blocked_reason": self.blocked_reason,
+        }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "Project":
         data = data.copy()
         data["status"] = Status(data["status"])
         data["priority"] = Priority(**data["priority"])
+        # Stacks repeat across projects, so share one string per technology
+        data["tech_stack"] = [sys.intern(t) for t in data["tech_stack"]]
         return cls(**data)
 
 
+PROJECT_FIELDS = frozenset(f.name for f in fields(Project))
+
+
+class ProjectRef:
+    """The fields selection needs, with the full Project loaded on first use.
+
+    ``id``, ``status``, ``priority``, ``locked_by`` and ``lease_expires_at`` are decoded
+    up front; any other attribute (``spec``, ``brief``, ``to_dict()``, ...) materializes
+    the Project, fetching it from storage if only the header was read.
+    """
+
+    __slots__ = (
+        "id",
+        "status",
+        "priority",
+        "locked_by",
+        "lease_expires_at",
+        "_storage",
+        "_blobs",
+        "_data",
+        "_project",
+    )
+
+    def __init__(self, data: dict[str, Any], storage: RegistryStorage, blobs: BlobStore) -> None:
+        self.id: str = data["id"]
+        self.status = Status(data["status"])
+        self.priority = Priority(**data["priority"])
+        self.locked_by: str | None = data["locked_by"]
+        self.lease_expires_at: str | None = data.get("lease_expires_at")
+        self._storage = storage
+        self._blobs = blobs
+        self._data = data if "spec" in data else None
+        self._project: Project | None = None
+
+    @property
+    def project(self) -> Project:
+        if self._project is None:
+            data = self._data if self._data is not None else self._storage.get(self.id)
+            if data is None:
+                raise LookupError(f"Project {self.id} no longer exists")
+            self._project = Project.from_dict(self._blobs.unpack(data, TEXT_FIELDS))
+        return self._project
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.project, name)
+
+
 @dataclass
 class Registry:
+    """All projects, indexed by id, by status and by lock owner.
+
+    The indexes are built once on construction. Mutate through ``add``, ``remove``
+    and ``reindex`` (after changing a project's status or lock) to keep them current.
+    """
+
     version: str = "1.0.0"
     projects: list[Project] = field(default_factory=list)
+    _index: ProjectIndex[Project] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._index = ProjectIndex()
+        for project in self.projects:
+            self.reindex(project)
+
+    def reindex(self, project: Project) -> None:
+        self._index.put(
+            project.id, project.status.value, project.locked_by, project, project.lease_expires_at
+        )
+
+    def get(self, project_id: str) -> Project | None:
+        return self._index.get(project_id)
+
+    def add(self, project: Project) -> None:
+        self.projects.append(project)
+        self.reindex(project)
+
+    def remove(self, project_id: str) -> bool:
+        project = self._index.get(project_id)
+        if project is None:
+            return False
+        self._index.remove(project_id)
+        del self.projects[next(i for i, p in enumerate(self.projects) if p is project)]
+        return True
+
+    def find(
+        self,
+        status_filter: list[Status] | None = None,
+        unlocked_only: bool = False,
+        locked_by: str | None = None,
+    ) -> list[Project]:
+        statuses = [s.value for s in status_filter] if status_filter else None
+        return self._index.find(statuses, unlocked_only, locked_by)
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -109,126 +292,569 @@ class Registry:
         )
 
 
+class Transaction:
+    """A batch of registry mutations applied with one load and one atomic save.
+
+    Created by ``RegistryManager.transaction()``. Reads inside the batch see its own
+    changes; nothing is written unless the whole block succeeds.
+    """
+
+    def __init__(
+        self,
+        storage: RegistryStorage,
+        blobs: BlobStore | None = None,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+    ) -> None:
+        self.storage = storage
+        self.blobs = blobs or BlobStore(storage.registry_dir, durability=storage.durability)
+        self.lease_ttl = lease_ttl
+        self.records: list[dict[str, Any]] = []
+        self._changed: dict[str, dict[str, Any] | None] = {}
+
+    def _current(self, project_id: str) -> dict[str, Any] | None:
+        if project_id in self._changed:
+            return self._changed[project_id]
+        return self.storage.get(project_id)
+
+    def get(self, project_id: str) -> Project | None:
+        data = self._current(project_id)
+        return Project.from_dict(self.blobs.unpack(data, TEXT_FIELDS)) if data else None
+
+    def add(self, project: Project) -> Project:
+        data = self.blobs.pack(project.to_dict(), TEXT_FIELDS)
+        self._changed[project.id] = data
+        self.records.append({"op": "put", "project": data})
+        return project
+
+    def _normalize(self, fields: dict[str, Any]) -> dict[str, Any]:
+        """Validate status/priority values and convert them to their stored form."""
+        changes: dict[str, Any] = {}
+        for key, value in fields.items():
+            if key == "status" and isinstance(value, str):
+                value = Status(value)
+            if key == "priority" and isinstance(value, dict):
+                value = Priority(**value)
+            changes[key] = (
+                value
+                if not isinstance(value, (Status, Priority))
+                else (value.value if isinstance(value, Status) else value.to_dict())
+            )
+        return changes
+
+    def _refs(self) -> Iterator[ProjectRef]:
+        """Every project as this transaction sees it, decoded only as far as needed."""
+        stored: set[str] = set()
+        for header in self.storage.iter_headers():
+            stored.add(header["id"])
+            data = self._changed.get(header["id"], header)
+            if data is not None:
+                yield ProjectRef(data, self.storage, self.blobs)
+        for project_id, data in self._changed.items():
+            if data is not None and project_id not in stored:
+                yield ProjectRef(data, self.storage, self.blobs)
+
+    def update(self, project_id: str, **fields: Any) -> Project | None:
+        data = self._current(project_id)
+        if data is None:
+            return None
+        # Known fields only; records from before a field existed may lack its key
+        changes = {k: v for k, v in self._normalize(fields).items() if k in PROJECT_FIELDS}
+        changes = self.blobs.pack(changes, TEXT_FIELDS)
+        data = {**data, **changes}
+        project = Project.from_dict(self.blobs.unpack(data, TEXT_FIELDS))
+        self._changed[project_id] = data
+        self.records.append({"op": "patch", "id": project_id, "fields": changes})
+        return project
+
+    def lock(self, project_id: str, worker_id: str, ttl: float | None = None) -> Project | None:
+        """Lock for ``ttl`` seconds (the transaction's ``lease_ttl`` by default)."""
+        return self.update(
+            project_id,
+            locked_by=worker_id,
+            locked_at=utc_timestamp(),
+            lease_expires_at=utc_timestamp(self.lease_ttl if ttl is None else ttl),
+        )
+
+    def unlock(self, project_id: str) -> Project | None:
+        return self.update(project_id, locked_by=None, locked_at=None, lease_expires_at=None)
+
+    def reclaim_expired(self) -> int:
+        """Unlock every project whose lease has run out; return how many."""
+        now = utc_timestamp()
+        reclaimed = 0
+        for data in self.storage.expired_leases(now):
+            # A lock taken or extended earlier in this transaction still stands
+            current = self._current(data["id"])
+            if current is not None and not lease_held(
+                current["locked_by"], current.get("lease_expires_at"), now
+            ):
+                self.unlock(data["id"])
+                reclaimed += 1
+        return reclaimed
+
+    def delete(self, project_id: str) -> bool:
+        if self._current(project_id) is None:
+            return False
+        self._changed[project_id] = None
+        self.records.append({"op": "delete", "id": project_id})
+        return True
+
+    def update_where(self, predicate: Callable[[ProjectRef], bool], **fields: Any) -> int:
+        """Set ``fields`` on every project matching ``predicate``; return the count.
+
+        The change is validated once, applied to the first match as stored (blob refs
+        are not read), then recorded as one patch per match.
+        """
+        unknown = sorted(set(fields) - PROJECT_FIELDS)
+        if unknown or "id" in fields:
+            raise ValueError(f"Cannot set fields: {', '.join(unknown or ['id'])}")
+        changes = self.blobs.pack(self._normalize(fields), TEXT_FIELDS)
+        matches = [ref.id for ref in self._refs() if predicate(ref)]
+        if matches:
+            Project.from_dict({**cast(dict[str, Any], self._current(matches[0])), **changes})
+        for project_id in matches:
+            current = cast(dict[str, Any], self._current(project_id))
+            self._changed[project_id] = {**current, **changes}
+            self.records.append({"op": "patch", "id": project_id, "fields": changes})
+        return len(matches)
+
+    def delete_where(self, predicate: Callable[[ProjectRef], bool]) -> int:
+        """Delete every project matching ``predicate``; return the count."""
+        matches = [ref.id for ref in self._refs() if predicate(ref)]
+        for project_id in matches:
+            self.delete(project_id)
+        return len(matches)
+
+    def apply(self, operation: dict[str, Any]) -> Project | bool | None:
+        """Run one ``{"op": ..., ...}`` operation as accepted by ``registry.py apply``."""
+        op = operation.get("op")
+        if op == "add":
+            return self.add(Project.create(**operation["project"]))
+        if op == "update":
+            return self.update(operation["id"], **operation.get("fields", {}))
+        if op == "lock":
+            return self.lock(operation["id"], operation["worker_id"])
+        if op == "unlock":
+            return self.unlock(operation["id"])
+        if op == "delete":
+            return self.delete(operation["id"])
+        raise ValueError(f"Unknown operation: {op}")
+
+
 class RegistryManager:
-    """Manages the project registry file with file locking for concurrency safety."""
+    """Manages the project registry through a pluggable storage backend.
+
+    The backend is picked from the files present in registry_dir: a SQLite database
+    after ``registry.py migrate --to=sqlite``, otherwise the JSON snapshot.
+
+    Long-lived callers can pass ``cache=True`` to reuse the parsed registry until
+    the underlying files change; hits and misses are counted on the storage.
+
+    Single-project operations are optimistic: they read without locking, then
+    commit only if the registry generation is unchanged, retrying with jittered
+    backoff otherwise. ``retries`` counts those retries.
+
+    Long ``spec`` and ``brief`` texts live in a content-addressed ``BlobStore`` next
+    to the registry; records hold only their hash and length.
 
-    def __init__(self, registry_dir: str | Path) -> None:
+    ``durability`` and ``group_commit_ms`` default to the ``durability:`` and
+    ``group_commit_ms:`` settings in the config file (``none`` and 0 if unset).
+
+    Locks are leases that run out after ``lease_ttl`` seconds (``lease_ttl:`` in the
+    config, 4 hours if unset) unless ``heartbeat`` extends them. Expired locks count
+    as free for unlocked-only reads, and ``claim`` and ``reclaim_expired`` unlock
+    them; ``reclaimed`` counts those.
+    """
+
+    RETRY_BASE_DELAY = 0.001
+    RETRY_MAX_DELAY = 0.05
+
+    def __init__(
+        self,
+        registry_dir: str | Path,
+        storage: RegistryStorage | None = None,
+        cache: bool = False,
+        max_retries: int = 10,
+        durability: str | None = None,
+        group_commit_ms: float | None = None,
+        lease_ttl: float | None = None,
+    ) -> None:
         self.registry_dir = Path(registry_dir)
-        self.registry_path = self.registry_dir / ".digitus-registry.json"
+        self.cache = cache
+        if durability is None or group_commit_ms is None or lease_ttl is None:
+            config = read_config()
+            durability = durability or config.get("durability", "none")
+            if group_commit_ms is None:
+                group_commit_ms = float(config.get("group_commit_ms", "0"))
+            if lease_ttl is None:
+                lease_ttl = float(config.get("lease_ttl", DEFAULT_LEASE_TTL))
+        self.durability = durability
+        self.lease_ttl = lease_ttl
+        self.group_commit_window = group_commit_ms / 1000
+        self.storage = storage or open_storage(
+            self.registry_dir,
+            cache=cache,
+            durability=durability,
+            group_commit_window=self.group_commit_window,
+        )
+        self.registry_path = self.storage.path
+        self.blobs = BlobStore(self.registry_dir, durability=self.storage.durability)
+        self.max_retries = max_retries
+        self.retries = 0
+        self.reclaimed = 0
+
+    def _project(self, data: dict[str, Any]) -> Project:
+        return Project.from_dict(self.blobs.unpack(data, TEXT_FIELDS))
 
     def _load(self) -> Registry:
-        try:
-            with open(self.registry_path) as f:
-                fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-                try:
-                    return Registry.from_dict(json.load(f))
-                finally:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-        except FileNotFoundError:
-            return Registry()
+        data = self.storage.load()
+        with span("model.build", count=len(data["projects"])):
+            projects = [self.blobs.unpack(p, TEXT_FIELDS) for p in data["projects"]]
+            return Registry.from_dict({**data, "projects": projects})
 
     def _save(self, registry: Registry) -> None:
-        self.registry_dir.mkdir(parents=True, exist_ok=True)
-        # Atomic write: write to temp file, then rename
-        fd, tmp_path = tempfile.mkstemp(dir=self.registry_dir, prefix=".registry-", suffix=".tmp")
+        data = registry.to_dict()
+        projects = [self.blobs.pack(p, TEXT_FIELDS) for p in data["projects"]]
+        self.storage.save({**data, "projects": projects})
+
+    def gc_blobs(self, grace: float = 3600.0) -> int:
+        """Delete spec/brief blobs no project refers to; return how many went."""
+        referenced = {
+            p[f]["blob"]
+            for p in self.storage.iter_query()
+            for f in TEXT_FIELDS
+            if isinstance(p.get(f), dict)
+        }
+        return self.blobs.gc(referenced, grace)
+
+    def _json_storage(self) -> JsonFileStorage:
+        if not isinstance(self.storage, JsonFileStorage):
+            raise ValueError("The journal requires the JSON storage backend")
+        return self.storage
+
+    @property
+    def journaled(self) -> bool:
+        return isinstance(self.storage, JsonFileStorage) and self.storage.journaled
+
+    def enable_journal(self) -> None:
+        self._json_storage().enable_journal()
+
+    def disable_journal(self) -> None:
+        self._json_storage().disable_journal()
+
+    def compact(self) -> None:
+        self.storage.compact()
+
+    def migrate(self, backend: str) -> None:
+        """Copy the registry into another storage backend and remove the old files."""
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {backend}")
+        if isinstance(self.storage, STORAGE_BACKENDS[backend]):
+            return
+        target = STORAGE_BACKENDS[backend](self.registry_dir, durability=self.durability)
+        target.save(self.storage.load())
+        self.storage.remove()
+        self.storage = target
+        self.registry_path = target.path
+        self._drop_selection()
+
+    def _drop_selection(self) -> None:
+        """Generations are only comparable within one backend, so forget selection indexes."""
+        import shutil
+
+        shutil.rmtree(self.registry_dir / SELECTION_DIR, ignore_errors=True)
+
+    def reshard(self, shards: int) -> None:
+        """Rewrite the registry into ``shards`` shards, from any backend.
+
+        The new layout is built in a staging directory and renamed into place. Like
+        ``migrate``, run it while no other process is writing to the registry.
+        """
+        if shards < 1:
+            raise ValueError("Shard count must be at least 1")
+        old = self.storage
+        import shutil
+        import tempfile
+
+        data = old.load()
+        staging = Path(tempfile.mkdtemp(dir=self.registry_dir, prefix=".reshard-"))
+        moved = False
         try:
-            with os.fdopen(fd, "w") as f:
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                json.dump(registry.to_dict(), f, indent=2)
-            Path(tmp_path).rename(self.registry_path)
-        except Exception:
-            Path(tmp_path).unlink(missing_ok=True)
+            ShardedStorage(staging, shards, durability=self.durability).save(data)
+            if isinstance(old, ShardedStorage):
+                old.path.rename(staging / "old")
+                moved = True
+            (staging / ShardedStorage.FILENAME).rename(self.registry_dir / ShardedStorage.FILENAME)
+        except BaseException:
+            # Put the old shards back first; if that fails too, they survive in staging
+            if moved:
+                (staging / "old").rename(old.path)
+            shutil.rmtree(staging, ignore_errors=True)
             raise
+        shutil.rmtree(staging, ignore_errors=True)
+        if not isinstance(old, ShardedStorage):
+            old.remove()
+        self.storage = ShardedStorage(
+            self.registry_dir,
+            cache=self.cache,
+            durability=self.durability,
+            group_commit_window=self.group_commit_window,
+        )
+        self.registry_path = self.storage.path
+        self._drop_selection()
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """Batch mutations under one exclusive lock, committed once on success."""
+        with self.storage.locked():
+            txn = Transaction(self.storage, self.blobs, self.lease_ttl)
+            yield txn
+            if txn.records:
+                self.storage.commit(txn.records)
+
+    def _mutate(self, operation: Callable[[Transaction], T]) -> T:
+        """Run ``operation`` against a lock-free read and commit it if nothing moved.
+
+        Raises GenerationConflict once ``max_retries`` retries have all lost the race.
+        """
+        attempt = 0
+        while True:
+            with self.storage.view():
+                generation = self.storage.generation()
+                txn = Transaction(self.storage, self.blobs, self.lease_ttl)
+                result = operation(txn)
+            if not txn.records:
+                return result
+            try:
+                self.storage.commit(txn.records, expected_generation=generation)
+                return result
+            except GenerationConflict:
+                if attempt >= self.max_retries:
+                    raise
+            import random
+
+            # Full jitter keeps colliding writers from retrying in lockstep
+            delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2**attempt)
+            time.sleep(random.uniform(0, delay))
+            attempt += 1
+            self.retries += 1
 
     def add(self, project: Project) -> Project:
-        registry = self._load()
-        registry.projects.append(project)
-        self._save(registry)
-        return project
+        return self._mutate(lambda txn: txn.add(project))
+
+    def import_projects(self, lines: Iterable[str], chunk_size: int = 0) -> tuple[int, list[str]]:
+        """Add projects from NDJSON lines shaped like ``registry.py add`` input.
+
+        Invalid lines are skipped and reported as ``"line N: reason"``. Valid ones are
+        committed in one write, or in one write per ``chunk_size`` projects if set.
+        """
+        imported = 0
+        errors: list[str] = []
+        pending: list[Project] = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise TypeError("expected a JSON object")
+                pending.append(Project.create(**data))
+            except (ValueError, TypeError) as e:
+                errors.append(f"line {number}: {e}")
+                continue
+            if chunk_size and len(pending) >= chunk_size:
+                imported += self._add_all(pending)
+                pending = []
+        if pending:
+            imported += self._add_all(pending)
+        return imported, errors
+
+    def _add_all(self, projects: list[Project]) -> int:
+        with self.transaction() as txn:
+            taken = {p["id"] for p in self.storage.query()}
+            for project in projects:
+                while project.id in taken:
+                    project.id = _new_project_id()
+                taken.add(project.id)
+                txn.add(project)
+        return len(projects)
 
     def get(self, project_id: str) -> Project | None:
-        registry = self._load()
-        for p in registry.projects:
-            if p.id == project_id:
-                return p
-        return None
+        data = self.storage.get(project_id)
+        if data is None:
+            return None
+        with span("model.build", count=1):
+            return self._project(data)
+
+    def iter_records(
+        self,
+        status_filter: list[Status] | None = None,
+        unlocked_only: bool = False,
+    ) -> Iterator[dict[str, Any]]:
+        """Like ``list()`` but yields project dicts lazily, for streaming output."""
+        statuses = [s.value for s in status_filter] if status_filter else None
+        for data in self.storage.iter_query(statuses, unlocked_only):
+            yield self.blobs.unpack(data, TEXT_FIELDS)
+
+    def iter_refs(
+        self,
+        status_filter: list[Status] | None = None,
+        unlocked_only: bool = False,
+    ) -> Iterator[ProjectRef]:
+        """Like ``list_refs()`` but yields lazily, for one-pass consumers."""
+        statuses = [s.value for s in status_filter] if status_filter else None
+        for header in self.storage.iter_headers(statuses, unlocked_only):
+            yield ProjectRef(header, self.storage, self.blobs)
+
+    def list_refs(
+        self,
+        status_filter: list[Status] | None = None,
+        unlocked_only: bool = False,
+    ) -> list[ProjectRef]:
+        """Like ``list()``, but projects are only fully decoded when accessed."""
+        return list(self.iter_refs(status_filter, unlocked_only))
+
+    def claim(
+        self, status_filter: list[Status], worker_id: str, ttl: float | None = None
+    ) -> Project | None:
+        """Pick an unlocked project by priority weight and lock it to ``worker_id``.
+
+        Selection and lock happen under one writer lock, so concurrent claimers
+        always get distinct projects. Expired leases are reclaimed first. Returns
+        None when no project is free.
+        """
+        from selector import SelectionCache
+
+        statuses = [s.value for s in status_filter]
+        with self.transaction() as txn:
+            reclaimed = txn.reclaim_expired()
+            # Reclaiming does not change the pick: expired leases already count as unlocked
+            chosen = SelectionCache(self).index(statuses, unlocked_only=True).draw()
+            project = txn.lock(chosen, worker_id, ttl) if chosen else None
+        self.reclaimed += reclaimed
+        return project
 
     def list(
         self,
         status_filter: list[Status] | None = None,
         unlocked_only: bool = False,
     ) -> list[Project]:
-        registry = self._load()
-        projects = registry.projects
+        statuses = [s.value for s in status_filter] if status_filter else None
+        rows = list(self.storage.iter_query(statuses, unlocked_only))
+        with span("model.build", count=len(rows)):
+            return [self._project(p) for p in rows]
 
-        if status_filter:
-            projects = [p for p in projects if p.status in status_filter]
+    def update(self, project_id: str, **fields: Any) -> Project | None:
+        return self._mutate(lambda txn: txn.update(project_id, **fields))
 
-        if unlocked_only:
-            projects = [p for p in projects if p.locked_by is None]
+    def lock(self, project_id: str, worker_id: str, ttl: float | None = None) -> Project | None:
+        return self._mutate(lambda txn: txn.lock(project_id, worker_id, ttl))
 
-        return projects
+    def heartbeat(self, worker_id: str, ttl: float | None = None) -> int:
+        """Extend every lease ``worker_id`` holds to ``ttl`` seconds from now; return the count.
 
-    def update(self, project_id: str, **fields: Any) -> Project | None:
-        registry = self._load()
-        for i, p in enumerate(registry.projects):
-            if p.id == project_id:
-                data = p.to_dict()
-                for key, value in fields.items():
-                    if key == "status" and isinstance(value, str):
-                        value = Status(value)
-                    if key == "priority" and isinstance(value, dict):
-                        value = Priority(**value)
-                    if key in data:
-                        data[key] = (
-                            value
-                            if not isinstance(value, (Status, Priority))
-                            else (value.value if isinstance(value, Status) else asdict(value))
-                        )
-                registry.projects[i] = Project.from_dict(data)
-                self._save(registry)
-                return registry.projects[i]
-        return None
-
-    def lock(self, project_id: str, worker_id: str) -> Project | None:
-        return self.update(
-            project_id,
-            locked_by=worker_id,
-            locked_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        )
+        A count lower than expected means a lease ran out and was reclaimed.
+        """
+        expires = utc_timestamp(self.lease_ttl if ttl is None else ttl)
+
+        def extend(txn: Transaction) -> int:
+            held = self.storage.query(locked_by=worker_id)
+            for p in held:
+                txn.update(p["id"], lease_expires_at=expires)
+            return len(held)
+
+        return self._mutate(extend)
+
+    def reclaim_expired(self) -> int:
+        """Unlock every project whose lease has run out; return how many."""
+        with self.transaction() as txn:
+            reclaimed = txn.reclaim_expired()
+        self.reclaimed += reclaimed
+        return reclaimed
 
     def unlock(self, project_id: str) -> Project | None:
-        return self.update(project_id, locked_by=None, locked_at=None)
+        return self._mutate(lambda txn: txn.unlock(project_id))
 
     def unlock_all_by_worker(self, worker_id: str) -> int:
-        registry = self._load()
-        count = 0
-        for p in registry.projects:
-            if p.locked_by == worker_id:
-                p.locked_by = None
-                p.locked_at = None
-                count += 1
-        if count > 0:
-            self._save(registry)
-        return count
+        def unlock_all(txn: Transaction) -> int:
+            locked = self.storage.query(locked_by=worker_id)
+            for p in locked:
+                txn.unlock(p["id"])
+            return len(locked)
+
+        return self._mutate(unlock_all)
 
     def delete(self, project_id: str) -> bool:
-        registry = self._load()
-        initial_count = len(registry.projects)
-        registry.projects = [p for p in registry.projects if p.id != project_id]
-        if len(registry.projects) < initial_count:
-            self._save(registry)
-            return True
-        return False
+        return self._mutate(lambda txn: txn.delete(project_id))
+
+    def update_where(self, predicate: Callable[[ProjectRef], bool], **fields: Any) -> int:
+        """Set ``fields`` on every matching project in one committed write."""
+        with self.transaction() as txn:
+            return txn.update_where(predicate, **fields)
+
+    def delete_where(self, predicate: Callable[[ProjectRef], bool]) -> int:
+        """Delete every matching project in one committed write."""
+        with self.transaction() as txn:
+            return txn.delete_where(predicate)
+
+
+def _ttl(args: list[str]) -> float | None:
+    """The ``--ttl=seconds`` lease length, if given."""
+    for arg in args:
+        if arg.startswith("--ttl="):
+            return float(arg.split("=", 1)[1])
+    return None
 
 
-def _read_json_input(args: list[str]) -> dict[str, Any]:
+def _read_json_input(args: list[str]) -> Any:
     """Read JSON from --file argument or stdin."""
     for arg in args:
         if arg.startswith("--file="):
             file_path = Path(arg.split("=", 1)[1])
-            return cast(dict[str, Any], json.loads(file_path.read_text()))
-    return cast(dict[str, Any], json.loads(sys.stdin.read()))
+            return json.loads(file_path.read_text())
+    return json.loads(sys.stdin.read())
+
+
+OUTPUT_FORMATS = ("json", "ndjson", "compact")
+
+
+def _output_format(args: list[str]) -> str:
+    """Return the --format=<json|ndjson|compact> option, exiting on anything else."""
+    fmt = next((a.split("=", 1)[1] for a in args if a.startswith("--format=")), "json")
+    if fmt not in OUTPUT_FORMATS:
+        print(f"Unknown format: {fmt} (expected one of {', '.join(OUTPUT_FORMATS)})")
+        sys.exit(1)
+    return fmt
+
+
+def _write_records(records: Iterable[dict[str, Any]], fmt: str) -> None:
+    """Write project dicts to stdout as they come, for ``ndjson`` and ``compact``."""
+    out = sys.stdout
+    if fmt == "ndjson":
+        for record in records:
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return
+    out.write("[")
+    for i, record in enumerate(records):
+        out.write(("," if i else "") + json.dumps(record, separators=(",", ":")))
+    out.write("]\n")
+
+
+def get_config_path() -> Path:
+    return Path.home() / ".claude" / "digitus-Dei.local.md"
+
+
+def read_config() -> dict[str, str]:
+    """Return the ``key: value`` settings in the config file, or {} without one."""
+    config_path = get_config_path()
+    if not config_path.exists():
+        return {}
+    settings = {}
+    for line in config_path.read_text().split("\n"):
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and not key[0].isspace():
+            settings[key.strip()] = value.strip()
+    return settings
 
 
 def get_registry_dir() -> Path:
@@ -237,7 +863,7 @@ def get_registry_dir() -> Path:
     This is the hidden directory where the registry file is stored.
     Projects are created in the parent directory (see get_projects_dir).
     """
-    config_path = Path.home() / ".claude" / "digitus-Dei.local.md"
+    config_path = get_config_path()
     if not config_path.exists():
         raise FileNotFoundError(
             f"Config not found: {config_path}\n"
@@ -264,51 +890,139 @@ def get_projects_dir() -> Path:
     return get_registry_dir().parent
 
 
+# Commands that read their JSON input from stdin unless given --file=path
+STDIN_COMMANDS = ("add", "update", "apply", "import")
+
+
+def _daemon_request(argv: list[str]) -> tuple[list[str], str]:
+    """Split a command line into (argv, stdin) for the daemon.
+
+    ``--file`` paths are relative to the caller, so the file is read here and sent
+    as stdin instead.
+    """
+    files = [a.split("=", 1)[1] for a in argv if a.startswith("--file=")]
+    if files:
+        return [a for a in argv if not a.startswith("--file=")], Path(files[-1]).read_text()
+    if argv[1] in STDIN_COMMANDS:
+        return argv, sys.stdin.read()
+    return argv, ""
+
+
 def main() -> None:
     if len(sys.argv) < 2:
         print("Usage: registry.py <command> [args]")
-        print("Commands: add, get, list, update, lock, unlock, unlock-worker, delete")
+        print(
+            "Commands: add, get, list, update, lock, unlock, heartbeat, reclaim, unlock-worker, "
+            "delete, update-many, delete-many, apply, import, journal, compact, migrate, reshard, "
+            "gc, serve, --batch, trace-summary"
+        )
         sys.exit(1)
 
     cmd = sys.argv[1]
-    manager = RegistryManager(get_registry_dir())
+    if cmd == "trace-summary":
+        from tracing import TRACE_ENV, format_summary, summarize, trace_file
+
+        trace = sys.argv[2] if len(sys.argv) > 2 else trace_file()
+        if trace is None:
+            print(f"Usage: registry.py trace-summary <trace.jsonl>   (or set {TRACE_ENV})")
+            sys.exit(1)
+        with open(trace) as f:
+            print(format_summary(summarize(f)))
+        return
+
+    registry_dir = get_registry_dir()
+    path = registry_dir / DAEMON_SOCKET
+
+    if cmd == "--batch":
+        from batch import run_batch
+        from daemon import Handler
+
+        manager = RegistryManager(registry_dir, cache=True)
+        handlers: dict[str, Handler] = {"registry": lambda argv: run_command(manager, argv)}
+        sys.exit(1 if run_batch(sys.stdin, handlers, "registry", sys.stdout) else 0)
+
+    if cmd == "serve":
+        import daemon
+
+        manager = RegistryManager(registry_dir, cache=True)
+        print(f"Serving {registry_dir} on {path}", flush=True)
+        try:
+            registry_dir.mkdir(parents=True, exist_ok=True)
+            daemon.serve(path, lambda argv: run_command(manager, argv))
+        except (RuntimeError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    response = None
+    if path.exists():
+        import daemon
+
+        argv, stdin = _daemon_request(sys.argv)
+        with span("daemon.call", cmd=cmd):
+            response = daemon.call(path, argv, stdin)
+        sys.stdin = io.StringIO(stdin)  # already consumed; keep it for the fallback
+    if response is None:
+        run_command(RegistryManager(registry_dir), sys.argv)
+        return
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    if response["code"]:
+        sys.exit(response["code"])
+
+
+def run_command(manager: RegistryManager, argv: list[str]) -> None:
+    """Run one ``registry.py`` command line against ``manager``."""
+    with span("command", tool="registry", cmd=argv[1]):
+        _run_command(manager, argv)
+
+
+def _run_command(manager: RegistryManager, argv: list[str]) -> None:
+    cmd = argv[1]
 
     if cmd == "list":
         status_filter = None
         unlocked_only = False
-        for arg in sys.argv[2:]:
+        fmt = _output_format(argv[2:])
+        for arg in argv[2:]:
             if arg.startswith("--status="):
                 statuses = arg.split("=")[1].split(",")
                 status_filter = [Status(s) for s in statuses]
             elif arg == "--unlocked":
                 unlocked_only = True
 
-        projects = manager.list(status_filter, unlocked_only)
-        print(json.dumps([p.to_dict() for p in projects], indent=2))
+        if fmt == "json":
+            projects = manager.list(status_filter, unlocked_only)
+            print(json.dumps([p.to_dict() for p in projects], indent=2))
+        else:
+            _write_records(manager.iter_records(status_filter, unlocked_only), fmt)
 
     elif cmd == "get":
-        if len(sys.argv) < 3:
-            print("Usage: registry.py get <id>")
+        if len(argv) < 3:
+            print("Usage: registry.py get <id> [--format=json|ndjson|compact]")
             sys.exit(1)
-        project = manager.get(sys.argv[2])
-        if project:
+        fmt = _output_format(argv[3:])
+        project = manager.get(argv[2])
+        if project and fmt == "json":
             print(json.dumps(project.to_dict(), indent=2))
+        elif project:
+            print(json.dumps(project.to_dict(), separators=(",", ":")))
         else:
             print("Project not found", file=sys.stderr)
             sys.exit(1)
 
     elif cmd == "add":
-        data = _read_json_input(sys.argv[2:])
+        data = _read_json_input(argv[2:])
         project = Project.create(**data)
         manager.add(project)
         print(json.dumps(project.to_dict(), indent=2))
 
     elif cmd == "update":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: registry.py update <id> [--file=path] < json_fields")
             sys.exit(1)
-        fields = _read_json_input(sys.argv[3:])
-        project = manager.update(sys.argv[2], **fields)
+        fields = _read_json_input(argv[3:])
+        project = manager.update(argv[2], **fields)
         if project:
             print(json.dumps(project.to_dict(), indent=2))
         else:
@@ -316,10 +1030,10 @@ def main() -> None:
             sys.exit(1)
 
     elif cmd == "lock":
-        if len(sys.argv) < 4:
-            print("Usage: registry.py lock <id> <worker_id>")
+        if len(argv) < 4:
+            print("Usage: registry.py lock <id> <worker_id> [--ttl=seconds]")
             sys.exit(1)
-        project = manager.lock(sys.argv[2], sys.argv[3])
+        project = manager.lock(argv[2], argv[3], _ttl(argv[4:]))
         if project:
             print(json.dumps(project.to_dict(), indent=2))
         else:
@@ -327,33 +1041,143 @@ def main() -> None:
             sys.exit(1)
 
     elif cmd == "unlock":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: registry.py unlock <id>")
             sys.exit(1)
-        project = manager.unlock(sys.argv[2])
+        project = manager.unlock(argv[2])
         if project:
             print(json.dumps(project.to_dict(), indent=2))
         else:
             print("Project not found", file=sys.stderr)
             sys.exit(1)
 
+    elif cmd == "heartbeat":
+        if len(argv) < 3:
+            print("Usage: registry.py heartbeat <worker_id> [--ttl=seconds]")
+            sys.exit(1)
+        print(f"Extended {manager.heartbeat(argv[2], _ttl(argv[3:]))} leases")
+
+    elif cmd == "reclaim":
+        print(f"Reclaimed {manager.reclaim_expired()} expired locks")
+
     elif cmd == "unlock-worker":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: registry.py unlock-worker <worker_id>")
             sys.exit(1)
-        count = manager.unlock_all_by_worker(sys.argv[2])
+        count = manager.unlock_all_by_worker(argv[2])
         print(f"Unlocked {count} projects")
 
     elif cmd == "delete":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Usage: registry.py delete <id>")
             sys.exit(1)
-        if manager.delete(sys.argv[2]):
+        if manager.delete(argv[2]):
             print("Deleted")
         else:
             print("Project not found", file=sys.stderr)
             sys.exit(1)
 
+    elif cmd in ("update-many", "delete-many"):
+        args = argv[2:]
+        options = dict(a.split("=", 1) for a in args if a.startswith("--") and "=" in a)
+        if "--set" in args[:-1]:
+            options["--set"] = args[args.index("--set") + 1]
+        wanted = (
+            {Status(s) for s in options["--status"].split(",")} if "--status" in options else None
+        )
+        unlocked_only = "--unlocked" in args
+        if cmd == "update-many" and "--set" not in options:
+            print("Usage: registry.py update-many [--status=a,b] [--unlocked] --set '<json>'")
+            sys.exit(1)
+        if cmd == "delete-many" and wanted is None and not unlocked_only:
+            print("Usage: registry.py delete-many --status=a,b [--unlocked]")
+            sys.exit(1)
+
+        now = utc_timestamp()
+
+        def matches(ref: ProjectRef) -> bool:
+            return (wanted is None or ref.status in wanted) and not (
+                unlocked_only and lease_held(ref.locked_by, ref.lease_expires_at, now)
+            )
+
+        try:
+            if cmd == "update-many":
+                fields = json.loads(options["--set"])
+                if not isinstance(fields, dict):
+                    raise TypeError("--set expects a JSON object")
+                print(f"Updated {manager.update_where(matches, **fields)} projects")
+            else:
+                print(f"Deleted {manager.delete_where(matches)} projects")
+        except (ValueError, TypeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    elif cmd == "apply":
+        operations = _read_json_input(argv[2:])
+        results: list[Any] = []
+        try:
+            with manager.transaction() as txn:
+                for i, operation in enumerate(operations):
+                    result = txn.apply(operation)
+                    if result is None or result is False:
+                        raise LookupError(f"Operation {i}: project not found")
+                    results.append(result.to_dict() if isinstance(result, Project) else result)
+        except (LookupError, ValueError, TypeError) as e:
+            print(f"Batch aborted: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(results, indent=2))
+
+    elif cmd == "import":
+        options = dict(a.split("=", 1) for a in argv[2:] if a.startswith("--") and "=" in a)
+        chunk_size = options.get("--chunk-size", "0")
+        if options.get("--format", "ndjson") != "ndjson" or not chunk_size.isdigit():
+            print("Usage: registry.py import --format=ndjson [--file=path] [--chunk-size=N]")
+            sys.exit(1)
+        if "--file" in options:
+            with open(options["--file"]) as f:
+                imported, errors = manager.import_projects(f, int(chunk_size))
+        else:
+            imported, errors = manager.import_projects(sys.stdin, int(chunk_size))
+        for error in errors:
+            print(error, file=sys.stderr)
+        print(f"Imported {imported} projects")
+        if errors:
+            sys.exit(1)
+
+    elif cmd == "journal":
+        if len(argv) < 3 or argv[2] not in ("on", "off"):
+            print("Usage: registry.py journal <on|off>")
+            sys.exit(1)
+        if argv[2] == "on":
+            manager.enable_journal()
+            print("Journal enabled")
+        else:
+            manager.disable_journal()
+            print("Journal disabled")
+
+    elif cmd == "compact":
+        manager.compact()
+        print("Compacted")
+
+    elif cmd == "migrate":
+        backend = next((a.split("=", 1)[1] for a in argv[2:] if a.startswith("--to=")), None)
+        if backend not in STORAGE_BACKENDS:
+            print(f"Usage: registry.py migrate --to=<{'|'.join(STORAGE_BACKENDS)}>")
+            sys.exit(1)
+        manager.migrate(backend)
+        print(f"Migrated to {backend}")
+
+    elif cmd == "gc":
+        print(f"Removed {manager.gc_blobs()} unreferenced blobs")
+
+    elif cmd == "reshard":
+        shards = next((a.split("=", 1)[1] for a in argv[2:] if a.startswith("--shards=")), "")
+        if not shards.isdigit() or int(shards) < 1:
+            print("Usage: registry.py reshard --shards=N")
+            sys.exit(1)
+        manager.reshard(int(shards))
+        print(f"Resharded into {shards} shards")
+
     else:
         print(f"Unknown command: {cmd}", file=sys.stderr)
         sys.exit(1)
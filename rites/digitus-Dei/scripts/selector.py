@@ -1,14 +1,39 @@
 #!/usr/bin/env python3
 """Eisenhower-weighted random project selection for digitus-Dei."""
 
+import heapq
 import json
+import os
 import random
 import sys
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any, Protocol, TypeVar, cast
 
-from registry import Project, RegistryManager, Status, get_registry_dir
+from registry import (
+    SELECTION_DIR,
+    Priority,
+    Project,
+    RegistryManager,
+    Status,
+    get_registry_dir,
+)
+from storage import lease_held, utc_timestamp
 
 
-def weighted_random_select(projects: list[Project]) -> Project | None:
+class Prioritized(Protocol):
+    """Anything with an Eisenhower priority: projects, refs, simulated work items."""
+
+    @property
+    def priority(self) -> Priority: ...
+
+
+P = TypeVar("P", bound=Prioritized)
+
+# Compact per-project header: [status, priority score, locked_by, lease_expires_at]
+Header = list[Any]
+
+
+def weighted_random_select(projects: list[P]) -> P | None:
     """Select a project using priority score as weight.
 
     Higher priority score = higher weight = more likely to be selected.
@@ -28,23 +53,296 @@ def weighted_random_select(projects: list[Project]) -> Project | None:
     return random.choices(projects, weights=weights, k=1)[0]
 
 
+def weighted_sample(projects: Iterable[P], k: int) -> list[P]:
+    """Draw up to ``k`` distinct projects, weighted by priority score, in one pass.
+
+    A-Res (Efraimidis-Spirakis): each project gets the key ``u ** (1 / score)``
+    for a uniform ``u``, and the ``k`` largest keys win. A min-heap holds the
+    current winners, so memory stays O(k) however many projects stream past.
+    Ordered by key, the sample is distributed like ``k`` successive weighted
+    draws without replacement.
+    """
+    if k < 1:
+        return []
+    heap: list[tuple[float, int, P]] = []
+    for i, project in enumerate(projects):
+        key = random.random() ** (1.0 / project.priority.score())
+        if len(heap) < k:
+            heapq.heappush(heap, (key, i, project))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, i, project))
+    return [project for _, _, project in sorted(heap, reverse=True)]
+
+
+class AliasTable:
+    """Walker's alias method, built with Vose's algorithm: O(n) setup, O(1) draws.
+
+    Weights are integers and so are the thresholds, so each index is drawn with
+    probability exactly ``weight / sum(weights)``.
+    """
+
+    __slots__ = ("alias", "threshold", "total")
+
+    def __init__(self, weights: Sequence[int]) -> None:
+        n = len(weights)
+        self.total = sum(weights)
+        scaled = [w * n for w in weights]
+        self.threshold = [self.total] * n
+        self.alias = list(range(n))
+        small = [i for i, w in enumerate(scaled) if w < self.total]
+        large = [i for i, w in enumerate(scaled) if w >= self.total]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.threshold[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= self.total - scaled[less]
+            (small if scaled[more] < self.total else large).append(more)
+
+    def draw(self, randrange: Callable[[int], int] = random.randrange) -> int:
+        i = randrange(len(self.alias))
+        return i if randrange(self.total) < self.threshold[i] else self.alias[i]
+
+
+class SelectionIndex:
+    """Candidates for one status filter, bucketed by priority score, drawn in O(1).
+
+    Scores only take the values 2-8. An alias table over the score buckets,
+    weighted by score times bucket size, followed by a uniform pick inside the
+    bucket, draws each candidate with probability score / total score: the same
+    distribution as ``weighted_random_select``. Adding or removing a candidate is
+    a swap-remove plus a rebuild of that table of at most seven entries.
+    """
+
+    def __init__(
+        self,
+        generation: int,
+        buckets: dict[int, list[str]] | None = None,
+        valid_until: str | None = None,
+    ) -> None:
+        self.generation = generation
+        self.valid_until = valid_until
+        self.buckets: dict[int, list[str]] = {}
+        self._where: dict[str, tuple[int, int]] = {}
+        self._table: AliasTable | None = None
+        self._scores: list[int] = []
+        for score, ids in (buckets or {}).items():
+            for project_id in ids:
+                self.add(project_id, score)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def add(self, project_id: str, score: int) -> None:
+        self.remove(project_id)
+        bucket = self.buckets.setdefault(score, [])
+        self._where[project_id] = (score, len(bucket))
+        bucket.append(project_id)
+        self._table = None
+
+    def remove(self, project_id: str) -> None:
+        where = self._where.pop(project_id, None)
+        if where is None:
+            return
+        score, i = where
+        bucket = self.buckets[score]
+        last = bucket.pop()
+        if last != project_id:
+            bucket[i] = last
+            self._where[last] = (score, i)
+        if not bucket:
+            del self.buckets[score]
+        self._table = None
+
+    def draw(self, randrange: Callable[[int], int] = random.randrange) -> str | None:
+        if not self._where:
+            return None
+        if self._table is None:
+            self._scores = sorted(self.buckets)
+            self._table = AliasTable([s * len(self.buckets[s]) for s in self._scores])
+        bucket = self.buckets[self._scores[self._table.draw(randrange)]]
+        return bucket[randrange(len(bucket))]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "generation": self.generation,
+            "valid_until": self.valid_until,
+            "buckets": {str(score): ids for score, ids in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SelectionIndex":
+        buckets = {int(score): ids for score, ids in data["buckets"].items()}
+        return cls(data["generation"], buckets, data["valid_until"])
+
+
+def project_header(project: dict[str, Any]) -> Header:
+    return [
+        project["status"],
+        Priority(**project["priority"]).score(),
+        project["locked_by"],
+        project.get("lease_expires_at"),
+    ]
+
+
+def flatten_records(records: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Yield mutation records in order, with batches expanded."""
+    for record in records:
+        if record["op"] == "batch":
+            yield from flatten_records(record["records"])
+        else:
+            yield record
+
+
+def record_ids(records: list[dict[str, Any]]) -> set[str]:
+    return {r["project"]["id"] if r["op"] == "put" else r["id"] for r in flatten_records(records)}
+
+
+def patch_headers(headers: dict[str, Header], records: list[dict[str, Any]]) -> None:
+    """Apply mutation records to ``headers`` in place, like ``replay_journal``."""
+    for record in flatten_records(records):
+        if record["op"] == "put":
+            headers[record["project"]["id"]] = project_header(record["project"])
+        elif record["op"] == "delete":
+            headers.pop(record["id"], None)
+        elif record["id"] in headers:
+            status, score, locked_by, expires = headers[record["id"]]
+            fields = record["fields"]
+            if "priority" in fields:
+                score = Priority(**fields["priority"]).score()
+            headers[record["id"]] = [
+                fields.get("status", status),
+                score,
+                fields.get("locked_by", locked_by),
+                fields.get("lease_expires_at", expires),
+            ]
+
+
+class SelectionCache:
+    """Selection indexes persisted under ``.digitus-selection/`` next to the registry.
+
+    ``headers.json`` holds a compact header for every project, and one file per
+    status filter holds its index, each stamped with the registry generation.
+    When the registry has moved on, both are patched from the journal records
+    committed since, touching only the projects those records name, or rebuilt
+    from the headers if a compaction dropped those records. With
+    ``unlocked_only``, an index also expires when the earliest lease it
+    excluded runs out.
+
+    Backends without a journal cannot be patched, so every change would mean
+    a full rebuild and rewrite; for them the index is built in memory from a
+    header query instead and nothing is persisted.
+    """
+
+    def __init__(self, manager: RegistryManager) -> None:
+        self.storage = manager.storage
+        self.root = manager.registry_dir / SELECTION_DIR
+
+    def _read(self, name: str) -> dict[str, Any] | None:
+        try:
+            return cast(dict[str, Any], json.loads((self.root / name).read_text()))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, name: str, data: dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{name}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, self.root / name)
+
+    def _headers(self) -> tuple[int, dict[str, Header]]:
+        """Project headers at (at least) the returned generation."""
+        generation = self.storage.stored_generation()
+        cached = self._read("headers.json")
+        if cached is not None and cached["generation"] == generation:
+            return generation, cast(dict[str, Header], cached["headers"])
+        records = None if cached is None else self.storage.records_since(cached["generation"])
+        if cached is None or records is None:
+            headers = {h["id"]: project_header(h) for h in self.storage.iter_headers()}
+        else:
+            headers = cached["headers"]
+            patch_headers(headers, records)
+            generation = max([generation, *(r["gen"] for r in records)])
+        self._write("headers.json", {"generation": generation, "headers": headers})
+        return generation, headers
+
+    def index(self, statuses: list[str], unlocked_only: bool) -> SelectionIndex:
+        """The index for this filter at the registry's current generation."""
+        if not self.storage.records_available:
+            built = SelectionIndex(self.storage.stored_generation())
+            for row in self.storage.iter_headers(statuses, unlocked_only):
+                built.add(row["id"], Priority(**row["priority"]).score())
+            return built
+        name = "+".join(sorted(statuses)) + ("-unlocked" if unlocked_only else "") + ".json"
+        now = utc_timestamp()
+        cached = self._read(name)
+        index = SelectionIndex.from_dict(cached) if cached else None
+        if index and index.valid_until is not None and now >= index.valid_until:
+            index = None
+        if index and index.generation == self.storage.stored_generation():
+            return index
+
+        generation, headers = self._headers()
+        records = self.storage.records_since(index.generation) if index else None
+        ids: Iterable[str]
+        if index is None or records is None:
+            index, ids = SelectionIndex(generation), headers
+        else:
+            ids = record_ids(records)
+        for project_id in ids:
+            header = headers.get(project_id)
+            if header is None or header[0] not in statuses:
+                index.remove(project_id)
+            elif unlocked_only and lease_held(header[2], header[3], now):
+                index.remove(project_id)
+                if header[3] and (index.valid_until is None or header[3] < index.valid_until):
+                    index.valid_until = header[3]
+            else:
+                index.add(project_id, header[1])
+        index.generation = generation
+        self._write(name, index.to_dict())
+        return index
+
+
 def select(
     status_filter: list[Status],
     unlocked_only: bool = True,
 ) -> Project | None:
     """Select a random project matching criteria, weighted by Eisenhower priority."""
     manager = RegistryManager(get_registry_dir())
-    projects = manager.list(status_filter=status_filter, unlocked_only=unlocked_only)
-    return weighted_random_select(projects)
+    index = SelectionCache(manager).index([s.value for s in status_filter], unlocked_only)
+    project_id = index.draw()
+    # Only the chosen project's spec and brief are ever decoded
+    return manager.get(project_id) if project_id else None
+
+
+def sample(status_filter: list[Status], count: int, unlocked_only: bool = True) -> list[Project]:
+    """Select up to ``count`` distinct projects, weighted like ``select``, in one pass."""
+    manager = RegistryManager(get_registry_dir())
+    chosen = weighted_sample(manager.iter_refs(status_filter, unlocked_only), count)
+    return [ref.project for ref in chosen]
+
+
+def claim(status_filter: list[Status], worker_id: str) -> Project | None:
+    """Select an unlocked project like ``select`` and lock it to ``worker_id`` atomically."""
+    manager = RegistryManager(get_registry_dir())
+    project = manager.claim(status_filter, worker_id)
+    if manager.reclaimed:
+        print(f"Reclaimed {manager.reclaimed} expired locks", file=sys.stderr)
+    return project
 
 
 def main() -> None:
     if len(sys.argv) < 2:
-        print("Usage: selector.py --status=idea,in_progress [--unlocked]")
+        print(
+            "Usage: selector.py --status=idea,in_progress "
+            "[--unlocked] [--count=<k> | --claim=<worker_id>]"
+        )
         sys.exit(1)
 
     status_filter: list[Status] = []
     unlocked_only = False
+    worker_id = None
+    count = None
 
     for arg in sys.argv[1:]:
         if arg.startswith("--status="):
@@ -52,12 +350,35 @@ def main() -> None:
             status_filter = [Status(s.strip()) for s in statuses]
         elif arg == "--unlocked":
             unlocked_only = True
+        elif arg.startswith("--claim="):
+            worker_id = arg.split("=", 1)[1]
+        elif arg.startswith("--count="):
+            value = arg.split("=", 1)[1]
+            if not value.isdigit() or int(value) < 1:
+                print("Error: --count must be a positive integer", file=sys.stderr)
+                sys.exit(1)
+            count = int(value)
 
     if not status_filter:
         print("Error: --status is required", file=sys.stderr)
         sys.exit(1)
 
-    project = select(status_filter, unlocked_only)
+    if count is not None and worker_id is not None:
+        print("Error: --count cannot be combined with --claim", file=sys.stderr)
+        sys.exit(1)
+
+    if count is not None:
+        projects = sample(status_filter, count, unlocked_only)
+        if not projects:
+            print("No matching projects found", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps([p.to_dict() for p in projects], indent=2))
+        return
+
+    if worker_id is not None:
+        project = claim(status_filter, worker_id)
+    else:
+        project = select(status_filter, unlocked_only)
 
     if project:
         print(json.dumps(project.to_dict(), indent=2))
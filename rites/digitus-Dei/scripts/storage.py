@@ -0,0 +1,1238 @@
+#!/usr/bin/env python3
+"""Storage backends for the digitus-Dei registry.
+
+Backends exchange plain project dicts (the ``Project.to_dict`` shape) and apply
+mutations as journal-style records, so they never depend on the model classes:
+
+- ``{"op": "put", "project": {...}}`` inserts or replaces a project
+- ``{"op": "patch", "id": ..., "fields": {...}}`` sets fields on a project
+- ``{"op": "delete", "id": ...}`` removes a project
+
+Every commit bumps a monotonically increasing registry ``generation``. Readers
+never lock; writers serialize on a short exclusive lock and can pass the
+generation they read, so a commit fails instead of overwriting newer data.
+
+A lock can carry a lease: ``lease_expires_at`` is a UTC timestamp after which the
+lock no longer counts, so ``unlocked_only`` reads treat the project as free and
+``expired_leases`` finds it for reclamation.
+
+``durability`` picks what a commit waits for: ``none`` trusts the OS page cache,
+``file`` fsyncs written files, and ``file+dir`` also fsyncs the directory after
+renames so the new snapshot's name survives a crash too.
+"""
+
+import heapq
+import json
+import os
+import re
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager, suppress
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Generic, TypeVar, cast
+
+from tracing import span
+
+# fcntl, hashlib, shutil, sqlite3 and tempfile are imported where they are used, so
+# read-only commands start without loading them.
+if TYPE_CHECKING:
+    import sqlite3
+
+REGISTRY_VERSION = "1.0.0"
+DURABILITY_MODES = ("none", "file", "file+dir")
+
+FileIdentity = tuple[int, int, int]
+CacheKey = tuple[FileIdentity | None, FileIdentity | None]
+
+T = TypeVar("T")
+
+
+class GenerationConflict(RuntimeError):
+    """A commit expected a registry generation that has since moved on."""
+
+    def __init__(self, expected: int, actual: int) -> None:
+        super().__init__(f"Registry generation moved from {expected} to {actual}")
+        self.expected = expected
+        self.actual = actual
+
+
+class ProjectIndex(Generic[T]):
+    """Secondary indexes over registry projects: by id, status, lock owner and lease expiry.
+
+    Items can be any project representation; ``put`` is given the indexed fields.
+    Each id keeps the position it was first added at, so results come back in
+    registry order, and re-putting an id after a change moves it between buckets.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[str, tuple[int, T]] = {}
+        self._keys: dict[str, tuple[str, str | None, str | None]] = {}
+        self._by_status: dict[str, dict[str, None]] = {}
+        self._by_owner: dict[str, dict[str, None]] = {}
+        # Min-heap of (lease expiry, id); entries a later put made stale are skipped
+        self._leases: list[tuple[str, str]] = []
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(
+        self,
+        project_id: str,
+        status: str,
+        locked_by: str | None,
+        item: T,
+        lease_expires_at: str | None = None,
+    ) -> None:
+        entry = self._items.get(project_id)
+        if entry is None:
+            position = self._next
+            self._next += 1
+        else:
+            position = entry[0]
+            self._unlink(project_id)
+        self._items[project_id] = (position, item)
+        self._keys[project_id] = (status, locked_by, lease_expires_at)
+        self._by_status.setdefault(status, {})[project_id] = None
+        if locked_by is not None:
+            self._by_owner.setdefault(locked_by, {})[project_id] = None
+            if lease_expires_at is not None:
+                heapq.heappush(self._leases, (lease_expires_at, project_id))
+
+    def remove(self, project_id: str) -> bool:
+        if project_id not in self._items:
+            return False
+        self._unlink(project_id)
+        del self._items[project_id]
+        return True
+
+    def _unlink(self, project_id: str) -> None:
+        status, locked_by, _ = self._keys.pop(project_id)
+        del self._by_status[status][project_id]
+        if locked_by is not None:
+            del self._by_owner[locked_by][project_id]
+
+    def get(self, project_id: str) -> T | None:
+        entry = self._items.get(project_id)
+        return entry[1] if entry else None
+
+    def find(
+        self,
+        statuses: list[str] | None = None,
+        unlocked_only: bool = False,
+        locked_by: str | None = None,
+        now: str | None = None,
+    ) -> list[T]:
+        """Return matching items in registry order, touching only the smallest bucket.
+
+        ``unlocked_only`` also matches locks whose lease ran out by ``now``.
+        """
+        now = now or utc_timestamp()
+        if locked_by is not None:
+            ids: list[str] = list(self._by_owner.get(locked_by, ()))
+        elif statuses:
+            ids = [i for s in dict.fromkeys(statuses) for i in self._by_status.get(s, ())]
+        else:
+            ids = list(self._items)
+        matches = [
+            i
+            for i in ids
+            if (not statuses or self._keys[i][0] in statuses)
+            and (not unlocked_only or not lease_held(*self._keys[i][1:], now))
+            and (locked_by is None or self._keys[i][1] == locked_by)
+        ]
+        if locked_by is not None or statuses:
+            # Buckets are in insertion order, which re-putting a changed item disturbs
+            matches.sort(key=lambda i: self._items[i][0])
+        return [self._items[i][1] for i in matches]
+
+    def expired(self, now: str) -> list[T]:
+        """Locked items whose lease ran out by ``now``, soonest first, without a scan."""
+        due: dict[str, str] = {}
+        while self._leases and self._leases[0][0] <= now:
+            expires, project_id = heapq.heappop(self._leases)
+            keys = self._keys.get(project_id)
+            if keys is not None and keys[1] is not None and keys[2] == expires:
+                due[project_id] = expires
+        for project_id, expires in due.items():
+            heapq.heappush(self._leases, (expires, project_id))
+        return [self._items[i][1] for i in due]
+
+
+def index_projects(projects: list[dict[str, Any]]) -> ProjectIndex[dict[str, Any]]:
+    index: ProjectIndex[dict[str, Any]] = ProjectIndex()
+    for p in projects:
+        index.put(p["id"], p["status"], p["locked_by"], p, p.get("lease_expires_at"))
+    return index
+
+
+class RegistryStorage(ABC):
+    """Persistence backend for registry data.
+
+    ``view()`` pins one consistent read for a block without locking anyone out.
+    ``locked()`` additionally takes the exclusive writer lock; it is re-entrant
+    within one storage object, ``commit`` and ``save`` take it themselves, and a
+    caller can hold it across several reads and commits to make one transaction.
+    """
+
+    FILENAME: str
+
+    def __init__(self, registry_dir: str | Path, durability: str = "none") -> None:
+        if durability not in DURABILITY_MODES:
+            raise ValueError(
+                f"Unknown durability mode: {durability} (expected none, file or file+dir)"
+            )
+        self.registry_dir = Path(registry_dir)
+        self.path = self.registry_dir / self.FILENAME
+        self.durability = durability
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._pinned = False
+        self._exclusive = False
+
+    @contextmanager
+    def view(self) -> Iterator[None]:
+        if self._pinned:
+            yield
+            return
+        self._begin(exclusive=False)
+        self._pinned = True
+        try:
+            yield
+        finally:
+            self._pinned = False
+            self._end(exclusive=False, ok=True)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        if self._exclusive:
+            yield
+            return
+        if self._pinned:
+            raise RuntimeError("Cannot take the writer lock inside a read view")
+        self._begin(exclusive=True)
+        self._pinned = self._exclusive = True
+        try:
+            yield
+        except BaseException:
+            self._pinned = self._exclusive = False
+            self._end(exclusive=True, ok=False)
+            raise
+        self._pinned = self._exclusive = False
+        self._end(exclusive=True, ok=True)
+
+    @abstractmethod
+    def _begin(self, exclusive: bool) -> None:
+        """Start a pinned read, also taking the writer lock if ``exclusive``."""
+
+    @abstractmethod
+    def _end(self, exclusive: bool, ok: bool) -> None:
+        """Finish a pinned read; ``ok`` is False when the locked block raised."""
+
+    @abstractmethod
+    def load(self) -> dict[str, Any]:
+        """Return the full registry as ``{"generation", "version", "projects"}``."""
+
+    @abstractmethod
+    def generation(self) -> int:
+        """Return the registry generation, bumped by every commit and save."""
+
+    def stored_generation(self) -> int:
+        """Generation on disk, ignoring any pinned read; cheaper than ``load()``."""
+        return self.generation()
+
+    @property
+    def records_available(self) -> bool:
+        """Whether ``records_since`` can return records at all (a journal exists)."""
+        return False
+
+    def records_since(self, generation: int) -> list[dict[str, Any]] | None:
+        """Mutation records committed after ``generation``, oldest first.
+
+        None when they are no longer available (no journal, or compacted away).
+        """
+        return None
+
+    @abstractmethod
+    def save(self, data: dict[str, Any]) -> None:
+        """Replace the full registry contents."""
+
+    @abstractmethod
+    def commit(self, records: list[dict[str, Any]], expected_generation: int | None = None) -> int:
+        """Apply mutation records atomically and return the new generation.
+
+        Raises GenerationConflict if ``expected_generation`` is given and stale.
+        """
+
+    @abstractmethod
+    def compact(self) -> None:
+        """Fold any pending log into the main store."""
+
+    @abstractmethod
+    def remove(self) -> None:
+        """Delete all files owned by this backend."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release any open handles."""
+
+    @abstractmethod
+    def get(self, project_id: str) -> dict[str, Any] | None:
+        """Return one project, or None if there is no such id."""
+
+    def query(
+        self,
+        statuses: list[str] | None = None,
+        unlocked_only: bool = False,
+        locked_by: str | None = None,
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_query(statuses, unlocked_only, locked_by))
+
+    @abstractmethod
+    def iter_query(
+        self,
+        statuses: list[str] | None = None,
+        unlocked_only: bool = False,
+        locked_by: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield matching projects one at a time, in registry order."""
+
+    def iter_headers(
+        self, statuses: list[str] | None = None, unlocked_only: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        """Yield at least ``id``, ``status``, ``locked_by`` and ``priority`` per match.
+
+        Backends that can skip decoding the text fields return just those keys;
+        the default returns the full project dicts it already has.
+        """
+        return self.iter_query(statuses, unlocked_only)
+
+    def expired_leases(self, now: str | None = None) -> list[dict[str, Any]]:
+        """Locked projects whose lease ran out by ``now``.
+
+        Backends with an expiry index answer without a scan; this default scans.
+        """
+        now = now or utc_timestamp()
+        return [
+            p
+            for p in self.iter_query()
+            if p["locked_by"] is not None
+            and not lease_held(p["locked_by"], p.get("lease_expires_at"), now)
+        ]
+
+
+class JsonFileStorage(RegistryStorage):
+    """Registry stored as one JSON snapshot, optionally with an append-only journal.
+
+    In journaled mode (enabled when the journal file exists next to the snapshot),
+    commits append small records to the journal instead of rewriting the snapshot.
+    Readers replay the journal on top of the snapshot, and the journal is compacted
+    back into a fresh snapshot once it passes a size or record threshold.
+
+    The snapshot is only ever replaced by rename and journal lines carry the
+    generation they produced, so readers take no lock: one that raced with a
+    compaction sees the snapshot change underneath it and simply reads again.
+
+    With ``cache=True`` the last parsed registry is kept in memory and reused until
+    the (inode, size, mtime_ns) identity of the snapshot or journal changes, so
+    repeated reads of an unchanged registry cost a stat instead of a parse.
+
+    Durable journal commits use group commit: a writer appends under the writer
+    lock but fsyncs after releasing it, under a separate sync lock. The first
+    writer there waits ``group_commit_window`` seconds for others to append, then
+    one fsync covers every line written so far, and the writers queued behind it
+    find their generation already synced. Other processes can read a change
+    before it is durable; the committing call only returns once it is.
+    """
+
+    FILENAME = ".digitus-registry.json"
+    JOURNAL_FILENAME = ".digitus-registry.journal"
+    LOCK_FILENAME = ".digitus-registry.lock"
+    SYNC_FILENAME = ".digitus-registry.synced"
+
+    def __init__(
+        self,
+        registry_dir: str | Path,
+        journal_max_bytes: int = 1024 * 1024,
+        journal_max_records: int = 1000,
+        cache: bool = False,
+        durability: str = "none",
+        group_commit_window: float = 0.0,
+    ) -> None:
+        super().__init__(registry_dir, durability)
+        self.journal_path = self.registry_dir / self.JOURNAL_FILENAME
+        self.lock_path = self.registry_dir / self.LOCK_FILENAME
+        # Holds the last generation known to be on disk; flocked by the syncing writer
+        self.sync_path = self.registry_dir / self.SYNC_FILENAME
+        self.group_commit_window = group_commit_window
+        # Journal fsyncs this object did, and commits another writer's fsync covered
+        self.syncs = 0
+        self.shared_syncs = 0
+        # Generation appended under the current writer lock but not yet synced
+        self._unsynced: int | None = None
+        self.journal_max_bytes = journal_max_bytes
+        self.journal_max_records = journal_max_records
+        self.cache = cache
+        self._cached: tuple[CacheKey, dict[str, Any]] = ((None, None), {})
+        self._lock_file: IO[str] | None = None
+        # Registry as last read or written here, reused while a view is pinned
+        self._last: dict[str, Any] | None = None
+        self._held = False
+        self._indexed: tuple[dict[str, Any] | None, ProjectIndex[dict[str, Any]]] = (
+            None,
+            ProjectIndex(),
+        )
+
+    def _begin(self, exclusive: bool) -> None:
+        if exclusive:
+            import fcntl
+
+            self.registry_dir.mkdir(parents=True, exist_ok=True)
+            self._lock_file = open(self.lock_path, "a")  # noqa: SIM115 - held across calls
+            with span("lock.wait", backend="json"):
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _end(self, exclusive: bool, ok: bool) -> None:
+        self._held = False
+        if exclusive:
+            import fcntl
+
+            assert self._lock_file is not None
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+            if self._unsynced is not None:
+                generation, self._unsynced = self._unsynced, None
+                self._group_sync(generation)
+
+    def _group_sync(self, generation: int) -> None:
+        """Return once the journal is on disk through ``generation``."""
+        import fcntl
+
+        with open(self.sync_path, "a+") as marker:
+            with span("group_commit.wait"):
+                fcntl.flock(marker.fileno(), fcntl.LOCK_EX)
+            marker.seek(0)
+            if int(marker.read() or 0) >= generation:
+                self.shared_syncs += 1
+                return
+            if self.group_commit_window:
+                time.sleep(self.group_commit_window)
+            try:
+                with open(self.journal_path, "rb") as f:
+                    synced = self._stored_generation(f.read())
+                    with span("journal.fsync"):
+                        os.fsync(f.fileno())
+            except FileNotFoundError:
+                # Journal turned off meanwhile; its lines went into a synced snapshot
+                synced = self.stored_generation()
+            self.syncs += 1
+            marker.truncate(0)
+            marker.write(str(synced))
+
+    @property
+    def journaled(self) -> bool:
+        return self.journal_path.exists()
+
+    def _read_snapshot(self) -> tuple[dict[str, Any], FileIdentity | None]:
+        """Return the snapshot and the identity of the file it came from."""
+        try:
+            with open(self.path) as f:
+                stat = os.fstat(f.fileno())
+                identity = file_identity(stat)
+                with span("json.parse", bytes=stat.st_size):
+                    data = cast(dict[str, Any], json.load(f))
+        except FileNotFoundError:
+            data, identity = {}, None
+        data.setdefault("generation", 0)
+        data.setdefault("version", REGISTRY_VERSION)
+        data.setdefault("projects", [])
+        return data, identity
+
+    def _write_snapshot(self, data: dict[str, Any], sync: bool = False) -> None:
+        """Atomically replace the snapshot; ``sync`` forces file and directory fsyncs."""
+        self.registry_dir.mkdir(parents=True, exist_ok=True)
+        # Generation first, so writers can read it from the head of the file
+        data = {"generation": data["generation"], "version": data["version"], **data}
+        import tempfile
+
+        with span("json.serialize") as serialize:
+            text = json.dumps(data, indent=2)
+            serialize.set(bytes=len(text))
+        # Atomic write: write to temp file, then rename
+        fd, tmp_path = tempfile.mkstemp(dir=self.registry_dir, prefix=".registry-", suffix=".tmp")
+        try:
+            with span("snapshot.write", bytes=len(text)), os.fdopen(fd, "w") as f:
+                f.write(text)
+                f.flush()
+                if sync or self.durability != "none":
+                    os.fsync(f.fileno())
+                written = os.fstat(f.fileno())
+            with span("snapshot.rename"):
+                Path(tmp_path).rename(self.path)
+                if sync or self.durability == "file+dir":
+                    fsync_dir(self.registry_dir)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._last = data
+        if self.cache and not self.journaled:
+            # rename keeps inode, size and mtime, so our own write stays cached
+            self._cached = ((file_identity(written), None), data)
+
+    def load(self) -> dict[str, Any]:
+        if self._held and self._last is not None:
+            return self._last
+        data = self._load_cached() if self.cache else self._read()
+        self._last = data
+        self._held = self._pinned
+        return data
+
+    def _index(self, data: dict[str, Any]) -> ProjectIndex[dict[str, Any]] | None:
+        """Index the loaded registry, but only when later reads will reuse it."""
+        if not (self._held or self.cache):
+            return None
+        if self._indexed[0] is not data:
+            self._indexed = (data, index_projects(data["projects"]))
+        return self._indexed[1]
+
+    def get(self, project_id: str) -> dict[str, Any] | None:
+        data = self.load()
+        index = self._index(data)
+        return index.get(project_id) if index else find_project(data["projects"], project_id)
+
+    def iter_query(
+        self,
+        statuses: list[str] | None = None,
+        unlocked_only: bool = False,
+        locked_by: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        data = self.load()
+        index = self._index(data)
+        if index is None:
+            return filter_projects(data["projects"], statuses, unlocked_only, locked_by)
+        return iter(index.find(statuses, unlocked_only, locked_by))
+
+    def expired_leases(self, now: str | None = None) -> list[dict[str, Any]]:
+        index = self._index(self.load())
+        if index is None:
+            return super().expired_leases(now)
+        return index.expired(now or utc_timestamp())
+
+    def _load_cached(self) -> dict[str, Any]:
+        key = (stat_identity(self.path), stat_identity(self.journal_path))
+        if key[0] is not None and key == self._cached[0]:
+            self.cache_hits += 1
+            return self._cached[1]
+        self.cache_misses += 1
+        data = self._read()
+        self._cached = (key, data)
+        return data
+
+    def _read(self) -> dict[str, Any]:
+        if not self.journaled:
+            return self._read_snapshot()[0]
+        while True:
+            data, identity = self._read_snapshot()
+            try:
+                raw = self.journal_path.read_bytes()
+            except FileNotFoundError:
+                raw = b""
+            # A compaction that swapped the snapshot meanwhile may have truncated the journal
+            if stat_identity(self.path) == identity:
+                break
+        # Lines folded into the snapshot can linger until compaction truncates them
+        base = data["generation"]
+        with span("journal.replay", bytes=len(raw)) as replay:
+            records = [r for r in parse_journal(raw) if r.get("gen", base + 1) > base]
+            data["projects"] = replay_journal(data["projects"], records)
+            replay.set(records=len(records))
+        data["generation"] = max([base, *(r.get("gen", 0) for r in records)])
+        return data
+
+    def generation(self) -> int:
+        return int(self.load()["generation"])
+
+    def _stored_generation(self, journal: bytes) -> int:
+        """Generation on disk, read without parsing the whole snapshot."""
+        try:
+            with open(self.path, "rb") as f:
+                match = re.match(rb'\{\s*"generation":\s*(\d+)', f.read(64))
+        except FileNotFoundError:
+            match = None
+        # Snapshots from before generations existed need a full parse
+        generation = int(match.group(1) if match else self._read_snapshot()[0]["generation"])
+        for record in reversed(parse_journal(journal)):
+            if "gen" in record:
+                return max(generation, int(record["gen"]))
+        return generation
+
+    def stored_generation(self) -> int:
+        return self._stored_generation(self._read_journal())
+
+    @property
+    def records_available(self) -> bool:
+        return self.journaled
+
+    def records_since(self, generation: int) -> list[dict[str, Any]] | None:
+        if not self.journaled:
+            return None
+        while True:
+            identity = stat_identity(self.path)
+            base = self._stored_generation(b"")
+            raw = self._read_journal()
+            if stat_identity(self.path) == identity:
+                break
+        if base > generation:
+            return None
+        return [r for r in parse_journal(raw) if r.get("gen", 0) > generation]
+
+    def _read_journal(self) -> bytes:
+        return self.journal_path.read_bytes() if self.journaled else b""
+
+    def save(self, data: dict[str, Any]) -> None:
+        with self.locked():
+            stored = self.stored_generation()
+            generation = max(stored, data.get("generation", 0)) + 1
+            journaled = self.journaled
+            self._write_snapshot({**data, "generation": generation}, sync=journaled)
+            self._held = True
+            if journaled:
+                self.journal_path.write_bytes(b"")
+
+    def commit(self, records: list[dict[str, Any]], expected_generation: int | None = None) -> int:
+        with self.locked():
+            journal = self._read_journal()
+            if journal and not journal.endswith(b"\n"):
+                # A crashed append left a torn line; appending after it would bury it mid-file
+                journal = journal[: journal.rfind(b"\n") + 1]
+                os.truncate(self.journal_path, len(journal))
+            current = self._stored_generation(journal)
+            if expected_generation is not None and expected_generation != current:
+                raise GenerationConflict(expected_generation, current)
+
+            if not self.journaled:
+                # Generations are never reused, so a matching one means _last is current
+                data = self._last
+                if data is None or data["generation"] != current:
+                    data = self._read()
+                projects = replay_journal(data["projects"], records)
+                self._write_snapshot({**data, "generation": current + 1, "projects": projects})
+                self._held = True
+                return current + 1
+
+            self._held = False
+            # One line per commit, so a torn append drops the whole batch
+            record = records[0] if len(records) == 1 else {"op": "batch", "records": records}
+            line = json.dumps({**record, "gen": current + 1}, separators=(",", ":")).encode()
+            with span("journal.append", bytes=len(line) + 1), open(self.journal_path, "ab") as f:
+                f.write(line + b"\n")
+            if self.durability != "none":
+                self._unsynced = current + 1
+            if (
+                len(journal) + len(line) + 1 >= self.journal_max_bytes
+                or journal.count(b"\n") + 1 >= self.journal_max_records
+            ):
+                self._compact_locked()
+            return current + 1
+
+    def _compact_locked(self) -> None:
+        """Fold the journal into a fresh snapshot. Caller holds the writer lock.
+
+        The snapshot and its rename are synced in every durability mode before the
+        journal is truncated; otherwise a crash could bring back the old snapshot
+        next to an empty journal and lose records that had already been fsynced.
+        """
+        self._write_snapshot(self._read(), sync=True)
+        self.journal_path.write_bytes(b"")
+
+    def compact(self) -> None:
+        if not self.journaled:
+            return
+        with self.locked():
+            self._compact_locked()
+
+    def enable_journal(self) -> None:
+        with self.locked():
+            self.journal_path.touch()
+            if self.durability == "file+dir":
+                fsync_dir(self.registry_dir)
+
+    def disable_journal(self) -> None:
+        with self.locked():
+            self.compact()
+            self.journal_path.unlink(missing_ok=True)
+
+    def remove(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.journal_path.unlink(missing_ok=True)
+        self.lock_path.unlink(missing_ok=True)
+        self.sync_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Nothing to release: every operation opens and closes its own files."""
+
+
+class SqliteStorage(RegistryStorage):
+    """Registry stored in a SQLite database in WAL mode.
+
+    Each project is one row holding its JSON, with ``id``, ``status`` and
+    ``locked_by`` mirrored into indexed columns so point lookups, filtered
+    listing and lock-owner queries avoid full scans.
+    """
+
+    FILENAME = ".digitus-registry.db"
+    # In WAL mode NORMAL syncs only at checkpoints; FULL syncs the WAL on every
+    # commit, and EXTRA also syncs the directory
+    SYNCHRONOUS = {"none": "NORMAL", "file": "FULL", "file+dir": "EXTRA"}
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS projects (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            status TEXT NOT NULL,
+            locked_by TEXT,
+            data TEXT NOT NULL,
+            lease_expires TEXT
+        );
+        CREATE INDEX IF NOT EXISTS projects_status ON projects (status, locked_by);
+        CREATE INDEX IF NOT EXISTS projects_locked_by ON projects (locked_by);
+    """
+
+    def __init__(self, registry_dir: str | Path, durability: str = "none") -> None:
+        super().__init__(registry_dir, durability)
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+
+            self.registry_dir.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode; views and writes open explicit transactions
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.SYNCHRONOUS[self.durability]}")
+            conn.executescript(self.SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+            if "lease_expires" not in columns:
+                # Databases from before leases; their locks have no expiry
+                with suppress(sqlite3.OperationalError):  # another process added it first
+                    conn.execute("ALTER TABLE projects ADD COLUMN lease_expires TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS projects_lease ON projects (lease_expires)")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _begin(self, exclusive: bool) -> None:
+        # A deferred BEGIN still reads from one WAL snapshot until it ends
+        if not exclusive:
+            self._connect().execute("BEGIN")
+            return
+        with span("lock.wait", backend="sqlite"):
+            self._connect().execute("BEGIN IMMEDIATE")
+
+    def _end(self, exclusive: bool, ok: bool) -> None:
+        statement = "COMMIT" if ok else "ROLLBACK"
+        if not exclusive:
+            self._connect().execute(statement)
+            return
+        with span("sqlite.commit", ok=ok):
+            self._connect().execute(statement)
+
+    def _meta(self, key: str) -> str | None:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return cast(str, row[0]) if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def _upsert(self, conn: "sqlite3.Connection", project: dict[str, Any]) -> None:
+        locked_by = project["locked_by"]
+        lease = project.get("lease_expires_at") if locked_by is not None else None
+        conn.execute(
+            "INSERT INTO projects (id, status, locked_by, data, lease_expires) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+            "status = excluded.status, locked_by = excluded.locked_by, data = excluded.data, "
+            "lease_expires = excluded.lease_expires",
+            (project["id"], project["status"], locked_by, json.dumps(project), lease),
+        )
+
+    def load(self) -> dict[str, Any]:
+        with self.view():
+            rows = self._connect().execute("SELECT data FROM projects ORDER BY seq").fetchall()
+            return {
+                "generation": self.generation(),
+                "version": self._meta("version") or REGISTRY_VERSION,
+                "projects": [json.loads(r[0]) for r in rows],
+            }
+
+    def generation(self) -> int:
+        return int(self._meta("generation") or 0)
+
+    def save(self, data: dict[str, Any]) -> None:
+        conn = self._connect()
+        with self.locked():
+            generation = max(self.generation(), data.get("generation", 0)) + 1
+            self._set_meta("generation", str(generation))
+            self._set_meta("version", data.get("version", REGISTRY_VERSION))
+            conn.execute("DELETE FROM projects")
+            for project in data.get("projects", []):
+                self._upsert(conn, project)
+
+    def commit(self, records: list[dict[str, Any]], expected_generation: int | None = None) -> int:
+        conn = self._connect()
+        with self.locked():
+            current = self.generation()
+            if expected_generation is not None and expected_generation != current:
+                raise GenerationConflict(expected_generation, current)
+            for record in records:
+                op = record["op"]
+                if op == "put":
+                    self._upsert(conn, record["project"])
+                elif op == "patch":
+                    row = conn.execute(
+                        "SELECT data FROM projects WHERE id = ?", (record["id"],)
+                    ).fetchone()
+                    if row is not None:
+                        self._upsert(conn, {**json.loads(row[0]), **record["fields"]})
+                elif op == "delete":
+                    conn.execute("DELETE FROM projects WHERE id = ?", (record["id"],))
+                else:
+                    raise ValueError(f"Unknown journal op: {op}")
+            self._set_meta("generation", str(current + 1))
+            return current + 1
+
+    def compact(self) -> None:
+        self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def remove(self) -> None:
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{self.path}{suffix}").unlink(missing_ok=True)
+
+    def get(self, project_id: str) -> dict[str, Any] | None:
+        row = (
+            self._connect()
+            .execute("SELECT data FROM projects WHERE id = ?", (project_id,))
+            .fetchone()
+        )
+        return cast(dict[str, Any], json.loads(row[0])) if row else None
+
+    def iter_query(
+        self,
+        statuses: list[str] | None = None,
+        unlocked_only: bool = False,
+        locked_by: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        clauses: list[str] = []
+        params: list[str] = []
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if unlocked_only:
+            clauses.append("(locked_by IS NULL OR lease_expires <= ?)")
+            params.append(utc_timestamp())
+        if locked_by is not None:
+            clauses.append("locked_by = ?")
+            params.append(locked_by)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(f"SELECT data FROM projects{where} ORDER BY seq", params)
+        for row in rows:
+            yield json.loads(row[0])
+
+    def iter_headers(
+        self, statuses: list[str] | None = None, unlocked_only: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        clauses: list[str] = []
+        params: list[str] = []
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if unlocked_only:
+            clauses.append("(locked_by IS NULL OR lease_expires <= ?)")
+            params.append(utc_timestamp())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            "SELECT id, status, locked_by, lease_expires, "
+            "json_extract(data, '$.priority.urgency'), "
+            f"json_extract(data, '$.priority.difficulty') FROM projects{where} ORDER BY seq",
+            params,
+        )
+        for project_id, status, locked_by, lease, urgency, difficulty in rows:
+            yield {
+                "id": project_id,
+                "status": status,
+                "locked_by": locked_by,
+                "lease_expires_at": lease,
+                "priority": {"urgency": urgency, "difficulty": difficulty},
+            }
+
+    def expired_leases(self, now: str | None = None) -> list[dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT data FROM projects WHERE lease_expires <= ? AND locked_by IS NOT NULL "
+            "ORDER BY lease_expires",
+            (now or utc_timestamp(),),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+
+class ShardedStorage(RegistryStorage):
+    """Registry split by id hash across N JSON shards, each with its own lock.
+
+    Every shard is a ``JsonFileStorage`` in its own directory, so a write locks and
+    rewrites only the shards it touches, and writers to different shards never wait
+    on each other. Listing fans out across shards and merges by ``created_at``
+    (then id), so projects created within the same second come back in id order.
+
+    ``generation()`` is the sum of the shard generations. For ``commit`` with an
+    expected generation, each touched shard is checked against the generation it
+    had when last read in a view, so unrelated shards changing is not a conflict.
+    A commit that spans several shards holds all their locks, but a crash midway
+    can leave it applied to only some of them.
+    """
+
+    FILENAME = ".digitus-registry.shards"
+    META_FILENAME = "shards.json"
+    DEFAULT_SHARDS = 16
+
+    def __init__(
+        self,
+        registry_dir: str | Path,
+        shards: int | None = None,
+        cache: bool = False,
+        durability: str = "none",
+        group_commit_window: float = 0.0,
+    ) -> None:
+        super().__init__(registry_dir, durability)
+        self.meta_path = self.path / self.META_FILENAME
+        if self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text())
+            self.version: str = meta["version"]
+            count: int = meta["shards"]
+        else:
+            self.version = REGISTRY_VERSION
+            count = shards or self.DEFAULT_SHARDS
+        self.shards = [
+            JsonFileStorage(
+                self.path / f"{i:02d}",
+                cache=cache,
+                durability=durability,
+                group_commit_window=group_commit_window,
+            )
+            for i in range(count)
+        ]
+        self._stack: ExitStack | None = None
+        # Generation of each shard as read inside the current or last view
+        self._observed: dict[int, int] = {}
+
+    def shard_index(self, project_id: str) -> int:
+        return zlib.crc32(project_id.encode()) % len(self.shards)
+
+    def _write_meta(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = {"version": self.version, "shards": len(self.shards)}
+        self.meta_path.write_text(json.dumps(meta) + "\n")
+
+    def _begin(self, exclusive: bool) -> None:
+        if not exclusive:
+            self._observed = {}
+        self._stack = ExitStack()
+        # Fixed order, so two writers locking several shards cannot deadlock
+        for shard in self.shards:
+            self._stack.enter_context(shard.locked() if exclusive else shard.view())
+
+    def _end(self, exclusive: bool, ok: bool) -> None:
+        assert self._stack is not None
+        self._stack.close()
+        self._stack = None
+
+    def _observe(self, index: int) -> JsonFileStorage:
+        shard = self.shards[index]
+        if self._pinned:
+            self._observed[index] = shard.generation()
+        return shard
+
+    def load(self) -> dict[str, Any]:
+        return {
+            "generation": self.generation(),
+            "version": self.version,
+            "projects": list(self.iter_query()),
+        }
+
+    def generation(self) -> int:
+        return sum(shard.stored_generation() for shard in self.shards)
+
+    def save(self, data: dict[str, Any]) -> None:
+        parts: list[list[dict[str, Any]]] = [[] for _ in self.shards]
+        for project in data.get("projects", []):
+            parts[self.shard_index(project["id"])].append(project)
+        with self.locked():
+            self.version = data.get("version", REGISTRY_VERSION)
+            self._write_meta()
+            for shard, projects in zip(self.shards, parts, strict=True):
+                shard.save({"version": self.version, "projects": projects})
+
+    def commit(self, records: list[dict[str, Any]], expected_generation: int | None = None) -> int:
+        groups: dict[int, list[dict[str, Any]]] = {}
+        for record in records:
+            project_id = record["project"]["id"] if record["op"] == "put" else record["id"]
+            groups.setdefault(self.shard_index(project_id), []).append(record)
+        with ExitStack() as stack:
+            if not self.meta_path.exists():
+                self._write_meta()
+            for index in sorted(groups):
+                stack.enter_context(self.shards[index].locked())
+            for index in groups if expected_generation is not None else ():
+                seen = self._observed.get(index)
+                actual = self.shards[index].stored_generation()
+                if seen is not None and seen != actual:
+                    raise GenerationConflict(seen, actual)
+            for index, group in groups.items():
+                self.shards[index].commit(group)
+        return self.generation()
+
+    def compact(self) -> None:
+        for shard in self.shards:
+            shard.compact()
+
+    def remove(self) -> None:
+        import shutil
+
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def close(self) -> None:
+        """Nothing to release: shards open and close their own files."""
+
+    def get(self, project_id: str) -> dict[str, Any] | None:
+        return self._observe(self.shard_index(project_id)).get(project_id)
+
+    def iter_query(
+        self,
+        statuses: list[str] | None = None,
+        unlocked_only: bool = False,
+        locked_by: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        matches = [
+            p
+            for index in range(len(self.shards))
+            for p in self._observe(index).iter_query(statuses, unlocked_only, locked_by)
+        ]
+        matches.sort(key=lambda p: (p["created_at"], p["id"]))
+        return iter(matches)
+
+    def expired_leases(self, now: str | None = None) -> list[dict[str, Any]]:
+        now = now or utc_timestamp()
+        expired = [p for shard in self.shards for p in shard.expired_leases(now)]
+        expired.sort(key=lambda p: p["lease_expires_at"])
+        return expired
+
+
+class BlobStore:
+    """Content-addressed text bodies kept out of line, one file per distinct text.
+
+    ``pack`` swaps long string fields for ``{"blob": sha256, "length": n}`` so
+    registry writes carry only the reference; ``unpack`` reads them back on demand.
+    Identical texts share one blob, and short ones stay inline.
+    """
+
+    DIRNAME = ".digitus-blobs"
+
+    def __init__(
+        self, registry_dir: str | Path, min_length: int = 256, durability: str = "none"
+    ) -> None:
+        self.root = Path(registry_dir) / self.DIRNAME
+        self.min_length = min_length
+        # Same modes as the storage: blobs must be durable before records point at them
+        self.durability = durability
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, text: str) -> dict[str, Any]:
+        import hashlib
+        import tempfile
+
+        raw = text.encode()
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            # Refresh the mtime so gc() treats a re-referenced blob as new
+            os.utime(path)
+        else:
+            created = not path.parent.exists()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".blob-", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(raw)
+                if self.durability != "none":
+                    f.flush()
+                    os.fsync(f.fileno())
+            Path(tmp_path).rename(path)
+            if self.durability == "file+dir":
+                fsync_dir(path.parent)
+                if created:
+                    fsync_dir(self.root)
+        return {"blob": digest, "length": len(text)}
+
+    def get(self, ref: dict[str, Any]) -> str:
+        return self.path(ref["blob"]).read_bytes().decode()
+
+    def pack(self, data: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+        """Return ``data`` with each long string in ``fields`` replaced by a blob ref."""
+        long = [
+            f for f in fields if isinstance(data.get(f), str) and len(data[f]) >= self.min_length
+        ]
+        return {**data, **{f: self.put(data[f]) for f in long}} if long else data
+
+    def unpack(self, data: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+        """Return ``data`` with each blob ref in ``fields`` replaced by its text."""
+        refs = [f for f in fields if isinstance(data.get(f), dict)]
+        return {**data, **{f: self.get(data[f]) for f in refs}} if refs else data
+
+    def gc(self, referenced: set[str], grace: float = 3600.0) -> int:
+        """Delete blobs not in ``referenced`` and untouched for ``grace`` seconds.
+
+        The grace period covers writers that stored a blob but have not committed
+        the record referring to it yet.
+        """
+        cutoff = time.time() - grace
+        removed = 0
+        for path in self.root.glob("*/*"):
+            if path.name not in referenced and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def fsync_dir(path: Path) -> None:
+    """Flush ``path``'s entries, so files renamed or created in it survive a crash."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_identity(st: os.stat_result) -> FileIdentity:
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def stat_identity(path: Path) -> FileIdentity | None:
+    try:
+        return file_identity(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def find_project(projects: list[dict[str, Any]], project_id: str) -> dict[str, Any] | None:
+    return next((p for p in projects if p["id"] == project_id), None)
+
+
+def utc_timestamp(offset: float = 0.0) -> str:
+    """UTC time ``offset`` seconds from now, in the registry's sortable ISO form."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + offset))
+
+
+def lease_held(locked_by: str | None, lease_expires_at: str | None, now: str) -> bool:
+    """Whether a lock is in force: taken, and with no lease or one not yet run out."""
+    return locked_by is not None and (lease_expires_at is None or lease_expires_at > now)
+
+
+def filter_projects(
+    projects: list[dict[str, Any]],
+    statuses: list[str] | None = None,
+    unlocked_only: bool = False,
+    locked_by: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    now = utc_timestamp()
+    for p in projects:
+        if statuses and p["status"] not in statuses:
+            continue
+        if unlocked_only and lease_held(p["locked_by"], p.get("lease_expires_at"), now):
+            continue
+        if locked_by is not None and p["locked_by"] != locked_by:
+            continue
+        yield p
+
+
+STORAGE_BACKENDS: dict[str, type[RegistryStorage]] = {
+    "json": JsonFileStorage,
+    "sqlite": SqliteStorage,
+    "sharded": ShardedStorage,
+}
+
+
+def open_storage(
+    registry_dir: str | Path,
+    cache: bool = False,
+    durability: str = "none",
+    group_commit_window: float = 0.0,
+) -> RegistryStorage:
+    """Open the backend whose files are present in registry_dir (JSON by default).
+
+    ``cache`` and ``group_commit_window`` apply to the JSON backends; SQLite serves
+    reads from its own page cache and syncs each commit itself.
+    """
+    registry_dir = Path(registry_dir)
+    if (registry_dir / SqliteStorage.FILENAME).exists():
+        return SqliteStorage(registry_dir, durability)
+    if (registry_dir / ShardedStorage.FILENAME).is_dir():
+        return ShardedStorage(
+            registry_dir,
+            cache=cache,
+            durability=durability,
+            group_commit_window=group_commit_window,
+        )
+    return JsonFileStorage(
+        registry_dir, cache=cache, durability=durability, group_commit_window=group_commit_window
+    )
+
+
+def parse_journal(raw: bytes) -> list[dict[str, Any]]:
+    """Decode journal records, ignoring a torn final line from an interrupted append."""
+    lines = raw.split(b"\n")
+    return [cast(dict[str, Any], json.loads(line)) for line in lines[:-1] if line]
+
+
+def replay_journal(
+    projects: list[dict[str, Any]], records: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Apply mutation records to project dicts.
+
+    Records are last-writer-wins per project, so replaying a record twice is harmless.
+    """
+    slots: list[dict[str, Any] | None] = list(projects)
+    index = {p["id"]: i for i, p in enumerate(projects)}
+    pending = list(reversed(records))
+    while pending:
+        record = pending.pop()
+        op = record["op"]
+        if op == "batch":
+            pending.extend(reversed(record["records"]))
+        elif op == "put":
+            project = record["project"]
+            if project["id"] in index:
+                slots[index[project["id"]]] = project
+            else:
+                index[project["id"]] = len(slots)
+                slots.append(project)
+        elif op == "patch":
+            i = index.get(record["id"])
+            if i is not None:
+                slots[i] = {**cast(dict[str, Any], slots[i]), **record["fields"]}
+        elif op == "delete":
+            i = index.pop(record["id"], None)
+            if i is not None:
+                slots[i] = None
+        else:
+            raise ValueError(f"Unknown journal op: {op}")
+    return [p for p in slots if p is not None]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Opt-in phase tracing for the registry and project scripts.
+
+Set ``DIGITUS_TRACE=/path/trace.jsonl`` and every ``span`` appends one line,
+``{"span": name, "ms": duration, "pid": pid, ...attrs}``, when it ends. Spans that
+raise also carry ``"error"``. Without the variable, ``span`` hands back a shared
+no-op, so untraced runs pay one environment lookup per phase.
+``registry.py trace-summary`` aggregates a trace file per span.
+"""
+
+import json
+import os
+import time
+from collections.abc import Iterable
+from types import TracebackType
+from typing import Any
+
+TRACE_ENV = "DIGITUS_TRACE"
+
+
+class Span:
+    __slots__ = ("name", "path", "attrs", "start")
+
+    def __init__(self, name: str, path: str, attrs: dict[str, Any]) -> None:
+        self.name = name
+        self.path = path
+        self.attrs = attrs
+        self.start = 0.0
+
+    def set(self, **attrs: Any) -> None:
+        """Attach sizes or counts learned while the span runs."""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        ms = (time.perf_counter() - self.start) * 1000
+        record = {"span": self.name, "ms": round(ms, 4), "pid": os.getpid(), **self.attrs}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        # One short O_APPEND write per span, so concurrent processes never interleave
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+_NULL = _NullSpan()
+
+
+def trace_file() -> str | None:
+    """The trace file from ``DIGITUS_TRACE``, or None when tracing is off."""
+    return os.environ.get(TRACE_ENV) or None
+
+
+def span(name: str, **attrs: Any) -> Span | _NullSpan:
+    """Time the ``with`` block as phase ``name`` if tracing is enabled."""
+    path = trace_file()
+    return Span(name, path, attrs) if path else _NULL
+
+
+def summarize(lines: Iterable[str]) -> dict[str, dict[str, float]]:
+    """Per-span count, total and percentiles (ms) from trace lines, slowest total first."""
+    import statistics
+
+    durations: dict[str, list[float]] = {}
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            durations.setdefault(record["span"], []).append(record["ms"])
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+
+        def at(fraction: float, values: list[float] = values) -> float:
+            return values[min(len(values) - 1, int(len(values) * fraction))]
+
+        summary[name] = {
+            "count": len(values),
+            "total_ms": round(sum(values), 3),
+            "p50_ms": round(statistics.median(values), 3),
+            "p90_ms": round(at(0.9), 3),
+            "p99_ms": round(at(0.99), 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return dict(sorted(summary.items(), key=lambda item: -item[1]["total_ms"]))
+
+
+def format_summary(summary: dict[str, dict[str, float]]) -> str:
+    header = f"{'span':<24} {'count':>7} {'total':>10} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+    rows = [
+        f"{name:<24} {s['count']:>7} {s['total_ms']:>10.3f} {s['p50_ms']:>9.3f}"
+        f" {s['p90_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['max_ms']:>9.3f}"
+        for name, s in summary.items()
+    ]
+    return "\n".join([header, *rows])
@@ -3,12 +3,8 @@
 
 import os
 import sys
-from pathlib import Path
-
-# Add scripts directory to path for imports
-scripts_dir = Path(__file__).parent
-sys.path.insert(0, str(scripts_dir))
 
+# Run as a script, so this directory is already first on sys.path
 from registry import RegistryManager, get_registry_dir
 
 
@@ -0,0 +1,80 @@
+"""Tests for batch module - 100% coverage required."""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from batch import run_batch
+
+
+def echo(argv: list[str]) -> None:
+    if argv[1] == "fail":
+        print("it broke", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps({"argv": argv, "stdin": sys.stdin.read()}))
+
+
+def upper(argv: list[str]) -> None:
+    print(" ".join(argv[1:]).upper())
+
+
+def run(*lines: str) -> tuple[int, list[dict]]:
+    out = io.StringIO()
+    failed = run_batch(lines, {"echo": echo, "upper": upper}, "echo", out)
+    return failed, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+class TestRunBatch:
+    def test_one_result_per_command(self) -> None:
+        failed, results = run(
+            '{"argv": ["a", "b"]}',
+            "",
+            '{"tool": "upper", "argv": ["x"], "stdin": "ignored"}',
+            '{"argv": ["c"], "stdin": {"status": "paused"}}',
+        )
+        assert failed == 0
+        assert results == [
+            {"code": 0, "result": {"argv": ["echo.py", "a", "b"], "stdin": ""}},
+            {"code": 0, "result": "X"},
+            {"code": 0, "result": {"argv": ["echo.py", "c"], "stdin": '{"status": "paused"}'}},
+        ]
+
+    def test_references_earlier_output(self) -> None:
+        _, results = run(
+            '{"tool": "upper", "argv": ["dir"]}',
+            '{"argv": ["{{1}}/x"], "stdin": "at {{1}}"}',
+        )
+        assert results[1]["result"] == {"argv": ["echo.py", "DIR/x"], "stdin": "at DIR"}
+
+    def test_references_json_fields(self) -> None:
+        failed, results = run(
+            '{"argv": ["a"], "stdin": "s"}',
+            '{"tool": "upper", "argv": ["{{1.stdin}}", "{{1.argv}}"]}',
+            '{"argv": ["{{1.argv.0}}"]}',
+            '{"argv": ["{{1.missing}}"]}',
+        )
+        assert results[1]["result"] == 'S ["ECHO.PY", "A"]'
+        assert "{{1.argv.0}}: no such field" in results[2]["error"]
+        assert "{{1.missing}}: no such field" in results[3]["error"]
+        assert failed == 2
+
+    def test_failures_are_reported_and_propagate(self) -> None:
+        failed, results = run(
+            '{"argv": ["fail"]}',
+            '{"argv": ["{{1}}"]}',
+            '{"argv": ["{{9}}"]}',
+            '{"tool": "nope", "argv": []}',
+            "[1]",
+            "not json",
+            '{"argv": ["ok"]}',
+        )
+        assert failed == 6
+        assert results[0] == {"code": 2, "result": "", "error": "it broke"}
+        assert results[1]["error"] == "Bad batch command: command 1 failed"
+        assert "{{9}} does not refer to an earlier command" in results[2]["error"]
+        assert "unknown tool 'nope'" in results[3]["error"]
+        assert all(r["error"].startswith("Bad batch command") for r in results[4:6])
+        assert results[6]["code"] == 0
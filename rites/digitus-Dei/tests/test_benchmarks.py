@@ -0,0 +1,195 @@
+"""Smoke tests for the benchmark suite in benchmarks/."""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from bench_registry import main, regressions, run
+from registry import Priority, Project, RegistryManager, Status
+from simulate_policy import POLICIES, load_backlog, run_once, simulate
+from simulate_policy import main as simulate_main
+from stress_registry import main as stress_main
+from stress_registry import stress, summarize, worker
+from synthetic import populate, synthetic_projects
+
+OPS = ["load", "save", "get", "update", "list", "unlock_all_by_worker", "weighted_random_select"]
+
+
+@pytest.fixture(scope="module")
+def report() -> dict:
+    return run([10])
+
+
+class TestSynthetic:
+    def test_realistic_shape(self) -> None:
+        projects = synthetic_projects(400, seed=1)
+        assert len({p.id for p in projects}) == 400
+        assert {p.status for p in projects} == set(Status)
+        assert all(200 <= len(p.spec) <= 8000 for p in projects)
+        assert any(p.locked_by for p in projects)
+        assert synthetic_projects(400, seed=1)[-1].to_dict() == projects[-1].to_dict()
+
+    @pytest.mark.parametrize("backend", ["json", "sqlite", "sharded"])
+    def test_populate(self, backend: str) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            populate(Path(d), 20, backend)
+            manager = RegistryManager(d)
+            assert len(manager.list()) == 20
+            manager.storage.close()
+
+
+class TestBench:
+    def test_report(self, report: dict) -> None:
+        assert [r["op"] for r in report["results"]] == OPS
+        for result in report["results"]:
+            assert result["size"] == 10
+            assert 0 <= result["p50_ms"] <= result["p99_ms"]
+            assert result["peak_kib"] > 0
+        assert report["meta"]["backend"] == "json"
+
+    def test_regressions(self, report: dict) -> None:
+        assert regressions(report, report, 0.25) == []
+        faster = json.loads(json.dumps(report))
+        for result in faster["results"]:
+            result["p50_ms"] = result["p50_ms"] / 10
+        slow = [r for r in report["results"] if r["p50_ms"] - r["p50_ms"] / 10 > 0.05]
+        assert len(regressions(report, faster, 0.25)) == len(slow) > 0
+        assert regressions(report, {"results": []}, 0.25) == []
+
+    def test_main(self, report: dict, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps(report))
+        with patch("bench_registry.run", return_value=report):
+            assert main(["--sizes=10", f"--baseline={baseline}"]) == 0
+            assert json.loads(capsys.readouterr().out) == report
+            faster = {"results": [{**r, "p50_ms": 0.0} for r in report["results"]]}
+            baseline.write_text(json.dumps(faster))
+            output = tmp_path / "out.json"
+            assert main([f"--output={output}", f"--baseline={baseline}"]) == 1
+        assert json.loads(output.read_text()) == report
+        assert "REGRESSION" in capsys.readouterr().err
+        with patch("bench_registry.run", return_value=report) as bench:
+            assert main(["--backend=sqlite"]) == 0
+        bench.assert_called_once_with([10, 1000, 100000], "sqlite")
+
+
+class TestStress:
+    def test_atomic_updates_survive(self) -> None:
+        report = stress(workers=2, duration=0.3, projects=2, atomic=True)
+        assert report["workers"] == 2
+        assert report["updates"] > 0
+        assert report["lost_updates"] == 0
+        assert report["errors"] == 0
+        assert report["ops_per_s"] > 0
+
+    def test_durable_journal(self) -> None:
+        report = stress(
+            workers=2, duration=0.3, projects=2, atomic=True, journal=True, durability="file"
+        )
+        assert report["updates"] > 0
+        assert report["lost_updates"] == 0
+        assert (report["journal"], report["durability"]) == (True, "file")
+
+    def test_worker_gives_up_at_deadline(self, tmp_path: Path) -> None:
+        manager = RegistryManager(tmp_path)
+        project = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        manager.lock(project.id, "someone-else")
+        start = time.monotonic()
+        result = worker(str(tmp_path), "w0", duration=0.2, atomic=False, seed=0)
+        assert time.monotonic() - start < 2
+        assert (result["waits"], result["acked"], result["errors"]) == ([], [], 0)
+
+    def test_worker_unlocks_after_failed_update(self, tmp_path: Path) -> None:
+        manager = RegistryManager(tmp_path)
+        project = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        with patch.object(RegistryManager, "update", side_effect=OSError("disk full")):
+            result = worker(str(tmp_path), "w0", duration=0.1, atomic=False, seed=0)
+        assert result["errors"] > 0
+        assert result["acked"] == []
+        assert manager.get(project.id).locked_by is None
+
+    def test_summarize_counts_lost_updates(self) -> None:
+        results = [
+            {
+                "ops": 8,
+                "waits": [0.001, 0.003],
+                "acked": [("a", "w0-0"), ("a", "w0-1")],
+                "retries": 1,
+                "errors": 0,
+            },
+            {"ops": 4, "waits": [], "acked": [("b", "w1-0")], "retries": 0, "errors": 1},
+        ]
+        report = summarize(results, {"a": ["w0-1"], "b": ["w1-0"]}, duration=2.0)
+        assert report["ops_per_s"] == 6.0
+        assert report["updates"] == 3
+        assert report["lost_updates"] == 1
+        assert report["lock_wait_ms"]["max"] == 3.0
+        assert (report["retries"], report["errors"]) == (1, 1)
+        assert summarize([], {}, 1.0)["lock_wait_ms"]["p50"] == 0.0
+
+    def test_main(self, capsys: pytest.CaptureFixture) -> None:
+        with patch("stress_registry.stress", return_value={"lost_updates": 0}) as run_stress:
+            assert stress_main(["--workers=3", "--duration=1", "--atomic"]) == 0
+        run_stress.assert_called_once_with(
+            workers=3,
+            duration=1.0,
+            projects=4,
+            backend="json",
+            atomic=True,
+            journal=False,
+            durability="none",
+            group_commit_ms=0.0,
+        )
+        assert json.loads(capsys.readouterr().out) == {"lost_updates": 0}
+
+
+class TestSimulate:
+    def test_report(self) -> None:
+        backlog = load_backlog(None, 100, seed=1)
+        report = simulate(backlog, weeks=20, runs=3)
+        assert set(report["policies"]) == set(POLICIES)
+        assert report["meta"]["backlog"] == len(backlog) > 0
+        for result in report["policies"].values():
+            assert result["completed_per_day"] > 0
+            assert 0 < result["mean_max_wait_days"] <= result["max_wait_days"] <= 140
+        assert simulate(backlog, weeks=20, runs=3) == report
+
+    def test_strict_starves_hard_projects(self) -> None:
+        backlog = [Priority(1, 1)] * 20 + [Priority(4, 4)]
+        kwargs = {"workers": 1, "days": 70.0, "days_per_difficulty": [1.0, 1.0, 1.0, 1.0]}
+        strict = run_once(backlog, POLICIES["strict"], arrivals_per_day=1.5, seed=3, **kwargs)
+        fifo = run_once(backlog, POLICIES["fifo"], arrivals_per_day=0.0, seed=3, **kwargs)
+        # Easy ideas keep arriving, so the hard one never starts
+        assert strict["max_wait_days"] == 70.0
+        assert fifo["max_wait_days"] < 30
+        assert fifo["queue_growth_per_week"] == -2.1
+
+    def test_thousands_of_weeks_in_seconds(self) -> None:
+        backlog = load_backlog(None, 200, seed=0)
+        start = time.perf_counter()
+        simulate(backlog, {"eisenhower": POLICIES["eisenhower"]}, weeks=2000, runs=2)
+        assert time.perf_counter() - start < 5
+
+    def test_registry_backlog(self, tmp_path: Path) -> None:
+        manager = RegistryManager(tmp_path)
+        manager.add(Project.create(title="A", brief="B", spec="S", tech_stack=[], urgency=1))
+        locked = manager.add(Project.create(title="L", brief="B", spec="S", tech_stack=[]))
+        manager.lock(locked.id, "worker-1")
+        assert load_backlog(str(tmp_path), 0, seed=0) == [Priority(1, 2)]
+        assert simulate([], weeks=4, runs=1)["policies"]["fifo"]["completed_per_day"] > 0
+
+    def test_main(self, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        argv = ["--projects=40", "--weeks=4", "--runs=2", "--policies=fifo,aging"]
+        assert simulate_main([*argv, "--days-per-difficulty=1,1,2,2"]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert list(report["policies"]) == ["fifo", "aging"]
+        assert report["meta"]["days_per_difficulty"] == [1.0, 1.0, 2.0, 2.0]
+        assert simulate_main(["--policies=fifo,lifo"]) == 1
+        assert "Unknown policies: lifo" in capsys.readouterr().err
@@ -0,0 +1,80 @@
+"""Tests for build_zipapp module - 100% coverage required."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from build_zipapp import SCRIPTS_DIR, build, main
+
+
+@pytest.fixture
+def temp_dir() -> Iterator[Path]:
+    with tempfile.TemporaryDirectory() as d:
+        yield Path(d)
+
+
+@pytest.fixture
+def home(temp_dir: Path) -> dict[str, str]:
+    """Environment whose config points at an empty registry under ``temp_dir``."""
+    (temp_dir / ".claude").mkdir()
+    (temp_dir / ".claude" / "digitus-Dei.local.md").write_text(
+        f"---\nregistry_dir: {temp_dir / 'registry'}\n---\n"
+    )
+    return {**os.environ, "HOME": str(temp_dir)}
+
+
+class TestBuild:
+    def test_contents(self, temp_dir: Path) -> None:
+        app = build(temp_dir / "out" / "app.pyz")
+        with zipfile.ZipFile(app) as z:
+            names = set(z.namelist())
+        assert {"__main__.py", "__main__.pyc", "registry.py", "registry.pyc"} <= names
+        assert {"storage.pyc", "lock_project.pyc", "daemon.pyc", "batch.pyc"} <= names
+        assert not {"test_plugin.py", "build_zipapp.py"} & names
+        assert app.read_bytes().startswith(b"#!/usr/bin/env python3\n")
+
+    def test_runs_tools(self, temp_dir: Path, home: dict[str, str]) -> None:
+        app = build(temp_dir / "app.pyz")
+        added = subprocess.run(
+            [sys.executable, str(app), "registry", "add"],
+            input='{"title": "Zipped", "brief": "B", "spec": "S", "tech_stack": []}',
+            capture_output=True,
+            text=True,
+            env=home,
+            check=True,
+        )
+        assert '"title": "Zipped"' in added.stdout
+        listed = subprocess.run(
+            [sys.executable, str(app), "registry", "list", "--format=ndjson"],
+            capture_output=True,
+            text=True,
+            env=home,
+            check=True,
+        )
+        assert '"title":"Zipped"' in listed.stdout
+
+    def test_usage(self, temp_dir: Path) -> None:
+        app = build(temp_dir / "app.pyz")
+        result = subprocess.run([sys.executable, str(app), "nope"], capture_output=True, text=True)
+        assert result.returncode == 1
+        assert "registry|selector|project_utils" in result.stdout
+
+    def test_main(self, temp_dir: Path, capsys: pytest.CaptureFixture) -> None:
+        with patch("sys.argv", ["build_zipapp.py", str(temp_dir / "cli.pyz")]):
+            main()
+        assert capsys.readouterr().out.strip() == str(temp_dir / "cli.pyz")
+
+    def test_main_default_output(self, capsys: pytest.CaptureFixture) -> None:
+        with patch("build_zipapp.build", side_effect=lambda output: output) as build_mock:
+            with patch("sys.argv", ["build_zipapp.py"]):
+                main()
+        assert build_mock.call_args.args[0] == SCRIPTS_DIR.parent / "dist" / "digitus-dei.pyz"
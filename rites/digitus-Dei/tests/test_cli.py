@@ -41,6 +41,69 @@ class TestRegistryCLI:
         captured = capsys.readouterr()
         assert "[]" in captured.out
 
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_main_list_streaming_formats(
+        self,
+        backend: str,
+        temp_dir: Path,
+        mock_registry_dir: Path,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        from registry import Project, RegistryManager, Status, main
+
+        manager = RegistryManager(temp_dir)
+        manager.migrate(backend)
+        for title in ("A", "B", "C"):
+            manager.add(Project.create(title=title, brief="B", spec="S", tech_stack=[]))
+        manager.update(manager.list()[1].id, status=Status.PAUSED)
+        manager.storage.close()
+
+        with patch("sys.argv", ["registry.py", "list", "--status=idea", "--format=ndjson"]):
+            main()
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line)["title"] for line in lines] == ["A", "C"]
+
+        with patch("sys.argv", ["registry.py", "list", "--format=compact"]):
+            main()
+        out = capsys.readouterr().out
+        assert out.startswith('[{"id":')
+        assert [p["title"] for p in json.loads(out)] == ["A", "B", "C"]
+
+    def test_main_list_compact_empty(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with patch("sys.argv", ["registry.py", "list", "--format=compact"]):
+            main()
+        assert capsys.readouterr().out == "[]\n"
+
+    def test_main_list_bad_format(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "list", "--format=yaml"]):
+                main()
+        assert exc.value.code == 1
+        assert "Unknown format: yaml" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("fmt", ["ndjson", "compact"])
+    def test_main_get_single_line_formats(
+        self, fmt: str, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        p = RegistryManager(temp_dir).add(
+            Project.create(title="One", brief="B", spec="S", tech_stack=[])
+        )
+        with patch("sys.argv", ["registry.py", "get", p.id, f"--format={fmt}"]):
+            main()
+        out = capsys.readouterr().out
+        assert out.count("\n") == 1
+        assert json.loads(out) == p.to_dict()
+
     def test_main_list_with_status(
         self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
     ) -> None:
@@ -269,6 +332,47 @@ class TestRegistryCLI:
                 main()
         assert exc.value.code == 1
 
+    def test_main_leases(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        manager = RegistryManager(temp_dir)
+        stale = manager.add(Project.create(title="Stale", brief="B", spec="S", tech_stack=[]))
+        held = manager.add(Project.create(title="Held", brief="B", spec="S", tech_stack=[]))
+
+        with patch("sys.argv", ["registry.py", "lock", stale.id, "crashed", "--ttl=-1"]):
+            main()
+        assert json.loads(capsys.readouterr().out)["lease_expires_at"] is not None
+        manager.lock(held.id, "alive", ttl=-1)
+
+        with patch("sys.argv", ["registry.py", "heartbeat", "alive", "--ttl=600"]):
+            main()
+        assert "Extended 1 leases" in capsys.readouterr().out
+
+        args = ["registry.py", "update-many", "--unlocked", "--set", '{"title": "Free"}']
+        with patch("sys.argv", args):
+            main()
+        assert "Updated 1 projects" in capsys.readouterr().out
+        assert manager.get(stale.id).title == "Free"
+
+        with patch("sys.argv", ["registry.py", "reclaim"]):
+            main()
+        assert "Reclaimed 1 expired locks" in capsys.readouterr().out
+        assert manager.get(stale.id).locked_by is None
+        assert manager.get(held.id).locked_by == "alive"
+
+    def test_main_heartbeat_no_worker(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "heartbeat"]):
+                main()
+        assert exc.value.code == 1
+        assert "Usage" in capsys.readouterr().out
+
     def test_main_delete(
         self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
     ) -> None:
@@ -302,6 +406,299 @@ class TestRegistryCLI:
                 main()
         assert exc.value.code == 1
 
+    def test_main_apply(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        manager = RegistryManager(temp_dir)
+        p = Project.create(title="Apply Me", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        ops = [
+            {"op": "update", "id": p.id, "fields": {"status": "in_progress"}},
+            {"op": "lock", "id": p.id, "worker_id": "current-session"},
+            {"op": "delete", "id": p.id},
+        ]
+        with patch("sys.argv", ["registry.py", "apply"]):
+            with patch("sys.stdin.read", return_value=json.dumps(ops)):
+                main()
+        results = json.loads(capsys.readouterr().out)
+        assert results[0]["status"] == "in_progress"
+        assert results[1]["locked_by"] == "current-session"
+        assert results[2] is True
+        assert manager.get(p.id) is None
+
+    def test_main_apply_aborts_batch(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        manager = RegistryManager(temp_dir)
+        p = Project.create(title="Keep Me", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        ops = [
+            {"op": "lock", "id": p.id, "worker_id": "w"},
+            {"op": "unlock", "id": "nonexistent"},
+        ]
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "apply"]):
+                with patch("sys.stdin.read", return_value=json.dumps(ops)):
+                    main()
+        assert exc.value.code == 1
+        assert "Operation 1: project not found" in capsys.readouterr().err
+        assert manager.get(p.id).locked_by is None
+
+    def test_main_apply_invalid_operation(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "apply"]):
+                with patch("sys.stdin.read", return_value='[{"op": "rename"}]'):
+                    main()
+        assert exc.value.code == 1
+        assert "Unknown operation" in capsys.readouterr().err
+
+    def test_main_import_ndjson(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        import io
+
+        from registry import RegistryManager, main
+
+        lines = [
+            json.dumps({"title": f"P{i}", "brief": "B", "spec": "S", "tech_stack": []})
+            for i in range(3)
+        ]
+        with patch("sys.argv", ["registry.py", "import", "--format=ndjson", "--chunk-size=2"]):
+            with patch("sys.stdin", io.StringIO("\n".join(lines) + "\n")):
+                main()
+        assert "Imported 3 projects" in capsys.readouterr().out
+        assert [p.title for p in RegistryManager(temp_dir).list()] == ["P0", "P1", "P2"]
+
+    def test_main_import_from_file_reports_errors(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import RegistryManager, main
+
+        path = temp_dir / "ideas.ndjson"
+        path.write_text(
+            '{"title": "Good", "brief": "B", "spec": "S", "tech_stack": []}\n'
+            '{"title": "Bad", "brief": "B", "spec": "S", "tech_stack": [], "urgency": 9}\n'
+        )
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "import", f"--file={path}"]):
+                main()
+        assert exc.value.code == 1
+        captured = capsys.readouterr()
+        assert "Imported 1 projects" in captured.out
+        assert "line 2: urgency must be 1-4, got 9" in captured.err
+        assert [p.title for p in RegistryManager(temp_dir).list()] == ["Good"]
+
+    @pytest.mark.parametrize("arg", ["--format=csv", "--chunk-size=many"])
+    def test_main_import_bad_args(
+        self, arg: str, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "import", arg]):
+                main()
+        assert exc.value.code == 1
+        assert "Usage: registry.py import" in capsys.readouterr().out
+
+    def test_main_reshard(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        p = RegistryManager(temp_dir).add(
+            Project.create(title="Shard Me", brief="B", spec="S", tech_stack=[])
+        )
+        with patch("sys.argv", ["registry.py", "reshard", "--shards=2"]):
+            main()
+        assert "Resharded into 2 shards" in capsys.readouterr().out
+        assert (temp_dir / ".digitus-registry.shards").is_dir()
+        assert RegistryManager(temp_dir).get(p.id).title == "Shard Me"
+
+    @pytest.mark.parametrize("args", [[], ["--shards=0"], ["--shards=x"]])
+    def test_main_reshard_bad_count(
+        self, args: list[str], mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "reshard", *args]):
+                main()
+        assert exc.value.code == 1
+        assert "Usage: registry.py reshard --shards=N" in capsys.readouterr().out
+
+    @pytest.mark.parametrize(
+        "set_args", [["--set", '{"status": "paused"}'], ['--set={"status": "paused"}']]
+    )
+    def test_main_update_many(
+        self,
+        set_args: list[str],
+        temp_dir: Path,
+        mock_registry_dir: Path,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        from registry import Project, RegistryManager, Status, main
+
+        manager = RegistryManager(temp_dir)
+        free = manager.add(Project.create(title="Free", brief="B", spec="S", tech_stack=[]))
+        held = manager.add(Project.create(title="Held", brief="B", spec="S", tech_stack=[]))
+        manager.lock(held.id, "w")
+
+        argv = ["registry.py", "update-many", "--status=idea", "--unlocked", *set_args]
+        with patch("sys.argv", argv):
+            main()
+        assert "Updated 1 projects" in capsys.readouterr().out
+        assert manager.get(free.id).status == Status.PAUSED
+        assert manager.get(held.id).status == Status.IDEA
+
+    @pytest.mark.parametrize(
+        "args,message",
+        [
+            (["--set", '{"colour": "red"}'], "Error: Cannot set fields: colour"),
+            (["--set", "[1]"], "Error: --set expects a JSON object"),
+            (["--set", "{"], "Error: "),
+        ],
+    )
+    def test_main_update_many_invalid(
+        self,
+        args: list[str],
+        message: str,
+        mock_registry_dir: Path,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "update-many", *args]):
+                main()
+        assert exc.value.code == 1
+        assert message in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "cmd,usage",
+        [
+            (["update-many", "--status=idea"], "Usage: registry.py update-many"),
+            (["delete-many"], "Usage: registry.py delete-many"),
+        ],
+    )
+    def test_main_bulk_usage(
+        self, cmd: list[str], usage: str, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", *cmd]):
+                main()
+        assert exc.value.code == 1
+        assert usage in capsys.readouterr().out
+
+    def test_main_delete_many(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        manager = RegistryManager(temp_dir)
+        keep = manager.add(Project.create(title="Keep", brief="B", spec="S", tech_stack=[]))
+        manager.add(Project.create(title="Drop", brief="B", spec="S", tech_stack=[]))
+        manager.update(keep.id, status="paused")
+
+        with patch("sys.argv", ["registry.py", "delete-many", "--status=idea"]):
+            main()
+        assert "Deleted 1 projects" in capsys.readouterr().out
+        assert [p.id for p in manager.list()] == [keep.id]
+
+    def test_main_gc(self, mock_registry_dir: Path, capsys: pytest.CaptureFixture) -> None:
+        from registry import main
+
+        with patch("sys.argv", ["registry.py", "gc"]):
+            main()
+        assert "Removed 0 unreferenced blobs" in capsys.readouterr().out
+
+    def test_main_journal_on_off(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        with patch("sys.argv", ["registry.py", "journal", "on"]):
+            main()
+        manager = RegistryManager(temp_dir)
+        assert manager.journaled is True
+        p = Project.create(title="Journaled", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+
+        with patch("sys.argv", ["registry.py", "journal", "off"]):
+            main()
+        captured = capsys.readouterr()
+        assert "Journal enabled" in captured.out
+        assert "Journal disabled" in captured.out
+        assert manager.journaled is False
+        assert manager.get(p.id) is not None
+
+    def test_main_journal_bad_arg(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc, patch("sys.argv", ["registry.py", "journal"]):
+            main()
+        assert exc.value.code == 1
+        captured = capsys.readouterr()
+        assert "Usage:" in captured.out
+
+    def test_main_compact(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        manager = RegistryManager(temp_dir)
+        manager.enable_journal()
+        manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+
+        with patch("sys.argv", ["registry.py", "compact"]):
+            main()
+        captured = capsys.readouterr()
+        assert "Compacted" in captured.out
+        assert manager.storage.journal_path.read_bytes() == b""
+
+    def test_main_migrate(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        p = Project.create(title="Migrated", brief="B", spec="S", tech_stack=[])
+        RegistryManager(temp_dir).add(p)
+        with patch("sys.argv", ["registry.py", "get", p.id]):
+            main()
+        before = capsys.readouterr().out
+
+        with patch("sys.argv", ["registry.py", "migrate", "--to=sqlite"]):
+            main()
+        assert "Migrated to sqlite" in capsys.readouterr().out
+        assert (temp_dir / ".digitus-registry.db").exists()
+
+        with patch("sys.argv", ["registry.py", "get", p.id]):
+            main()
+        assert capsys.readouterr().out == before
+
+    def test_main_migrate_bad_backend(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "migrate", "--to=postgres"]):
+                main()
+        assert exc.value.code == 1
+        captured = capsys.readouterr()
+        assert "Usage:" in captured.out
+
     def test_main_unknown_command(
         self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
     ) -> None:
@@ -314,6 +711,209 @@ class TestRegistryCLI:
         captured = capsys.readouterr()
         assert "Unknown command" in captured.err
 
+    def test_main_trace_and_summary(
+        self,
+        temp_dir: Path,
+        mock_registry_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        from registry import Project, RegistryManager, main
+
+        RegistryManager(temp_dir).add(Project.create(title="T", brief="B", spec="S", tech_stack=[]))
+        trace = temp_dir / "trace.jsonl"
+        monkeypatch.setenv("DIGITUS_TRACE", str(trace))
+        with patch("sys.argv", ["registry.py", "list"]):
+            main()
+        capsys.readouterr()
+        spans = {json.loads(line)["span"] for line in trace.read_text().splitlines()}
+        assert {"command", "model.build"} <= spans
+
+        with patch("sys.argv", ["registry.py", "trace-summary"]):
+            main()
+        out = capsys.readouterr().out
+        assert out.startswith("span") and "command" in out
+
+        monkeypatch.delenv("DIGITUS_TRACE")
+        with patch("sys.argv", ["registry.py", "trace-summary", str(trace)]):
+            main()
+        assert "model.build" in capsys.readouterr().out
+
+    def test_main_trace_summary_no_file(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import main
+
+        monkeypatch.delenv("DIGITUS_TRACE", raising=False)
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["registry.py", "trace-summary"]):
+                main()
+        assert exc.value.code == 1
+        assert "DIGITUS_TRACE" in capsys.readouterr().out
+
+
+class TestRegistryDaemonCLI:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    @pytest.fixture
+    def mock_registry_dir(self, temp_dir: Path):
+        with patch("registry.get_registry_dir", return_value=temp_dir):
+            yield temp_dir
+
+    @pytest.fixture
+    def served(self, mock_registry_dir: Path):
+        """A daemon for ``mock_registry_dir`` running in a thread, as ``serve`` sets up."""
+        import threading
+
+        from daemon import serve
+        from registry import DAEMON_SOCKET, RegistryManager, run_command
+
+        manager = RegistryManager(mock_registry_dir, cache=True)
+        servers = []
+        started = threading.Event()
+
+        def ready(server) -> None:
+            servers.append(server)
+            started.set()
+
+        path = mock_registry_dir / DAEMON_SOCKET
+        thread = threading.Thread(
+            target=serve, args=(path, lambda argv: run_command(manager, argv), ready)
+        )
+        thread.start()
+        assert started.wait(5)
+        yield manager
+        servers[0].shutdown()
+        thread.join()
+
+    def run(self, *args: str, stdin: str = "") -> None:
+        import io
+
+        from registry import main
+
+        with patch("sys.argv", ["registry.py", *args]), patch("sys.stdin", io.StringIO(stdin)):
+            main()
+
+    def test_commands_go_through_daemon(self, served, capsys: pytest.CaptureFixture) -> None:
+        from registry import RegistryManager
+
+        self.run(
+            "add",
+            stdin=json.dumps({"title": "Via Daemon", "brief": "B", "spec": "S", "tech_stack": []}),
+        )
+        project_id = json.loads(capsys.readouterr().out)["id"]
+        misses = served.storage.cache_misses
+
+        self.run("lock", project_id, "worker-1")
+        self.run("get", project_id, "--format=compact")
+        out = capsys.readouterr().out
+        assert json.loads(out.splitlines()[-1])["locked_by"] == "worker-1"
+        # The daemon answered from its in-memory registry
+        assert served.storage.cache_misses == misses
+        assert RegistryManager(served.registry_dir).get(project_id).locked_by == "worker-1"
+
+    def test_errors_and_exit_codes_pass_through(
+        self, served, capsys: pytest.CaptureFixture
+    ) -> None:
+        with pytest.raises(SystemExit) as exc:
+            self.run("get", "nope")
+        assert exc.value.code == 1
+        assert "Project not found" in capsys.readouterr().err
+
+    def test_file_is_read_by_client(
+        self, served, temp_dir: Path, capsys: pytest.CaptureFixture, monkeypatch
+    ) -> None:
+        (temp_dir / "ideas.ndjson").write_text(
+            '{"title": "From File", "brief": "B", "spec": "S", "tech_stack": []}\n'
+        )
+        monkeypatch.chdir(temp_dir)
+        self.run("import", "--file=ideas.ndjson")
+        assert "Imported 1 projects" in capsys.readouterr().out
+        assert [p.title for p in served.list()] == ["From File"]
+
+    def test_stale_socket_falls_back(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        import socket
+
+        from registry import DAEMON_SOCKET
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(str(mock_registry_dir / DAEMON_SOCKET))
+        self.run(
+            "add",
+            stdin=json.dumps({"title": "Direct", "brief": "B", "spec": "S", "tech_stack": []}),
+        )
+        assert "Direct" in capsys.readouterr().out
+
+    def test_batch(self, mock_registry_dir: Path, capsys: pytest.CaptureFixture) -> None:
+        from registry import RegistryManager
+
+        project = {"title": "Batched", "brief": "B", "spec": "S", "tech_stack": []}
+        lines = [
+            json.dumps({"argv": ["add"], "stdin": project}),
+            json.dumps({"argv": ["lock", "{{1.id}}", "worker-1"]}),
+            json.dumps({"argv": ["get", "missing"]}),
+        ]
+        with pytest.raises(SystemExit) as exc:
+            self.run("--batch", stdin="\n".join(lines))
+        assert exc.value.code == 1
+        results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [r["code"] for r in results] == [0, 0, 1]
+        assert results[1]["result"]["locked_by"] == "worker-1"
+        assert results[2]["error"] == "Project not found"
+        project_id = results[0]["result"]["id"]
+        assert RegistryManager(mock_registry_dir).get(project_id).locked_by == "worker-1"
+
+        with pytest.raises(SystemExit) as exc:
+            self.run("--batch", stdin=lines[0])
+        assert exc.value.code == 0
+
+    def test_serve(self, mock_registry_dir: Path, capsys: pytest.CaptureFixture) -> None:
+        from registry import main
+
+        with patch("daemon.serve") as serve, patch("sys.argv", ["registry.py", "serve"]):
+            main()
+        assert "Serving" in capsys.readouterr().out
+        path, handler = serve.call_args.args
+        assert path == mock_registry_dir / ".digitus-registry.sock"
+        handler(["registry.py", "list"])
+        assert capsys.readouterr().out.strip() == "[]"
+
+    def test_serve_creates_registry_dir(self, temp_dir: Path) -> None:
+        from registry import main
+
+        registry_dir = temp_dir / "fresh" / "registry"
+        with (
+            patch("registry.get_registry_dir", return_value=registry_dir),
+            patch("daemon.serve") as serve,
+            patch("sys.argv", ["registry.py", "serve"]),
+        ):
+            main()
+        assert registry_dir.is_dir()
+        assert serve.call_args.args[0] == registry_dir / ".digitus-registry.sock"
+
+    @pytest.mark.parametrize(
+        "error",
+        [RuntimeError("already listening"), OSError("AF_UNIX path too long")],
+    )
+    def test_serve_fails_cleanly(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture, error: Exception
+    ) -> None:
+        from registry import main
+
+        with pytest.raises(SystemExit) as exc:
+            with (
+                patch("daemon.serve", side_effect=error),
+                patch("sys.argv", ["registry.py", "serve"]),
+            ):
+                main()
+        assert exc.value.code == 1
+        assert f"Error: {error}" in capsys.readouterr().err
+
 
 class TestGetRegistryDir:
     def test_missing_config(self, tmp_path: Path) -> None:
@@ -408,6 +1008,82 @@ class TestSelectorCLI:
         captured = capsys.readouterr()
         assert "No matching projects found" in captured.err
 
+    def test_main_claim(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager
+        from selector import main
+
+        manager = RegistryManager(temp_dir)
+        p = manager.add(Project.create(title="Claim Me", brief="B", spec="S", tech_stack=[]))
+
+        with patch("sys.argv", ["selector.py", "--status=idea", "--claim=session-1"]):
+            main()
+        assert json.loads(capsys.readouterr().out)["locked_by"] == "session-1"
+        assert manager.get(p.id).locked_by == "session-1"
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["selector.py", "--status=idea", "--claim=session-2"]):
+                main()
+        assert exc.value.code == 1
+        assert "No matching projects found" in capsys.readouterr().err
+
+    def test_main_count(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager
+        from selector import main
+
+        manager = RegistryManager(temp_dir)
+        for i in range(3):
+            manager.add(Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[]))
+
+        with patch("sys.argv", ["selector.py", "--status=idea", "--count=2"]):
+            main()
+        projects = json.loads(capsys.readouterr().out)
+        assert len({p["id"] for p in projects}) == 2
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["selector.py", "--status=blocked", "--count=2"]):
+                main()
+        assert exc.value.code == 1
+        assert "No matching projects found" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        ("args", "error"),
+        [
+            (["--count=0"], "--count must be a positive integer"),
+            (["--count=two"], "--count must be a positive integer"),
+            (["--count=2", "--claim=s1"], "--count cannot be combined with --claim"),
+        ],
+    )
+    def test_main_count_errors(
+        self, mock_registry_dir: Path, capsys: pytest.CaptureFixture, args: list[str], error: str
+    ) -> None:
+        from selector import main
+
+        with pytest.raises(SystemExit) as exc:
+            with patch("sys.argv", ["selector.py", "--status=idea", *args]):
+                main()
+        assert exc.value.code == 1
+        assert error in capsys.readouterr().err
+
+    def test_main_claim_reports_reclaimed(
+        self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        from registry import Project, RegistryManager
+        from selector import main
+
+        manager = RegistryManager(temp_dir)
+        p = manager.add(Project.create(title="Stale", brief="B", spec="S", tech_stack=[]))
+        manager.lock(p.id, "crashed", ttl=-1)
+
+        with patch("sys.argv", ["selector.py", "--status=idea", "--claim=session-1"]):
+            main()
+        captured = capsys.readouterr()
+        assert json.loads(captured.out)["locked_by"] == "session-1"
+        assert "Reclaimed 1 expired locks" in captured.err
+
 
 class TestProjectUtilsCLI:
     @pytest.fixture
@@ -444,6 +1120,48 @@ class TestProjectUtilsCLI:
         captured = capsys.readouterr()
         assert "init-project" in captured.out
 
+    def test_main_batch_vibestart(self, temp_dir: Path, capsys: pytest.CaptureFixture) -> None:
+        import io
+
+        from project_utils import main
+        from registry import Project, RegistryManager, Status
+
+        registry_dir = temp_dir / ".digitus-dei"
+        manager = RegistryManager(registry_dir)
+        p = manager.add(Project.create(title="Batch Start", brief="B", spec="S", tech_stack=[]))
+        update = {"status": "in_progress", "repo_url": "{{2}}"}
+        lines = [
+            json.dumps({"argv": ["init"], "stdin": p.to_dict()}),
+            json.dumps({"argv": ["github", "{{1}}"]}),
+            json.dumps(
+                {
+                    "tool": "registry",
+                    "argv": ["apply"],
+                    "stdin": [
+                        {"op": "update", "id": p.id, "fields": update},
+                        {"op": "lock", "id": p.id, "worker_id": "current-session"},
+                    ],
+                }
+            ),
+        ]
+        with (
+            patch("project_utils.get_registry_dir", return_value=registry_dir),
+            patch("project_utils.init_git_repo", return_value=True),
+            patch("project_utils.create_github_repo", return_value="https://github.com/u/r"),
+            patch("sys.argv", ["project_utils.py", "--batch"]),
+            patch("sys.stdin", io.StringIO("\n".join(lines))),
+            pytest.raises(SystemExit) as exc,
+        ):
+            main()
+        assert exc.value.code == 0
+        results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert results[0]["result"] == str(temp_dir / "batch-start")
+        assert (temp_dir / "batch-start" / "README.md").exists()
+        found = RegistryManager(registry_dir).get(p.id)
+        assert found.status == Status.IN_PROGRESS
+        assert found.repo_url == "https://github.com/u/r"
+        assert found.locked_by == "current-session"
+
     def test_main_github(
         self, temp_dir: Path, mock_registry_dir: Path, capsys: pytest.CaptureFixture
     ) -> None:
@@ -734,6 +1452,17 @@ class TestCreateGithubRepo:
             result = create_github_repo(temp_dir)
             assert result == "https://github.com/test/repo2"
 
+    def test_traced_subprocess_spans(self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        from project_utils import create_github_repo
+
+        trace = temp_dir / "trace.jsonl"
+        monkeypatch.setenv("DIGITUS_TRACE", str(trace))
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout="Created", stderr="", returncode=0)
+            create_github_repo(temp_dir)
+        spans = [json.loads(line) for line in trace.read_text().splitlines()]
+        assert [(s["span"], s["cmd"]) for s in spans] == [("subprocess", "gh repo")] * 2
+
 
 class TestInitGitRepoFailure:
     @pytest.fixture
@@ -0,0 +1,180 @@
+"""Tests for daemon module - 100% coverage required."""
+
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import daemon
+from daemon import RegistryServer, call, is_running, run_captured, serve
+
+
+def echo(argv: list[str]) -> None:
+    if argv[0] == "fail":
+        sys.exit(int(argv[1]))
+    if argv[0] == "boom":
+        raise KeyError("boom")
+    print(" ".join(argv), sys.stdin.read())
+    print("warning", file=sys.stderr)
+
+
+@pytest.fixture
+def temp_dir() -> Iterator[Path]:
+    with tempfile.TemporaryDirectory() as d:
+        yield Path(d)
+
+
+@pytest.fixture
+def running(temp_dir: Path) -> Iterator[Path]:
+    path = temp_dir / "registry.sock"
+    servers: list[RegistryServer] = []
+    started = threading.Event()
+
+    def ready(server: RegistryServer) -> None:
+        servers.append(server)
+        started.set()
+
+    thread = threading.Thread(target=serve, args=(path, echo, ready))
+    thread.start()
+    assert started.wait(5)
+    yield path
+    servers[0].shutdown()
+    thread.join()
+    assert not path.exists()
+
+
+def stale_socket(path: Path) -> None:
+    """Leave a socket file behind with nobody listening, like a crashed daemon."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(path))
+
+
+class TestRunCaptured:
+    def test_output_and_stdin(self) -> None:
+        assert run_captured(echo, ["a", "b"], "in") == {
+            "code": 0,
+            "stdout": "a b in\n",
+            "stderr": "warning\n",
+        }
+
+    @pytest.mark.parametrize(
+        "code,expected,stderr",
+        [(3, 3, ""), (0, 0, ""), (None, 0, ""), ("Bad", 1, "Bad\n")],
+    )
+    def test_exit_codes(self, code: object, expected: int, stderr: str) -> None:
+        def exit_with(argv: list[str]) -> None:
+            sys.exit(code)
+
+        result = run_captured(exit_with, [], "")
+        assert result["code"] == expected
+        assert result["stderr"] == stderr
+
+    def test_exception_is_reported(self) -> None:
+        result = run_captured(echo, ["boom"], "")
+        assert result["code"] == 1
+        assert "KeyError: 'boom'" in result["stderr"]
+
+    def test_restores_stdin(self) -> None:
+        stdin = sys.stdin
+        run_captured(echo, ["x"], "data")
+        assert sys.stdin is stdin
+
+
+def fake_daemon(path: Path, respond: Callable[[socket.socket], None]) -> threading.Thread:
+    """Accept one connection on ``path`` and let ``respond`` misbehave on it."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(1)
+
+    def accept() -> None:
+        conn, _ = server.accept()
+        with server, conn:
+            conn.recv(4096)
+            respond(conn)
+
+    thread = threading.Thread(target=accept)
+    thread.start()
+    return thread
+
+
+class TestDaemon:
+    def test_round_trip(self, running: Path) -> None:
+        assert call(running, ["get", "x"], "body") == {
+            "code": 0,
+            "stdout": "get x body\n",
+            "stderr": "warning\n",
+        }
+        assert call(running, ["fail", "2"])["code"] == 2
+        assert os.stat(running).st_mode & 0o777 == 0o600
+
+    def test_bad_request(self, running: Path) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(running))
+            sock.sendall(b'{"argv": []}\n')
+            with sock.makefile("rb") as f:
+                response = f.readline()
+        assert b"Bad daemon request" in response
+
+    def test_no_daemon(self, temp_dir: Path) -> None:
+        path = temp_dir / "registry.sock"
+        assert call(path, ["get"]) is None
+        assert is_running(path) is False
+        stale_socket(path)
+        assert call(path, ["get"]) is None
+
+    @pytest.mark.parametrize("reply", [b"", b"not json\n", b"[1]\n"])
+    def test_bad_response_means_unavailable(self, temp_dir: Path, reply: bytes) -> None:
+        path = temp_dir / "registry.sock"
+        thread = fake_daemon(path, lambda conn: conn.sendall(reply))
+        assert call(path, ["get"]) is None
+        thread.join()
+
+    def test_slow_response_means_unavailable(self, temp_dir: Path) -> None:
+        path = temp_dir / "registry.sock"
+        done = threading.Event()
+        thread = fake_daemon(path, lambda conn: done.wait(5))
+        assert call(path, ["get"], timeout=0.1) is None
+        done.set()
+        thread.join()
+
+    def test_silent_client_does_not_block_others(self, running: Path) -> None:
+        with (
+            patch.object(daemon._RequestHandler, "timeout", 0.1),
+            socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as silent,
+        ):
+            silent.connect(str(running))
+            start = time.monotonic()
+            assert call(running, ["get", "x"])["code"] == 0
+            assert time.monotonic() - start < 2
+            # The daemon hung up on the silent client without a reply
+            assert silent.recv(1) == b""
+
+    def test_single_instance(self, running: Path) -> None:
+        assert is_running(running)
+        with pytest.raises(RuntimeError, match="already listening"):
+            serve(running, echo)
+
+    def test_replaces_stale_socket(self, temp_dir: Path) -> None:
+        path = temp_dir / "registry.sock"
+        stale_socket(path)
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def answer_then_stop(server: RegistryServer) -> None:
+            assert is_running(path)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        try:
+            serve(path, echo, answer_then_stop)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        assert not path.exists()
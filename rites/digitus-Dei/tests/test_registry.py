@@ -1,20 +1,28 @@
 """Tests for registry module - 100% coverage required."""
 
+import json
+import os
+import subprocess
 import sys
 import tempfile
 from pathlib import Path
+from typing import Any
+from unittest.mock import patch
 
 import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
 from registry import (
+    DEFAULT_LEASE_TTL,
     Priority,
     Project,
     Registry,
     RegistryManager,
     Status,
+    Transaction,
 )
+from storage import BlobStore, GenerationConflict
 
 
 class TestPriority:
@@ -56,6 +64,31 @@ class TestPriority:
         p = Priority(urgency=2, difficulty=2)
         assert p.score() == 6  # (5-2) + (5-2) = 6
 
+    def test_interned_and_immutable(self) -> None:
+        p = Priority(urgency=3, difficulty=1)
+        assert Priority(3, 1) is p
+        assert (p.urgency, p.difficulty) == (3, 1)
+        with pytest.raises(AttributeError):
+            p.urgency = 1
+        assert repr(p) == "Priority(urgency=3, difficulty=1)"
+
+    def test_integral_floats_normalized(self) -> None:
+        with patch.dict(Priority._interned, clear=True):
+            p = Priority(2.0, 3.0)  # type: ignore[arg-type]
+            assert Priority(2, 3) is p
+            assert p.to_dict() == {"urgency": 2, "difficulty": 3}
+        with pytest.raises(ValueError, match="urgency must be 1-4, got 2.5"):
+            Priority(2.5, 2)  # type: ignore[arg-type]
+
+    def test_copy_keeps_identity(self) -> None:
+        import copy
+        import pickle
+
+        p = Priority(urgency=4, difficulty=2)
+        assert copy.deepcopy(p) is p
+        assert pickle.loads(pickle.dumps(p)) is p
+        assert Priority() == Priority(2, 2)
+
 
 class TestProject:
     def test_create(self) -> None:
@@ -139,6 +172,39 @@ class TestProject:
         assert restored.status == original.status
         assert restored.priority.urgency == original.priority.urgency
 
+    def test_slots_and_interned_stack(self) -> None:
+        p = Project.create(title="T", brief="B", spec="S", tech_stack=["".join(["Ru", "st"])])
+        assert not hasattr(p, "__dict__")
+        restored = Project.from_dict(json.loads(json.dumps(p.to_dict())))
+        assert restored.tech_stack[0] is p.tech_stack[0] is sys.intern("Rust")
+        assert restored.priority is p.priority
+
+    def test_memory_footprint(self) -> None:
+        """A loaded project with short text and a three-item stack stays under 500 bytes.
+
+        Measured at about 420 bytes on CPython 3.11 (plain dataclasses: about 730).
+        """
+        import gc
+        import tracemalloc
+
+        lines = [
+            json.dumps(
+                Project.create(
+                    title=f"T{i}", brief="B", spec="S", tech_stack=["Python", "FastAPI", "SQLite"]
+                ).to_dict()
+            )
+            for i in range(5000)
+        ]
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            projects = [Project.from_dict(json.loads(line)) for line in lines]
+            per_project = (tracemalloc.get_traced_memory()[0] - before) / len(projects)
+        finally:
+            tracemalloc.stop()
+        assert per_project < 500
+
 
 class TestRegistry:
     def test_empty_registry(self) -> None:
@@ -180,6 +246,30 @@ class TestRegistry:
         assert len(r.projects) == 1
         assert r.projects[0].title == "Test"
 
+    def test_indexes(self) -> None:
+        a = Project.create(title="A", brief="B", spec="S", tech_stack=[])
+        b = Project.create(title="B", brief="B", spec="S", tech_stack=[])
+        c = Project.create(title="C", brief="B", spec="S", tech_stack=[])
+        r = Registry(projects=[a, b])
+        r.add(c)
+        assert r.get(b.id) is b
+        assert r.get("missing") is None
+
+        b.status = Status.PAUSED
+        a.locked_by = c.locked_by = "worker-1"
+        for p in (a, b, c):
+            r.reindex(p)
+        assert r.find([Status.IDEA]) == [a, c]
+        assert r.find([Status.PAUSED, Status.IDEA]) == [a, b, c]
+        assert r.find(locked_by="worker-1") == [a, c]
+        assert r.find(unlocked_only=True) == [b]
+
+        assert r.remove(a.id) is True
+        assert r.remove(a.id) is False
+        assert r.projects == [b, c]
+        assert r.find(locked_by="worker-1") == [c]
+        assert r.get(a.id) is None
+
 
 class TestRegistryManager:
     @pytest.fixture
@@ -335,3 +425,451 @@ class TestRegistryManager:
         # Verify no temp files left behind
         temp_files = list(temp_dir.glob(".registry-*.tmp"))
         assert len(temp_files) == 0
+
+    def test_load_returns_registry(self, manager: RegistryManager) -> None:
+        p = Project.create(title="Loaded", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        registry = manager._load()
+        assert isinstance(registry, Registry)
+        assert registry.projects[0].id == p.id
+
+    def test_import_projects(self, manager: RegistryManager) -> None:
+        lines = [
+            '{"title": "A", "brief": "B", "spec": "S", "tech_stack": ["py"], "urgency": 1}',
+            "",
+            "not json",
+            '["a list"]',
+            '{"title": "C", "brief": "B"}',
+            '{"title": "D", "brief": "B", "spec": "S", "tech_stack": [], "difficulty": 0}',
+            '{"title": "E", "brief": "B", "spec": "S", "tech_stack": []}',
+        ]
+        imported, errors = manager.import_projects(lines)
+        assert imported == 2
+        assert [e.split(":")[0] for e in errors] == ["line 3", "line 4", "line 5", "line 6"]
+        assert "expected a JSON object" in errors[1]
+        assert "difficulty must be 1-4" in errors[3]
+        projects = manager.list()
+        assert [(p.title, p.priority.urgency) for p in projects] == [("A", 1), ("E", 2)]
+
+    def test_import_avoids_id_collisions(self, manager: RegistryManager) -> None:
+        existing = manager.add(Project.create(title="Old", brief="B", spec="S", tech_stack=[]))
+        line = '{"title": "New", "brief": "B", "spec": "S", "tech_stack": []}'
+        ids = iter([existing.id, "aaaa0000", "aaaa0000", "bbbb1111"])
+        with patch("registry._new_project_id", side_effect=lambda: next(ids)):
+            assert manager.import_projects([line, line]) == (2, [])
+        assert sorted(p.id for p in manager.list()) == sorted([existing.id, "aaaa0000", "bbbb1111"])
+
+    def test_import_commits_per_chunk(self, manager: RegistryManager) -> None:
+        line = '{"title": "P", "brief": "B", "spec": "S", "tech_stack": []}'
+        with patch.object(manager.storage, "commit", wraps=manager.storage.commit) as commit:
+            assert manager.import_projects([line] * 5, chunk_size=2) == (5, [])
+        assert commit.call_count == 3
+        assert len(manager.list()) == 5
+
+    def test_list_refs_from_full_records(self, manager: RegistryManager) -> None:
+        p = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=["go"]))
+        manager.update(p.id, urgency=1)
+        [ref] = manager.list_refs([Status.IDEA])
+        assert (ref.id, ref.status, ref.locked_by) == (p.id, Status.IDEA, None)
+        assert ref.priority.score() == p.priority.score()
+        assert ref._data is not None
+        assert ref.tech_stack == ["go"]
+        assert ref.to_dict() == manager.get(p.id).to_dict()
+        assert ref.project is ref.project
+
+    def test_list_refs_from_headers(self, manager: RegistryManager) -> None:
+        manager.migrate("sqlite")
+        p = manager.add(
+            Project.create(title="P", brief="B", spec="S", tech_stack=[], urgency=1, difficulty=3)
+        )
+        manager.lock(p.id, "worker-1")
+        assert manager.list_refs(unlocked_only=True) == []
+        [ref] = manager.list_refs([Status.IDEA])
+        assert ref._data is None
+        assert (ref.priority.urgency, ref.priority.difficulty) == (1, 3)
+        assert ref.locked_by == "worker-1"
+        assert ref.spec == "S"
+
+        [ref] = manager.list_refs()
+        manager.delete(p.id)
+        with pytest.raises(LookupError, match="no longer exists"):
+            _ = ref.spec
+        manager.storage.close()
+
+    def test_long_text_is_stored_out_of_line(self, manager: RegistryManager) -> None:
+        spec = "Build a thing. " * 100
+        p = manager.add(Project.create(title="P", brief="B", spec=spec, tech_stack=[]))
+        q = manager.add(Project.create(title="Q", brief="B", spec=spec, tech_stack=[]))
+        raw = manager.registry_path.read_text()
+        assert "Build a thing" not in raw
+        assert len(list(manager.blobs.root.glob("*/*"))) == 1
+
+        assert manager.get(p.id).spec == spec
+        assert manager.lock(p.id, "worker-1").spec == spec
+        assert [x.spec for x in manager.list()] == [spec, spec]
+        assert [r["spec"] for r in manager.iter_records()] == [spec, spec]
+        assert manager.list_refs()[0].spec == spec
+        assert manager._load().projects[1].spec == spec
+
+        new_spec = "Rebuild it. " * 100
+        assert manager.update(q.id, spec=new_spec, brief="Longer brief. " * 30).spec == new_spec
+        assert manager.get(q.id).brief == "Longer brief. " * 30
+        manager._save(manager._load())
+        assert "Rebuild it" not in manager.registry_path.read_text()
+        assert manager.get(q.id).spec == new_spec
+
+    def test_gc_blobs(self, manager: RegistryManager) -> None:
+        p = manager.add(Project.create(title="P", brief="B", spec="old " * 100, tech_stack=[]))
+        manager.update(p.id, spec="new " * 100)
+        assert manager.gc_blobs() == 0
+        assert manager.gc_blobs(grace=-1) == 1
+        assert manager.get(p.id).spec == "new " * 100
+
+    def test_update_retries_after_conflict(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        other = RegistryManager(manager.registry_dir)
+        commit = manager.storage.commit
+
+        def racing_commit(records: list, expected_generation: int | None = None) -> int:
+            if manager.retries == 0:
+                other.lock(p.id, "worker-2")
+            return commit(records, expected_generation)
+
+        with patch.object(manager.storage, "commit", side_effect=racing_commit):
+            result = manager.update(p.id, title="Q")
+        assert manager.retries == 1
+        assert result.title == "Q"
+        assert result.locked_by == "worker-2"
+
+    def test_retries_exhausted(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir, max_retries=2)
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        conflict = GenerationConflict(1, 2)
+        with patch.object(manager.storage, "commit", side_effect=conflict):
+            with pytest.raises(GenerationConflict):
+                manager.lock(p.id, "worker-1")
+        assert manager.retries == 2
+
+    def test_noop_update_skips_commit(self, manager: RegistryManager) -> None:
+        with patch.object(manager.storage, "commit") as commit:
+            assert manager.lock("missing", "worker-1") is None
+        commit.assert_not_called()
+
+
+class TestTransaction:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    @pytest.fixture
+    def manager(self, temp_dir: Path) -> RegistryManager:
+        return RegistryManager(temp_dir)
+
+    def test_batch_is_one_rewrite(self, manager: RegistryManager) -> None:
+        from unittest.mock import patch
+
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+
+        with patch.object(
+            manager.storage, "_write_snapshot", wraps=manager.storage._write_snapshot
+        ) as write:
+            with manager.transaction() as txn:
+                assert isinstance(txn, Transaction)
+                txn.update(p.id, status="in_progress", repo_url="https://github.com/x/y")
+                txn.lock(p.id, "worker-1")
+                extra = txn.add(Project.create(title="Extra", brief="B", spec="S", tech_stack=[]))
+        assert write.call_count == 1
+
+        found = manager.get(p.id)
+        assert found.status == Status.IN_PROGRESS
+        assert found.locked_by == "worker-1"
+        assert manager.get(extra.id) is not None
+
+    def test_reads_see_own_changes(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+
+        with manager.transaction() as txn:
+            txn.lock(p.id, "worker-1")
+            assert txn.get(p.id).locked_by == "worker-1"
+            assert manager.get(p.id).locked_by is None
+            assert txn.delete(p.id) is True
+            assert txn.get(p.id) is None
+            assert txn.delete(p.id) is False
+            assert txn.update(p.id, title="Gone") is None
+        assert manager.get(p.id) is None
+
+    def test_all_or_nothing(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+
+        with pytest.raises(ValueError, match="urgency must be 1-4"):
+            with manager.transaction() as txn:
+                txn.lock(p.id, "worker-1")
+                txn.update(p.id, priority={"urgency": 9, "difficulty": 1})
+        assert manager.get(p.id).locked_by is None
+
+    def test_empty_transaction_does_not_write(self, manager: RegistryManager) -> None:
+        with manager.transaction():
+            pass
+        assert not manager.registry_path.exists()
+
+    def test_single_ops_inside_transaction(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        with manager.transaction() as txn:
+            manager.add(p)
+            txn.unlock(p.id)
+        assert manager.get(p.id) is not None
+
+    def test_update_where_is_one_rewrite(self, manager: RegistryManager) -> None:
+        ideas = [
+            manager.add(Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[]))
+            for i in range(3)
+        ]
+        other = manager.add(Project.create(title="Other", brief="B", spec="S", tech_stack=[]))
+        manager.update(other.id, status="paused")
+
+        with patch.object(
+            manager.storage, "_write_snapshot", wraps=manager.storage._write_snapshot
+        ) as write:
+            count = manager.update_where(
+                lambda ref: ref.status == Status.IDEA,
+                status="blocked",
+                priority={"urgency": 1, "difficulty": 4},
+                spec="x" * 300,
+            )
+        assert count == 3
+        assert write.call_count == 1
+        for p in ideas:
+            found = manager.get(p.id)
+            assert found.status == Status.BLOCKED
+            assert found.priority == Priority(urgency=1, difficulty=4)
+            assert found.spec == "x" * 300
+        assert manager.get(other.id).status == Status.PAUSED
+
+    def test_update_where_sees_own_changes(self, manager: RegistryManager) -> None:
+        stored = manager.add(Project.create(title="Stored", brief="B", spec="S", tech_stack=[]))
+        gone = manager.add(Project.create(title="Gone", brief="B", spec="S", tech_stack=[]))
+
+        with manager.transaction() as txn:
+            txn.delete(gone.id)
+            added = txn.add(Project.create(title="New", brief="B", spec="S", tech_stack=[]))
+            assert txn.update_where(lambda ref: True, title="Renamed") == 2
+            assert txn.get(added.id).title == "Renamed"
+        assert manager.get(stored.id).title == "Renamed"
+        assert manager.get(gone.id) is None
+
+    @pytest.mark.parametrize(
+        "fields,message",
+        [
+            ({"colour": "red"}, "Cannot set fields: colour"),
+            ({"id": "x"}, "Cannot set fields: id"),
+            ({"status": "bogus"}, "bogus"),
+            ({"priority": {"urgency": 9, "difficulty": 1}}, "urgency must be 1-4"),
+        ],
+    )
+    def test_update_where_rejects_bad_fields(
+        self, manager: RegistryManager, fields: dict[str, Any], message: str
+    ) -> None:
+        p = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        with pytest.raises(ValueError, match=message):
+            manager.update_where(lambda ref: True, **fields)
+        assert manager.get(p.id).to_dict() == p.to_dict()
+
+    def test_update_where_validates_merged_records(self, manager: RegistryManager) -> None:
+        p = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        generation = manager.storage.generation()
+        with pytest.raises(TypeError):
+            manager.update_where(lambda ref: True, tech_stack=5)
+        assert manager.storage.generation() == generation
+        assert manager.get(p.id).to_dict() == p.to_dict()
+
+    def test_update_where_reads_no_blobs(self, manager: RegistryManager) -> None:
+        for _ in range(3):
+            manager.add(Project.create(title="P", brief="B", spec="S" * 1000, tech_stack=[]))
+        with patch.object(BlobStore, "get", side_effect=AssertionError) as get:
+            assert manager.update_where(lambda ref: True, status="in_progress") == 3
+            with pytest.raises(TypeError):
+                manager.update_where(lambda ref: True, tech_stack=5)
+        get.assert_not_called()
+        assert {p.status for p in manager.list()} == {Status.IN_PROGRESS}
+
+    def test_delete_where(self, manager: RegistryManager) -> None:
+        keep = manager.add(Project.create(title="Keep", brief="B", spec="S", tech_stack=[]))
+        drop = [
+            manager.add(Project.create(title="Drop", brief="B", spec="S", tech_stack=[]))
+            for _ in range(2)
+        ]
+        manager.lock(keep.id, "w")
+
+        assert manager.delete_where(lambda ref: ref.locked_by is None) == 2
+        assert [p.id for p in manager.list()] == [keep.id]
+        assert all(manager.get(p.id) is None for p in drop)
+        assert manager.delete_where(lambda ref: ref.title == "Nope") == 0
+
+    def test_apply_operations(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+
+        with manager.transaction() as txn:
+            added = txn.apply(
+                {
+                    "op": "add",
+                    "project": {"title": "New", "brief": "B", "spec": "S", "tech_stack": []},
+                }
+            )
+            assert isinstance(added, Project)
+            assert txn.apply({"op": "update", "id": p.id, "fields": {"status": "paused"}})
+            assert txn.apply({"op": "lock", "id": p.id, "worker_id": "w"}).locked_by == "w"
+            assert txn.apply({"op": "unlock", "id": p.id}).locked_by is None
+            assert txn.apply({"op": "delete", "id": added.id}) is True
+            with pytest.raises(ValueError, match="Unknown operation"):
+                txn.apply({"op": "rename"})
+
+
+class TestLeases:
+    @pytest.fixture(params=["json", "sqlite", "sharded"])
+    def manager(self, request: pytest.FixtureRequest) -> RegistryManager:
+        with tempfile.TemporaryDirectory() as d:
+            manager = RegistryManager(d, lease_ttl=60)
+            if request.param != "json":
+                manager.migrate(request.param)
+            yield manager
+            manager.storage.close()
+
+    def add(self, manager: RegistryManager, title: str = "P") -> Project:
+        return manager.add(Project.create(title=title, brief="B", spec="S", tech_stack=[]))
+
+    def test_lock_sets_lease(self, manager: RegistryManager) -> None:
+        p = self.add(manager)
+        locked = manager.lock(p.id, "w1")
+        assert locked.lease_expires_at > locked.locked_at
+        assert manager.lock(p.id, "w1", ttl=0).lease_expires_at == locked.locked_at
+        unlocked = manager.unlock(p.id)
+        assert (unlocked.locked_by, unlocked.lease_expires_at) == (None, None)
+
+    def test_expired_lock_is_free_but_kept(self, manager: RegistryManager) -> None:
+        p = self.add(manager)
+        manager.lock(p.id, "w1", ttl=-1)
+        assert [x.id for x in manager.list([Status.IDEA], unlocked_only=True)] == [p.id]
+        assert [x.id for x in manager.list_refs([Status.IDEA], unlocked_only=True)] == [p.id]
+        assert manager.get(p.id).locked_by == "w1"
+
+    def test_claim_reclaims_expired(self, manager: RegistryManager) -> None:
+        stale = self.add(manager, "Stale")
+        held = self.add(manager, "Held")
+        manager.lock(stale.id, "crashed", ttl=-1)
+        manager.lock(held.id, "alive")
+        claimed = manager.claim([Status.IDEA], "w2")
+        assert claimed.id == stale.id
+        assert claimed.locked_by == "w2"
+        assert manager.reclaimed == 1
+        assert manager.get(held.id).locked_by == "alive"
+        assert manager.claim([Status.IDEA], "w3") is None
+
+    def test_reclaim_expired(self, manager: RegistryManager) -> None:
+        ids = [self.add(manager, f"P{i}").id for i in range(3)]
+        manager.lock(ids[0], "crashed", ttl=-1)
+        manager.lock(ids[1], "crashed", ttl=-5)
+        manager.lock(ids[2], "alive")
+        assert manager.reclaim_expired() == 2
+        assert manager.reclaim_expired() == 0
+        assert manager.reclaimed == 2
+        assert {p.title: p.locked_by for p in manager.list()} == {
+            "P0": None,
+            "P1": None,
+            "P2": "alive",
+        }
+
+    def test_reclaim_skips_lock_renewed_in_transaction(self, manager: RegistryManager) -> None:
+        p = self.add(manager)
+        manager.lock(p.id, "w1", ttl=-1)
+        with manager.transaction() as txn:
+            txn.lock(p.id, "w2")
+            assert txn.reclaim_expired() == 0
+        assert manager.get(p.id).locked_by == "w2"
+
+    def test_heartbeat_extends_own_leases(self, manager: RegistryManager) -> None:
+        mine = [self.add(manager, f"P{i}").id for i in range(2)]
+        other = self.add(manager, "Other").id
+        for project_id in mine:
+            manager.lock(project_id, "w1", ttl=-1)
+        manager.lock(other, "w2", ttl=-1)
+        assert manager.heartbeat("w1") == 2
+        assert manager.heartbeat("nobody") == 0
+        assert [p.id for p in manager.list(unlocked_only=True)] == [other]
+        assert manager.reclaim_expired() == 1
+        assert manager.heartbeat("w2") == 0
+
+    def test_lease_ttl_from_config(self, tmp_path: Path) -> None:
+        (tmp_path / ".claude").mkdir()
+        (tmp_path / ".claude" / "digitus-Dei.local.md").write_text("---\nlease_ttl: 90\n---\n")
+        with patch.object(Path, "home", return_value=tmp_path):
+            assert RegistryManager(tmp_path / "r").lease_ttl == 90
+        with patch.object(Path, "home", return_value=tmp_path / "none"):
+            assert RegistryManager(tmp_path / "r").lease_ttl == DEFAULT_LEASE_TTL
+
+    def test_legacy_record_gains_lease(self, tmp_path: Path) -> None:
+        p = Project.create(title="Old", brief="B", spec="S", tech_stack=[])
+        data = p.to_dict()
+        del data["lease_expires_at"]
+        (tmp_path / ".digitus-registry.json").write_text(json.dumps({"projects": [data]}))
+        manager = RegistryManager(tmp_path, lease_ttl=60)
+        assert manager.get(p.id).lease_expires_at is None
+        assert manager.lock(p.id, "w1").lease_expires_at is not None
+        assert manager.get(p.id).lease_expires_at is not None
+
+    def test_legacy_float_priorities(self, tmp_path: Path) -> None:
+        p = Project.create(title="Old", brief="B", spec="S", tech_stack=[])
+        data = p.to_dict()
+        data["priority"] = {"urgency": 1.0, "difficulty": 4.0}
+        (tmp_path / ".digitus-registry.json").write_text(json.dumps({"projects": [data]}))
+        manager = RegistryManager(tmp_path)
+        with patch.dict(Priority._interned, clear=True):
+            assert [x.priority for x in manager.list()] == [Priority(1, 4)]
+            assert manager.get(p.id).priority.to_dict() == {"urgency": 1, "difficulty": 4}
+
+
+class TestStartup:
+    """``registry.py get`` runs on every command step, so its imports are budgeted."""
+
+    # Modules only some commands need; importing any of them up front is a regression
+    DEFERRED = (
+        "uuid",
+        "random",
+        "tempfile",
+        "shutil",
+        "sqlite3",
+        "hashlib",
+        "fcntl",
+        "socket",
+        "socketserver",
+        "daemon",
+        "batch",
+        "statistics",
+    )
+    # Generous for slow CI; the best of several runs takes about 55 ms on a slow VM
+    BUDGET_MS = float(os.environ.get("DIGITUS_IMPORT_BUDGET_MS", "100"))
+
+    def run(self, code: str) -> str:
+        scripts = Path(__file__).parent.parent / "scripts"
+        return subprocess.run(
+            [sys.executable, "-c", code], cwd=scripts, capture_output=True, text=True, check=True
+        ).stdout
+
+    def test_heavy_modules_are_deferred(self) -> None:
+        loaded = self.run(
+            f"import sys, registry; print(sorted(set({self.DEFERRED!r}) & set(sys.modules)))"
+        )
+        assert loaded.strip() == "[]"
+
+    def test_import_time_budget(self) -> None:
+        code = (
+            "import time; t = time.perf_counter(); import registry; print(time.perf_counter() - t)"
+        )
+        best = min(float(self.run(code)) for _ in range(5)) * 1000
+        assert best < self.BUDGET_MS, f"import registry took {best:.1f} ms"
@@ -1,5 +1,7 @@
 """Tests for selector module - 100% coverage required."""
 
+import json
+import random
 import sys
 import tempfile
 from pathlib import Path
@@ -9,8 +11,18 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
-from registry import Project, RegistryManager, Status
-from selector import select, weighted_random_select
+from registry import SELECTION_DIR, Project, RegistryManager, Status
+from selector import (
+    AliasTable,
+    SelectionCache,
+    SelectionIndex,
+    claim,
+    patch_headers,
+    sample,
+    select,
+    weighted_random_select,
+    weighted_sample,
+)
 
 
 class TestWeightedRandomSelect:
@@ -88,6 +100,242 @@ class TestWeightedRandomSelect:
         assert 350 < counts["P2"] < 650
 
 
+class TestWeightedSample:
+    @staticmethod
+    def projects() -> list[Project]:
+        return [
+            Project.create(
+                title=f"U{u}D{d}", brief="B", spec="S", tech_stack=[], urgency=u, difficulty=d
+            )
+            for u in range(1, 5)
+            for d in range(1, 5)
+        ]
+
+    def test_distinct_and_bounded(self) -> None:
+        projects = self.projects()
+        chosen = weighted_sample(iter(projects), 5)
+        assert len(chosen) == len({p.id for p in chosen}) == 5
+        assert len(weighted_sample(iter(projects), 50)) == 16
+        assert weighted_sample(iter(projects), 0) == []
+        assert weighted_sample(iter([]), 3) == []
+
+    def test_first_pick_matches_priority_score(self) -> None:
+        projects = self.projects()
+        weights = {p.id: p.priority.score() for p in projects}
+        random.seed(99)
+        counts: dict[str, int] = {}
+        for _ in range(20_000):
+            first = weighted_sample(iter(projects), 3)[0].id
+            counts[first] = counts.get(first, 0) + 1
+        # 15 degrees of freedom: 37.70 is the critical value at p = 0.001
+        assert _chi_square(counts, weights) < 37.70
+
+    def test_second_pick_is_drawn_from_the_rest(self) -> None:
+        heavy, light = self.projects()[0], self.projects()[-1]
+        assert (heavy.priority.score(), light.priority.score()) == (8, 2)
+        random.seed(7)
+        pairs = [tuple(p.id for p in weighted_sample([heavy, light], 2)) for _ in range(5000)]
+        # Without replacement, heavy goes first with probability 8/10
+        assert 0.77 < pairs.count((heavy.id, light.id)) / 5000 < 0.83
+
+
+class TestAliasTable:
+    @pytest.mark.parametrize("weights", [[5], [1, 2, 3, 10], [0, 7, 7, 1, 8], [3] * 6])
+    def test_probabilities_are_exact(self, weights: list[int]) -> None:
+        table = AliasTable(weights)
+        n = len(weights)
+        # Column i keeps threshold[i] of its total mass and lends the rest to alias[i]
+        mass = list(table.threshold)
+        for i in range(n):
+            if table.alias[i] != i:
+                mass[table.alias[i]] += table.total - table.threshold[i]
+        assert mass == [w * n for w in weights]
+
+    def test_draw(self) -> None:
+        table = AliasTable([0, 1])
+        assert {table.draw() for _ in range(20)} == {1}
+
+
+def _chi_square(counts: dict[str, int], weights: dict[str, int]) -> float:
+    draws, total = sum(counts.values()), sum(weights.values())
+    return sum(
+        (counts.get(k, 0) - draws * w / total) ** 2 / (draws * w / total)
+        for k, w in weights.items()
+    )
+
+
+class TestSelectionIndex:
+    def test_add_remove(self) -> None:
+        index = SelectionIndex(1, {8: ["a", "b", "c"], 2: ["d"]})
+        index.remove("a")
+        index.remove("missing")
+        index.add("d", 5)
+        assert index.buckets == {8: ["c", "b"], 5: ["d"]}
+        index.remove("b")
+        index.remove("c")
+        assert len(index) == 1
+        assert index.draw() == "d"
+        index.remove("d")
+        assert index.draw() is None
+        assert index.buckets == {}
+
+    def test_round_trip(self) -> None:
+        index = SelectionIndex(7, {4: ["a"], 6: ["b", "c"]}, "2026-01-01T00:00:00Z")
+        restored = SelectionIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+        assert restored.to_dict() == index.to_dict()
+
+    def test_distribution_matches_priority_score(self, tmp_path: Path) -> None:
+        manager = RegistryManager(tmp_path)
+        weights = {}
+        for urgency in range(1, 5):
+            for difficulty in range(1, 5):
+                project = Project.create(
+                    title="P",
+                    brief="B",
+                    spec="S",
+                    tech_stack=[],
+                    urgency=urgency,
+                    difficulty=difficulty,
+                )
+                manager.add(project)
+                weights[project.id] = project.priority.score()
+        index = SelectionCache(manager).index(["idea"], unlocked_only=True)
+        rng = random.Random(1234)
+        counts: dict[str, int] = {}
+        for _ in range(80_000):
+            drawn = index.draw(rng.randrange)
+            counts[drawn] = counts.get(drawn, 0) + 1
+        # 15 degrees of freedom: 37.70 is the critical value at p = 0.001
+        assert _chi_square(counts, weights) < 37.70
+        # A uniform pick is far outside that bound
+        assert _chi_square(dict.fromkeys(weights, 5000), weights) > 37.70
+
+
+class TestSelectionCache:
+    @pytest.fixture(params=["json", "journal", "sqlite", "sharded"])
+    def manager(self, request: pytest.FixtureRequest) -> RegistryManager:
+        with tempfile.TemporaryDirectory() as d:
+            manager = RegistryManager(d)
+            if request.param == "journal":
+                manager.enable_journal()
+            elif request.param != "json":
+                manager.migrate(request.param)
+            for i in range(4):
+                manager.add(
+                    Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[], urgency=i + 1)
+                )
+            yield manager
+            manager.storage.close()
+
+    @pytest.fixture
+    def journaled(self, tmp_path: Path) -> RegistryManager:
+        manager = RegistryManager(tmp_path)
+        manager.enable_journal()
+        for i in range(4):
+            manager.add(
+                Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[], urgency=i + 1)
+            )
+        return manager
+
+    @staticmethod
+    def members(manager: RegistryManager, unlocked_only: bool = True) -> dict[str, int]:
+        index = SelectionCache(manager).index(["idea"], unlocked_only)
+        return {i: score for score, ids in index.buckets.items() for i in ids}
+
+    def test_tracks_changes(self, manager: RegistryManager) -> None:
+        ids = [p.id for p in sorted(manager.list(), key=lambda p: p.title)]
+        assert self.members(manager) == dict(zip(ids, [7, 6, 5, 4], strict=True))
+        manager.lock(ids[0], "worker-1")
+        manager.update(ids[1], status="paused")
+        manager.update(ids[2], priority={"urgency": 1, "difficulty": 1})
+        manager.delete(ids[3])
+        added = manager.add(Project.create(title="New", brief="B", spec="S", tech_stack=[]))
+        assert self.members(manager) == {ids[2]: 8, added.id: 6}
+        assert set(self.members(manager, unlocked_only=False)) == {ids[0], ids[2], added.id}
+        manager.unlock(ids[0])
+        assert self.members(manager) == {ids[0]: 7, ids[2]: 8, added.id: 6}
+
+    def test_unchanged_registry_reads_only_the_index(self, manager: RegistryManager) -> None:
+        self.members(manager)
+        with patch.object(SelectionCache, "_headers", side_effect=AssertionError):
+            assert len(self.members(manager)) == 4
+
+    def test_journal_patches_without_rebuild(self, tmp_path: Path) -> None:
+        manager = RegistryManager(tmp_path)
+        manager.enable_journal()
+        project = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        self.members(manager)
+        manager.lock(project.id, "worker-1")
+        with patch.object(manager.storage, "iter_headers", side_effect=AssertionError):
+            assert self.members(manager) == {}
+            assert self.members(manager, unlocked_only=False) == {project.id: 6}
+        # Compaction drops the records, so the next change forces a rebuild
+        manager.compact()
+        manager.unlock(project.id)
+        assert self.members(manager) == {project.id: 6}
+
+    def test_expires_with_earliest_lease(self, journaled: RegistryManager) -> None:
+        manager = journaled
+        project = manager.list()[0]
+        manager.lock(project.id, "worker-1", ttl=60)
+        index = SelectionCache(manager).index(["idea"], unlocked_only=True)
+        assert len(index) == 3
+        assert index.valid_until == manager.get(project.id).lease_expires_at
+        with patch("selector.utc_timestamp", return_value="9999-01-01T00:00:00Z"):
+            assert project.id in self.members(manager)
+
+    def test_claim_uses_index(self, manager: RegistryManager) -> None:
+        ids = {p.id for p in manager.list()}
+        claimed = {manager.claim([Status.IDEA], f"w{i}").id for i in range(4)}
+        assert claimed == ids
+        assert self.members(manager) == {}
+
+    def test_unreadable_files_are_rebuilt(self, journaled: RegistryManager) -> None:
+        self.members(journaled)
+        for path in (journaled.registry_dir / SELECTION_DIR).iterdir():
+            path.write_text("{")
+        assert len(self.members(journaled)) == 4
+
+    @pytest.mark.parametrize("change", ["migrate", "reshard"])
+    def test_migrate_drops_indexes(self, journaled: RegistryManager, change: str) -> None:
+        self.members(journaled)
+        assert (journaled.registry_dir / SELECTION_DIR).exists()
+        if change == "migrate":
+            journaled.migrate("sqlite")
+        else:
+            journaled.reshard(2)
+        assert not (journaled.registry_dir / SELECTION_DIR).exists()
+        assert len(self.members(journaled)) == 4
+        journaled.storage.close()
+
+    def test_nothing_persisted_without_journal(self, manager: RegistryManager) -> None:
+        ids = [p.id for p in manager.list()]
+        self.members(manager)
+        manager.lock(ids[0], "worker-1")
+        assert len(self.members(manager)) == 3
+        manager.claim([Status.IDEA], "worker-2")
+        assert (manager.registry_dir / SELECTION_DIR).exists() == manager.storage.records_available
+
+    def test_patch_headers(self) -> None:
+        headers = {"a": ["idea", 4, None, None], "b": ["idea", 4, None, None]}
+        put = Project.create(title="C", brief="B", spec="S", tech_stack=[]).to_dict()
+        patch_headers(
+            headers,
+            [
+                {"op": "patch", "id": "a", "fields": {"priority": {"urgency": 1, "difficulty": 1}}},
+                {
+                    "op": "batch",
+                    "records": [
+                        {"op": "delete", "id": "b"},
+                        {"op": "patch", "id": "b", "fields": {"status": "paused"}},
+                        {"op": "put", "project": {**put, "id": "c"}},
+                    ],
+                },
+            ],
+        )
+        assert headers == {"a": ["idea", 8, None, None], "c": ["idea", 6, None, None]}
+
+
 class TestSelect:
     @pytest.fixture
     def temp_dir(self) -> Path:
@@ -169,3 +417,86 @@ class TestSelect:
         with patch("selector.get_registry_dir", return_value=temp_dir):
             result = select([Status.IDEA])
             assert result is None
+
+    def test_select_decodes_only_the_chosen_spec(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        manager.migrate("sqlite")
+        for i in range(5):
+            manager.add(Project.create(title=f"P{i}", brief="B", spec="S" * 10_000, tech_stack=[]))
+        manager.storage.close()
+
+        with (
+            patch("selector.get_registry_dir", return_value=temp_dir),
+            patch("registry.Project.from_dict", wraps=Project.from_dict) as from_dict,
+        ):
+            result = select([Status.IDEA], unlocked_only=True)
+        assert result.spec == "S" * 10_000
+        assert from_dict.call_count == 1
+
+
+class TestSample:
+    def test_streams_refs(self, tmp_path: Path) -> None:
+        manager = RegistryManager(tmp_path)
+        for i in range(6):
+            manager.add(Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[]))
+        manager.lock(manager.list()[0].id, "worker-1")
+        with (
+            patch("selector.get_registry_dir", return_value=tmp_path),
+            patch.object(RegistryManager, "list_refs", side_effect=AssertionError),
+        ):
+            unlocked = sample([Status.IDEA], 10)
+            everything = sample([Status.IDEA], 10, unlocked_only=False)
+        assert len({p.id for p in unlocked}) == 5
+        assert all(p.locked_by is None for p in unlocked)
+        assert len(everything) == 6
+
+
+def _claim_one(registry_dir: str, worker_id: str) -> str | None:
+    with patch("selector.get_registry_dir", return_value=Path(registry_dir)):
+        project = claim([Status.IDEA], worker_id)
+    return project.id if project else None
+
+
+class TestClaim:
+    @pytest.fixture(params=["json", "sqlite", "sharded"])
+    def manager(self, request: pytest.FixtureRequest) -> RegistryManager:
+        with tempfile.TemporaryDirectory() as d:
+            manager = RegistryManager(d)
+            if request.param != "json":
+                manager.migrate(request.param)
+            for i in range(6):
+                manager.add(Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[]))
+            yield manager
+            manager.storage.close()
+
+    def test_claims_locked_project(self, manager: RegistryManager) -> None:
+        project = manager.claim([Status.IDEA], "worker-1")
+        assert project is not None
+        assert project.locked_by == "worker-1"
+        assert project.locked_at is not None
+        stored = manager.get(project.id)
+        assert (stored.locked_by, stored.locked_at) == ("worker-1", project.locked_at)
+
+    def test_never_claims_twice(self, manager: RegistryManager) -> None:
+        claimed = {manager.claim([Status.IDEA], f"w{i}").id for i in range(6)}
+        assert len(claimed) == 6
+        generation = manager.storage.generation()
+        assert manager.claim([Status.IDEA], "w7") is None
+        assert manager.storage.generation() == generation
+
+    def test_respects_status(self, manager: RegistryManager) -> None:
+        assert manager.claim([Status.BLOCKED], "worker-1") is None
+
+    def test_concurrent_workers_get_distinct_projects(self, manager: RegistryManager) -> None:
+        import multiprocessing
+
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(8) as pool:
+            claimed = pool.starmap(
+                _claim_one, [(str(manager.registry_dir), f"w{i}") for i in range(8)]
+            )
+        ids = [c for c in claimed if c is not None]
+        assert len(ids) == len(set(ids)) == 6
+        assert {p.locked_by for p in manager.list()} == {f"w{i}" for i in range(8)} - {
+            f"w{i}" for i, c in enumerate(claimed) if c is None
+        }
@@ -0,0 +1,1158 @@
+"""Tests for storage module - 100% coverage required."""
+
+import json
+import multiprocessing
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import storage as storage_module
+from registry import Project, RegistryManager, Status
+from storage import (
+    BlobStore,
+    GenerationConflict,
+    JsonFileStorage,
+    ProjectIndex,
+    ShardedStorage,
+    SqliteStorage,
+    open_storage,
+    replay_journal,
+)
+
+
+class TestJournal:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    @pytest.fixture
+    def manager(self, temp_dir: Path) -> RegistryManager:
+        manager = RegistryManager(temp_dir)
+        manager.enable_journal()
+        return manager
+
+    def test_disabled_by_default(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        assert manager.journaled is False
+        manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        assert not manager.storage.journal_path.exists()
+
+    def test_mutations_append_instead_of_rewrite(self, manager: RegistryManager) -> None:
+        p = Project.create(title="Journal", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        manager.lock(p.id, "worker-1")
+
+        assert not manager.registry_path.exists()
+        lines = manager.storage.journal_path.read_text().splitlines()
+        assert len(lines) == 2
+        patch = json.loads(lines[1])
+        assert patch["op"] == "patch"
+        assert set(patch["fields"]) == {"locked_by", "locked_at", "lease_expires_at"}
+
+        found = manager.get(p.id)
+        assert found is not None
+        assert found.locked_by == "worker-1"
+
+    def test_replay_on_top_of_snapshot(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        p1 = Project.create(title="P1", brief="B", spec="S", tech_stack=[])
+        p2 = Project.create(title="P2", brief="B", spec="S", tech_stack=[])
+        manager.add(p1)
+        manager.add(p2)
+        manager.enable_journal()
+
+        manager.update(p1.id, status="in_progress", priority={"urgency": 1, "difficulty": 1})
+        manager.delete(p2.id)
+        p3 = Project.create(title="P3", brief="B", spec="S", tech_stack=[])
+        manager.add(p3)
+
+        projects = RegistryManager(temp_dir).list()
+        assert [p.title for p in projects] == ["P1", "P3"]
+        assert projects[0].status == Status.IN_PROGRESS
+        assert projects[0].priority.score() == 8
+
+    def test_unlock_all_by_worker(self, manager: RegistryManager) -> None:
+        p1 = Project.create(title="P1", brief="B", spec="S", tech_stack=[])
+        p2 = Project.create(title="P2", brief="B", spec="S", tech_stack=[])
+        manager.add(p1)
+        manager.add(p2)
+        manager.lock(p1.id, "worker-1")
+        manager.lock(p2.id, "worker-1")
+
+        assert manager.unlock_all_by_worker("worker-1") == 2
+        assert all(p.locked_by is None for p in manager.list())
+
+    def test_compaction_on_record_threshold(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir, JsonFileStorage(temp_dir, journal_max_records=3))
+        manager.enable_journal()
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        manager.lock(p.id, "worker-1")
+        manager.unlock(p.id)
+
+        assert manager.storage.journal_path.stat().st_size == 0
+        snapshot = json.loads(manager.registry_path.read_text())
+        assert snapshot["projects"][0]["id"] == p.id
+        assert snapshot["projects"][0]["locked_by"] is None
+
+    def test_compaction_on_size_threshold(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir, JsonFileStorage(temp_dir, journal_max_bytes=64))
+        manager.enable_journal()
+        p = Project.create(title="P", brief="B", spec="S" * 100, tech_stack=[])
+        manager.add(p)
+
+        assert manager.storage.journal_path.stat().st_size == 0
+        assert manager.get(p.id) is not None
+
+    def test_compact_manually(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        manager.compact()
+
+        assert manager.storage.journal_path.read_bytes() == b""
+        assert manager.journaled is True
+        assert manager.get(p.id) is not None
+
+    def test_compact_without_journal(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        manager.compact()
+        assert not manager.registry_path.exists()
+
+    def test_disable_folds_journal(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        manager.disable_journal()
+
+        assert manager.journaled is False
+        assert manager.get(p.id) is not None
+
+    def test_torn_final_record_ignored(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        with open(manager.storage.journal_path, "ab") as f:
+            f.write(b'{"op": "delete", "id": "')
+
+        assert manager.get(p.id) is not None
+
+    def test_torn_record_cut_before_next_commit(
+        self, manager: RegistryManager, temp_dir: Path
+    ) -> None:
+        p = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        with open(manager.storage.journal_path, "ab") as f:
+            f.write(b'{"op": "delete", "id": "')
+        q = manager.add(Project.create(title="Q", brief="B", spec="S", tech_stack=[]))
+
+        lines = manager.storage.journal_path.read_bytes().splitlines()
+        assert [json.loads(line)["op"] for line in lines] == ["put", "put"]
+        reopened = RegistryManager(temp_dir)
+        assert {x.id for x in reopened.list()} == {p.id, q.id}
+
+    def test_replay_is_idempotent(self) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[]).to_dict()
+        records = [
+            {"op": "put", "project": p},
+            {"op": "patch", "id": p["id"], "fields": {"status": "paused"}},
+            {"op": "patch", "id": "missing", "fields": {"status": "paused"}},
+            {"op": "delete", "id": "missing"},
+        ]
+        once = replay_journal([], records)
+        twice = replay_journal(once, records)
+        assert once == twice
+        assert once[0]["status"] == "paused"
+
+    def test_replay_put_after_delete(self) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[]).to_dict()
+        records = [{"op": "delete", "id": p["id"]}, {"op": "put", "project": p}]
+        assert replay_journal([p], records) == [p]
+
+    def test_replay_unknown_op(self) -> None:
+        with pytest.raises(ValueError, match="Unknown journal op"):
+            replay_journal([], [{"op": "truncate"}])
+
+    def test_save_replaces_snapshot_and_journal(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        manager.storage.save({"version": "1.0.0", "projects": []})
+
+        assert manager.storage.journal_path.read_bytes() == b""
+        assert manager.list() == []
+
+    def test_records_since(self, manager: RegistryManager, temp_dir: Path) -> None:
+        p = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        generation = manager.storage.stored_generation()
+        manager.lock(p.id, "worker-1")
+        records = manager.storage.records_since(generation)
+        assert [(r["op"], r["gen"]) for r in records] == [("patch", generation + 1)]
+        assert manager.storage.records_since(generation + 1) == []
+        manager.compact()
+        assert manager.storage.records_since(generation) is None
+        assert RegistryManager(temp_dir / "plain").storage.records_since(0) is None
+        sqlite = SqliteStorage(temp_dir / "sqlite")
+        assert sqlite.records_since(0) is None
+        assert sqlite.stored_generation() == 0
+        sqlite.close()
+
+    def test_records_since_rereads_after_compaction(self, manager: RegistryManager) -> None:
+        manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        identities = iter([None, ("swapped",), ("swapped",), ("swapped",)])
+        with patch.object(storage_module, "stat_identity", side_effect=lambda _: next(identities)):
+            assert len(manager.storage.records_since(0)) == 1
+
+    def test_json_remove(self, manager: RegistryManager) -> None:
+        manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        manager.compact()
+        manager.storage.remove()
+        manager.storage.close()
+
+        assert not manager.storage.path.exists()
+        assert manager.journaled is False
+
+
+class TestSqliteStorage:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    @pytest.fixture
+    def manager(self, temp_dir: Path) -> RegistryManager:
+        manager = RegistryManager(temp_dir, SqliteStorage(temp_dir))
+        yield manager
+        manager.storage.close()
+
+    def test_wal_mode_and_indexes(self, manager: RegistryManager) -> None:
+        conn = manager.storage._connect()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {r[1] for r in conn.execute("PRAGMA index_list(projects)")}
+        assert {"projects_status", "projects_locked_by"} <= indexes
+
+    def test_crud(self, manager: RegistryManager) -> None:
+        p1 = Project.create(title="P1", brief="B", spec="S", tech_stack=["Go"])
+        p2 = Project.create(title="P2", brief="B", spec="S", tech_stack=[])
+        manager.add(p1)
+        manager.add(p2)
+        manager.update(p1.id, status="in_progress")
+        manager.lock(p2.id, "worker-1")
+
+        assert manager.get(p1.id).status == Status.IN_PROGRESS
+        assert manager.get("missing") is None
+        assert [p.title for p in manager.list()] == ["P1", "P2"]
+        assert [p.title for p in manager.list([Status.IDEA])] == ["P2"]
+        assert manager.list([Status.IDEA], unlocked_only=True) == []
+        assert [p.title for p in manager.list(unlocked_only=True)] == ["P1"]
+
+        assert manager.unlock_all_by_worker("worker-1") == 1
+        assert manager.get(p2.id).locked_by is None
+        assert manager.delete(p2.id) is True
+        assert manager.delete(p2.id) is False
+        assert [p.title for p in manager.list()] == ["P1"]
+
+    def test_put_existing_keeps_order(self, manager: RegistryManager) -> None:
+        p1 = Project.create(title="P1", brief="B", spec="S", tech_stack=[])
+        p2 = Project.create(title="P2", brief="B", spec="S", tech_stack=[])
+        manager.add(p1)
+        manager.add(p2)
+        p1.title = "P1 renamed"
+        manager.add(p1)
+
+        assert [p.title for p in manager.list()] == ["P1 renamed", "P2"]
+
+    def test_patch_missing_is_ignored(self, manager: RegistryManager) -> None:
+        manager.storage.commit([{"op": "patch", "id": "missing", "fields": {"title": "X"}}])
+        assert manager.list() == []
+
+    def test_unknown_op_rolls_back(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        with pytest.raises(ValueError, match="Unknown journal op"):
+            manager.storage.commit([{"op": "put", "project": p.to_dict()}, {"op": "truncate"}])
+        assert manager.list() == []
+
+    def test_save_and_load(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.storage.save({"version": "1.0.0", "projects": [p.to_dict()]})
+
+        data = manager.storage.load()
+        assert data["version"] == "1.0.0"
+        assert data["projects"] == [p.to_dict()]
+
+    def test_load_empty(self, manager: RegistryManager) -> None:
+        assert manager.storage.load() == {"generation": 0, "version": "1.0.0", "projects": []}
+
+    def test_save_failure_rolls_back(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        with pytest.raises(KeyError):
+            manager.storage.save({"projects": [{"id": "broken"}]})
+        assert manager.get(p.id) is not None
+
+    def test_compact_and_remove(self, manager: RegistryManager, temp_dir: Path) -> None:
+        manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        manager.compact()
+        manager.storage.remove()
+
+        assert list(temp_dir.iterdir()) == []
+
+    def test_journal_rejected(self, manager: RegistryManager) -> None:
+        assert manager.journaled is False
+        with pytest.raises(ValueError, match="JSON storage backend"):
+            manager.enable_journal()
+        with pytest.raises(ValueError, match="JSON storage backend"):
+            manager.disable_journal()
+
+
+class TestMigrate:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    def test_open_storage_detects_backend(self, temp_dir: Path) -> None:
+        assert isinstance(open_storage(temp_dir), JsonFileStorage)
+        SqliteStorage(temp_dir).compact()
+        assert isinstance(open_storage(temp_dir), SqliteStorage)
+
+    def test_roundtrip(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        manager.enable_journal()
+        p = Project.create(title="Migrate Me", brief="B", spec="S", tech_stack=["Rust"])
+        manager.add(p)
+        manager.lock(p.id, "worker-1")
+        before = [x.to_dict() for x in manager.list()]
+
+        manager.migrate("sqlite")
+        assert isinstance(manager.storage, SqliteStorage)
+        assert manager.registry_path.name == ".digitus-registry.db"
+        assert not (temp_dir / ".digitus-registry.json").exists()
+        assert not (temp_dir / ".digitus-registry.journal").exists()
+
+        reopened = RegistryManager(temp_dir)
+        assert isinstance(reopened.storage, SqliteStorage)
+        assert [x.to_dict() for x in reopened.list()] == before
+        reopened.storage.close()
+
+        manager.migrate("json")
+        assert isinstance(manager.storage, JsonFileStorage)
+        assert not (temp_dir / ".digitus-registry.db").exists()
+        assert [x.to_dict() for x in RegistryManager(temp_dir).list()] == before
+
+    def test_same_backend_is_noop(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        storage = manager.storage
+        manager.migrate("json")
+        assert manager.storage is storage
+
+    def test_unknown_backend(self, temp_dir: Path) -> None:
+        with pytest.raises(ValueError, match="Unknown storage backend"):
+            RegistryManager(temp_dir).migrate("postgres")
+
+
+class TestSharded:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    @pytest.fixture
+    def manager(self, temp_dir: Path) -> RegistryManager:
+        manager = RegistryManager(temp_dir)
+        manager.reshard(4)
+        return manager
+
+    def _add(self, manager: RegistryManager, count: int) -> list[Project]:
+        return [
+            manager.add(Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[]))
+            for i in range(count)
+        ]
+
+    def _generations(self, manager: RegistryManager) -> list[int]:
+        return [shard.stored_generation() for shard in manager.storage.shards]
+
+    def test_detected_and_partitioned(self, manager: RegistryManager, temp_dir: Path) -> None:
+        projects = self._add(manager, 12)
+        assert isinstance(open_storage(temp_dir), ShardedStorage)
+        assert manager.registry_path == temp_dir / ".digitus-registry.shards"
+        assert not (temp_dir / ".digitus-registry.json").exists()
+        storage = RegistryManager(temp_dir).storage
+        assert len(storage.shards) == 4
+        for p in projects:
+            shard = storage.shards[storage.shard_index(p.id)]
+            assert shard.get(p.id)["title"] == p.title
+        assert sum(len(s.load()["projects"]) for s in storage.shards) == 12
+
+    def test_list_merges_shards(self, manager: RegistryManager) -> None:
+        start = manager.storage.generation()
+        projects = self._add(manager, 6)
+        manager.lock(projects[0].id, "worker-1")
+        manager.update(projects[1].id, status=Status.PAUSED)
+        listed = manager.list()
+        assert sorted(p.id for p in listed) == sorted(p.id for p in projects)
+        assert listed == sorted(listed, key=lambda p: (p.created_at, p.id))
+        assert {p.id for p in manager.list([Status.IDEA], unlocked_only=True)} == {
+            p.id for p in projects[2:]
+        }
+        assert manager.storage.load()["generation"] == start + 8
+
+    def test_point_writes_touch_one_shard(self, manager: RegistryManager) -> None:
+        p = self._add(manager, 1)[0]
+        before = self._generations(manager)
+        manager.lock(p.id, "worker-1")
+        after = self._generations(manager)
+        touched = manager.storage.shard_index(p.id)
+        assert [a - b for a, b in zip(after, before, strict=True)] == [
+            1 if i == touched else 0 for i in range(4)
+        ]
+        assert manager.unlock_all_by_worker("worker-1") == 1
+        assert manager.delete(p.id) is True
+        assert manager.get(p.id) is None
+
+    def test_stale_shard_conflicts_but_others_do_not(self, manager: RegistryManager) -> None:
+        projects = self._add(manager, 8)
+        storage = manager.storage
+        a = projects[0]
+        b = next(p for p in projects if storage.shard_index(p.id) != storage.shard_index(a.id))
+        other = RegistryManager(manager.registry_dir)
+        with storage.view():
+            storage.get(a.id)
+            other.lock(b.id, "worker-2")
+        generation = storage.generation()
+        storage.commit([{"op": "patch", "id": a.id, "fields": {"title": "A"}}], generation)
+        with storage.view():
+            storage.get(a.id)
+            other.lock(a.id, "worker-2")
+        with pytest.raises(GenerationConflict):
+            storage.commit([{"op": "patch", "id": a.id, "fields": {"title": "B"}}], generation)
+        assert manager.get(a.id).title == "A"
+
+    def test_transaction_spans_shards(self, manager: RegistryManager) -> None:
+        projects = self._add(manager, 8)
+        with manager.transaction() as txn:
+            for p in projects:
+                txn.lock(p.id, "worker-1")
+        assert all(p.locked_by == "worker-1" for p in manager.list())
+        with pytest.raises(RuntimeError):
+            with manager.transaction() as txn:
+                txn.delete(projects[0].id)
+                raise RuntimeError("boom")
+        assert len(manager.list()) == 8
+
+    def test_reshard_and_migrate_back(self, manager: RegistryManager, temp_dir: Path) -> None:
+        self._add(manager, 10)
+        before = sorted((p.to_dict() for p in manager.list()), key=lambda d: d["id"])
+        manager.reshard(3)
+        assert len(RegistryManager(temp_dir).storage.shards) == 3
+        assert [p.name for p in temp_dir.iterdir()] == [".digitus-registry.shards"]
+        after = sorted((p.to_dict() for p in manager.list()), key=lambda d: d["id"])
+        assert after == before
+
+        manager.compact()
+        manager.migrate("json")
+        assert not (temp_dir / ".digitus-registry.shards").exists()
+        assert isinstance(RegistryManager(temp_dir).storage, JsonFileStorage)
+        assert sorted(p.id for p in manager.list()) == [d["id"] for d in before]
+
+    def test_failed_reshard_restores_old_shards(
+        self, manager: RegistryManager, temp_dir: Path
+    ) -> None:
+        before = sorted(p.id for p in self._add(manager, 6))
+        rename = Path.rename
+
+        def fail_swap(self: Path, target: Path) -> Path:
+            if self.name == ".digitus-registry.shards" and self.parent != temp_dir:
+                raise OSError("rename failed")
+            return rename(self, target)
+
+        with patch.object(Path, "rename", fail_swap), pytest.raises(OSError, match="rename"):
+            manager.reshard(2)
+        assert [p.name for p in temp_dir.iterdir()] == [".digitus-registry.shards"]
+        reopened = RegistryManager(temp_dir)
+        assert len(reopened.storage.shards) == 4
+        assert sorted(p.id for p in reopened.list()) == before
+
+    def test_first_commit_records_shard_count(self, temp_dir: Path) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        ShardedStorage(temp_dir, shards=3).commit([{"op": "put", "project": p.to_dict()}])
+        storage = open_storage(temp_dir)
+        assert len(storage.shards) == 3
+        assert storage.get(p.id)["title"] == "P"
+
+    def test_reshard_rejects_zero(self, manager: RegistryManager) -> None:
+        with pytest.raises(ValueError, match="at least 1"):
+            manager.reshard(0)
+
+    def test_default_shard_count(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        manager.migrate("sharded")
+        p = self._add(manager, 1)[0]
+        storage = RegistryManager(temp_dir).storage
+        assert len(storage.shards) == ShardedStorage.DEFAULT_SHARDS
+        assert storage.get(p.id)["id"] == p.id
+        storage.close()
+
+
+class TestBlobStore:
+    @pytest.fixture
+    def blobs(self) -> BlobStore:
+        with tempfile.TemporaryDirectory() as d:
+            yield BlobStore(d, min_length=10)
+
+    def test_pack_and_unpack(self, blobs: BlobStore) -> None:
+        data = {"id": "a", "spec": "x" * 20, "brief": "short", "title": "y" * 20}
+        packed = blobs.pack(data, ("spec", "brief"))
+        assert packed["spec"]["length"] == 20
+        assert packed["brief"] == "short"
+        assert packed["title"] == "y" * 20
+        assert blobs.path(packed["spec"]["blob"]).read_text() == "x" * 20
+        assert blobs.unpack(packed, ("spec", "brief")) == data
+
+    def test_untouched_records_are_not_copied(self, blobs: BlobStore) -> None:
+        data = {"spec": "short"}
+        assert blobs.pack(data, ("spec",)) is data
+        assert blobs.unpack(data, ("spec",)) is data
+
+    def test_identical_texts_share_one_blob(self, blobs: BlobStore) -> None:
+        assert blobs.put("é" * 20) == blobs.put("é" * 20)
+        assert len(list(blobs.root.glob("*/*"))) == 1
+        assert blobs.get(blobs.put("é" * 20)) == "é" * 20
+
+    def test_gc_respects_references_and_grace(self, blobs: BlobStore) -> None:
+        import os
+
+        keep = blobs.put("keep" * 5)["blob"]
+        drop = blobs.put("drop" * 5)["blob"]
+        fresh = blobs.put("fresh" * 5)["blob"]
+        for digest in (keep, drop):
+            os.utime(blobs.path(digest), (0, 0))
+        assert blobs.gc({keep}) == 1
+        assert blobs.path(keep).exists()
+        assert not blobs.path(drop).exists()
+        assert blobs.path(fresh).exists()
+        assert blobs.gc({keep}, grace=0) == 1
+
+    def test_put_revives_old_blob(self, blobs: BlobStore) -> None:
+        import os
+
+        digest = blobs.put("again" * 5)["blob"]
+        os.utime(blobs.path(digest), (0, 0))
+        blobs.put("again" * 5)
+        assert blobs.gc(set()) == 0
+
+
+class TestCache:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    @pytest.fixture
+    def manager(self, temp_dir: Path) -> RegistryManager:
+        return RegistryManager(temp_dir, cache=True)
+
+    def test_disabled_by_default(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        manager.list()
+        manager.list()
+        assert (manager.storage.cache_hits, manager.storage.cache_misses) == (0, 0)
+
+    def test_repeated_get_skips_parse(self, temp_dir: Path, manager: RegistryManager) -> None:
+        from unittest.mock import patch
+
+        p = Project.create(title="Cached", brief="B", spec="S", tech_stack=[])
+        RegistryManager(temp_dir).add(p)
+        assert manager.get(p.id) is not None
+        assert manager.storage.cache_misses == 1
+
+        with patch("storage.json.load") as load:
+            for _ in range(10):
+                assert manager.get(p.id).title == "Cached"
+        load.assert_not_called()
+        assert manager.storage.cache_hits == 10
+        assert manager.storage.cache_misses == 1
+
+    def test_external_write_invalidates(self, temp_dir: Path, manager: RegistryManager) -> None:
+        p = Project.create(title="Before", brief="B", spec="S", tech_stack=[])
+        RegistryManager(temp_dir).add(p)
+        assert manager.get(p.id).title == "Before"
+
+        RegistryManager(temp_dir).update(p.id, title="After")
+        assert manager.get(p.id).title == "After"
+        assert manager.storage.cache_misses == 2
+
+    def test_own_write_stays_cached(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        manager.lock(p.id, "worker-1")
+        misses = manager.storage.cache_misses
+
+        assert manager.get(p.id).locked_by == "worker-1"
+        assert manager.storage.cache_misses == misses
+
+    def test_journal_append_invalidates(self, temp_dir: Path, manager: RegistryManager) -> None:
+        manager.enable_journal()
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        assert manager.get(p.id).locked_by is None
+
+        RegistryManager(temp_dir).lock(p.id, "worker-1")
+        assert manager.get(p.id).locked_by == "worker-1"
+
+    def test_missing_file_not_cached(self, manager: RegistryManager) -> None:
+        assert manager.list() == []
+        assert manager.list() == []
+        assert manager.storage.cache_hits == 0
+
+    def test_returned_projects_do_not_alias_cache(self, manager: RegistryManager) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=["Go"])
+        manager.add(p)
+        manager.get(p.id).tech_stack.append("Rust")
+        assert manager.get(p.id).tech_stack == ["Go"]
+
+
+class TestLocking:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    def test_lock_excludes_other_writers(self, temp_dir: Path) -> None:
+        import fcntl
+
+        storage = JsonFileStorage(temp_dir)
+        with storage.locked():
+            with open(storage.lock_path) as f:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with open(storage.lock_path) as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def test_reentrant(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir)
+        with storage.locked():
+            with storage.locked():
+                storage.commit([{"op": "delete", "id": "x"}])
+            assert storage._exclusive is True
+        assert storage._exclusive is False
+
+    def test_load_is_read_once_under_lock(self, temp_dir: Path) -> None:
+        from unittest.mock import patch
+
+        storage = JsonFileStorage(temp_dir)
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        storage.commit([{"op": "put", "project": p.to_dict()}])
+        with patch.object(storage, "_read", wraps=storage._read) as read:
+            with storage.locked():
+                storage.get(p.id)
+                storage.query(["idea"])
+                storage.commit([{"op": "patch", "id": p.id, "fields": {"title": "Q"}}])
+                assert storage.get(p.id)["title"] == "Q"
+        assert read.call_count == 1
+
+    def test_released_on_error(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir)
+        with pytest.raises(RuntimeError):
+            with storage.locked():
+                raise RuntimeError("boom")
+        with storage.locked():
+            assert storage._exclusive is True
+
+    def test_journal_batch_is_one_line(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir)
+        manager.enable_journal()
+        p1 = Project.create(title="P1", brief="B", spec="S", tech_stack=[])
+        p2 = Project.create(title="P2", brief="B", spec="S", tech_stack=[])
+        with manager.transaction() as txn:
+            txn.add(p1)
+            txn.add(p2)
+            txn.lock(p1.id, "worker-1")
+
+        lines = manager.storage.journal_path.read_bytes().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["op"] == "batch"
+        assert manager.get(p1.id).locked_by == "worker-1"
+
+        # A torn batch is dropped entirely
+        with open(manager.storage.journal_path, "ab") as f:
+            f.write(lines[0].replace(b"worker-1", b"worker-2")[:-10])
+        assert manager.get(p1.id).locked_by == "worker-1"
+
+    def test_sqlite_transaction_rolls_back(self, temp_dir: Path) -> None:
+        manager = RegistryManager(temp_dir, SqliteStorage(temp_dir))
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager.add(p)
+        with pytest.raises(RuntimeError):
+            with manager.transaction() as txn:
+                txn.lock(p.id, "worker-1")
+                manager.storage.commit(txn.records)
+                raise RuntimeError("boom")
+        assert manager.get(p.id).locked_by is None
+        manager.storage.close()
+
+
+class TestProjectIndex:
+    def test_put_get_remove(self) -> None:
+        index: ProjectIndex[str] = ProjectIndex()
+        index.put("a", "idea", None, "A")
+        index.put("b", "idea", "w1", "B")
+        assert len(index) == 2
+        assert index.get("b") == "B"
+        assert index.remove("b") is True
+        assert index.remove("b") is False
+        assert index.get("b") is None
+        assert index.find(locked_by="w1") == []
+
+    def test_find_keeps_registry_order(self) -> None:
+        index: ProjectIndex[str] = ProjectIndex()
+        for name in "abc":
+            index.put(name, "idea", None, name)
+        # Moving "a" out of and back into a bucket must not reorder it
+        index.put("a", "paused", "w1", "a")
+        index.put("a", "idea", "w1", "a")
+        assert index.find(["idea"]) == ["a", "b", "c"]
+        assert index.find(["idea"], unlocked_only=True) == ["b", "c"]
+        assert index.find(["paused", "idea"], locked_by="w1") == ["a"]
+        assert index.find(["paused"]) == []
+        assert index.find() == ["a", "b", "c"]
+        assert index.find(locked_by="w2") == []
+
+    def test_expired_leases(self) -> None:
+        index: ProjectIndex[str] = ProjectIndex()
+        index.put("a", "idea", "w1", "A", "2025-01-01T00:00:03Z")
+        index.put("b", "idea", "w1", "B", "2025-01-01T00:00:01Z")
+        index.put("c", "idea", "w1", "C")
+        index.put("d", "idea", None, "D")
+        now = "2025-01-01T00:00:02Z"
+        assert index.expired(now) == ["B"]
+        assert index.expired(now) == ["B"]
+        assert index.find(unlocked_only=True, now=now) == ["B", "D"]
+        # A heartbeat or unlock leaves the old heap entry behind, stale
+        index.put("b", "idea", "w1", "B", "2025-01-01T00:00:09Z")
+        index.put("a", "idea", None, "A")
+        assert index.expired("2025-01-01T00:00:05Z") == []
+        index.put("b", "idea", "w1", "B", "2025-01-01T00:00:09Z")
+        index.remove("c")
+        assert index.expired("2025-01-01T00:00:09Z") == ["B"]
+
+
+class TestLeaseStorage:
+    @pytest.fixture(params=["json", "cached", "sqlite", "sharded"])
+    def storage(self, request: pytest.FixtureRequest):
+        with tempfile.TemporaryDirectory() as d:
+            if request.param == "sqlite":
+                storage = SqliteStorage(d)
+            elif request.param == "sharded":
+                storage = ShardedStorage(d, shards=3)
+            else:
+                storage = JsonFileStorage(d, cache=request.param == "cached")
+            projects = []
+            for i, lease in enumerate(["2000-01-01T00:00:00Z", "2999-01-01T00:00:00Z", None]):
+                p = Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[])
+                p.locked_by, p.lease_expires_at = "w1", lease
+                projects.append(p)
+            free = Project.create(title="Free", brief="B", spec="S", tech_stack=[])
+            projects.append(free)
+            storage.commit([{"op": "put", "project": p.to_dict()} for p in projects])
+            yield storage, [p.id for p in projects]
+            storage.close()
+
+    def test_expired_lock_counts_as_free(self, storage) -> None:
+        storage, ids = storage
+        assert {p["id"] for p in storage.query(unlocked_only=True)} == {ids[0], ids[3]}
+        headers = storage.iter_headers(["idea"], unlocked_only=True)
+        assert {h["id"] for h in headers} == {ids[0], ids[3]}
+
+    def test_expired_leases(self, storage) -> None:
+        storage, ids = storage
+        assert [p["id"] for p in storage.expired_leases()] == [ids[0]]
+        with storage.locked():
+            assert [p["id"] for p in storage.expired_leases()] == [ids[0]]
+        assert storage.expired_leases("1999-01-01T00:00:00Z") == []
+
+    def test_sqlite_adds_lease_column(self, temp_dir: Path) -> None:
+        import sqlite3
+
+        conn = sqlite3.connect(temp_dir / SqliteStorage.FILENAME)
+        conn.execute(
+            "CREATE TABLE projects (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL "
+            "UNIQUE, status TEXT NOT NULL, locked_by TEXT, data TEXT NOT NULL)"
+        )
+        p = Project.create(title="Old", brief="B", spec="S", tech_stack=[])
+        p.locked_by = "w1"
+        data = p.to_dict()
+        del data["lease_expires_at"]
+        conn.execute(
+            "INSERT INTO projects (id, status, locked_by, data) VALUES (?, 'idea', 'w1', ?)",
+            (p.id, json.dumps(data)),
+        )
+        conn.commit()
+        conn.close()
+        storage = SqliteStorage(temp_dir)
+        assert storage.query(unlocked_only=True) == []
+        assert storage.expired_leases() == []
+        storage.close()
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+
+class TestIndexedReads:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    def test_cached_reads_use_index(self, temp_dir: Path) -> None:
+        from unittest.mock import patch
+
+        manager = RegistryManager(temp_dir, cache=True)
+        projects = [
+            manager.add(Project.create(title=f"P{i}", brief="B", spec="S", tech_stack=[]))
+            for i in range(3)
+        ]
+        manager.lock(projects[1].id, "worker-1")
+        with patch("storage.index_projects", wraps=storage_module.index_projects) as build:
+            assert manager.get(projects[2].id).title == "P2"
+            assert [p.title for p in manager.list(unlocked_only=True)] == ["P0", "P2"]
+            assert manager.storage.query(locked_by="worker-1")[0]["id"] == projects[1].id
+        assert build.call_count == 1
+        assert manager.unlock_all_by_worker("worker-1") == 1
+        assert manager.list([Status.IDEA], unlocked_only=True)[1].id == projects[1].id
+
+    def test_uncached_reads_scan(self, temp_dir: Path) -> None:
+        from unittest.mock import patch
+
+        manager = RegistryManager(temp_dir)
+        p = manager.add(Project.create(title="P", brief="B", spec="S", tech_stack=[]))
+        with patch("storage.index_projects") as build:
+            assert manager.get(p.id).title == "P"
+            assert manager.list([Status.IDEA])[0].id == p.id
+            assert manager.storage.query(locked_by="worker-1") == []
+        build.assert_not_called()
+
+
+def _append_stack(registry_dir: str, project_id: str, tag: str, count: int) -> int:
+    manager = RegistryManager(registry_dir, max_retries=1000)
+    for i in range(count):
+        manager._mutate(
+            lambda txn, i=i: txn.update(
+                project_id, tech_stack=[*txn.get(project_id).tech_stack, f"{tag}-{i}"]
+            )
+        )
+    return manager.retries
+
+
+class TestGenerations:
+    @pytest.fixture(params=["json", "journal", "sqlite"])
+    def storage(self, request: pytest.FixtureRequest) -> JsonFileStorage | SqliteStorage:
+        with tempfile.TemporaryDirectory() as d:
+            if request.param == "sqlite":
+                storage = SqliteStorage(d)
+            else:
+                storage = JsonFileStorage(d)
+                if request.param == "journal":
+                    storage.enable_journal()
+            yield storage
+            storage.close()
+
+    def test_commit_bumps_generation(self, storage: JsonFileStorage | SqliteStorage) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        assert storage.generation() == 0
+        assert storage.commit([{"op": "put", "project": p.to_dict()}]) == 1
+        assert storage.commit([{"op": "delete", "id": p.id}], expected_generation=1) == 2
+        assert storage.generation() == 2
+        storage.save(storage.load())
+        assert storage.generation() == 3
+
+    def test_stale_commit_conflicts(self, storage: JsonFileStorage | SqliteStorage) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        storage.commit([{"op": "put", "project": p.to_dict()}])
+        with pytest.raises(GenerationConflict) as exc:
+            storage.commit([{"op": "delete", "id": p.id}], expected_generation=0)
+        assert (exc.value.expected, exc.value.actual) == (0, 1)
+        assert storage.get(p.id) is not None
+
+    def test_compaction_keeps_generation(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir, journal_max_records=2)
+        storage.enable_journal()
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        storage.commit([{"op": "put", "project": p.to_dict()}])
+        storage.commit([{"op": "patch", "id": p.id, "fields": {"title": "Q"}}])
+        assert storage.journal_path.read_bytes() == b""
+        assert storage.generation() == 2
+        assert json.loads(storage.path.read_text())["generation"] == 2
+
+    def test_stale_journal_lines_are_skipped(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir)
+        storage.enable_journal()
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        storage.commit([{"op": "put", "project": p.to_dict()}])
+        storage.commit([{"op": "patch", "id": p.id, "fields": {"title": "Q"}}])
+        journal = storage.journal_path.read_bytes()
+        storage.compact()
+        # A reader that sees the new snapshot before the journal is truncated
+        storage.commit([{"op": "patch", "id": p.id, "fields": {"title": "R"}}])
+        storage.journal_path.write_bytes(journal + storage.journal_path.read_bytes())
+        assert storage.get(p.id)["title"] == "R"
+        assert storage.generation() == 3
+
+    def test_legacy_files_start_at_generation_zero(self, temp_dir: Path) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        (temp_dir / JsonFileStorage.FILENAME).write_text(
+            json.dumps({"version": "1.0.0", "projects": [p.to_dict()]})
+        )
+        (temp_dir / JsonFileStorage.JOURNAL_FILENAME).write_text(
+            json.dumps({"op": "patch", "id": p.id, "fields": {"title": "Q"}}) + "\n"
+        )
+        storage = JsonFileStorage(temp_dir)
+        assert storage.get(p.id)["title"] == "Q"
+        assert storage.commit([{"op": "delete", "id": p.id}], expected_generation=0) == 1
+        assert storage.load()["projects"] == []
+
+    def test_view_pins_one_read(self, storage: JsonFileStorage | SqliteStorage) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        storage.commit([{"op": "put", "project": p.to_dict()}])
+        other = type(storage)(storage.registry_dir)
+        with storage.view():
+            storage.load()
+            other.commit([{"op": "patch", "id": p.id, "fields": {"title": "Q"}}])
+            assert storage.get(p.id)["title"] == "P"
+            assert storage.generation() == 1
+        assert storage.get(p.id)["title"] == "Q"
+        other.close()
+
+    def test_no_writer_lock_inside_view(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir)
+        with storage.view():
+            with pytest.raises(RuntimeError, match="inside a read view"):
+                storage.commit([])
+            with storage.view():
+                pass
+        with storage.locked(), storage.view():
+            assert storage._exclusive is True
+
+    def test_reader_retries_after_compaction_swap(self, temp_dir: Path) -> None:
+        from unittest.mock import patch
+
+        storage = JsonFileStorage(temp_dir)
+        storage.enable_journal()
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        storage.commit([{"op": "put", "project": p.to_dict()}])
+        read_snapshot = storage._read_snapshot
+        calls = []
+
+        def racing_read() -> tuple:
+            result = read_snapshot()
+            if not calls:
+                # Another writer compacts and drops the journal between our two reads
+                JsonFileStorage(temp_dir).disable_journal()
+            calls.append(result)
+            return result
+
+        with patch.object(storage, "_read_snapshot", side_effect=racing_read):
+            data = storage._read()
+        assert len(calls) == 2
+        assert [q["id"] for q in data["projects"]] == [p.id]
+
+    @pytest.mark.parametrize("shards", [0, 2])
+    def test_concurrent_read_modify_write_loses_nothing(self, temp_dir: Path, shards: int) -> None:
+        p = Project.create(title="P", brief="B", spec="S", tech_stack=[])
+        manager = RegistryManager(temp_dir)
+        if shards:
+            manager.reshard(shards)
+        manager.add(p)
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(4) as pool:
+            pool.starmap(_append_stack, [(str(temp_dir), p.id, f"w{n}", 10) for n in range(4)])
+        assert len(RegistryManager(temp_dir).get(p.id).tech_stack) == 40
+
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+
+class TestDurability:
+    @pytest.fixture
+    def temp_dir(self) -> Path:
+        with tempfile.TemporaryDirectory() as d:
+            yield Path(d)
+
+    @pytest.fixture
+    def fsyncs(self):
+        from unittest.mock import patch
+
+        with patch.object(storage_module.os, "fsync", wraps=storage_module.os.fsync) as fsync:
+            yield fsync
+
+    def put(self, storage: JsonFileStorage, title: str = "P") -> int:
+        p = Project.create(title=title, brief="B", spec="S", tech_stack=[])
+        return storage.commit([{"op": "put", "project": p.to_dict()}])
+
+    def test_unknown_mode(self, temp_dir: Path) -> None:
+        with pytest.raises(ValueError, match="Unknown durability mode: always"):
+            JsonFileStorage(temp_dir, durability="always")
+
+    @pytest.mark.parametrize(
+        ("durability", "expected"), [("none", 0), ("file", 1), ("file+dir", 2)]
+    )
+    def test_snapshot_fsyncs(self, temp_dir: Path, fsyncs, durability: str, expected: int) -> None:
+        self.put(JsonFileStorage(temp_dir, durability=durability))
+        assert fsyncs.call_count == expected
+
+    @pytest.mark.parametrize(
+        ("durability", "expected"), [("none", [0, 0]), ("file", [1, 1]), ("file+dir", [3, 2])]
+    )
+    def test_blob_fsyncs(
+        self, temp_dir: Path, fsyncs, durability: str, expected: list[int]
+    ) -> None:
+        import hashlib
+
+        blobs = BlobStore(temp_dir, durability=durability)
+        blobs.put("a" * 300)
+        first = fsyncs.call_count
+        # A blob whose shard directory already exists skips the root fsync
+        text = "b" * 300
+        blobs.path(hashlib.sha256(text.encode()).hexdigest()).parent.mkdir(exist_ok=True)
+        fsyncs.reset_mock()
+        blobs.put(text)
+        assert [first, fsyncs.call_count] == expected
+
+    @pytest.mark.parametrize("durability", ["none", "file"])
+    def test_compaction_syncs_before_truncating(self, temp_dir: Path, durability: str) -> None:
+        from unittest.mock import patch
+
+        storage = JsonFileStorage(temp_dir, durability=durability)
+        storage.enable_journal()
+        self.put(storage)
+        journal_sizes = []
+
+        def record(path: Path) -> None:
+            journal_sizes.append(storage.journal_path.stat().st_size)
+
+        with patch.object(storage_module, "fsync_dir", side_effect=record):
+            storage.compact()
+            storage.save({"version": "1.0.0", "projects": []})
+        assert len(journal_sizes) == 2
+        assert journal_sizes[0] > 0
+        assert storage.journal_path.read_bytes() == b""
+
+    def test_blobs_follow_storage_durability(self, temp_dir: Path) -> None:
+        from registry import Transaction
+
+        manager = RegistryManager(temp_dir, durability="file+dir")
+        assert manager.blobs.durability == "file+dir"
+        assert Transaction(manager.storage).blobs.durability == "file+dir"
+
+    def test_journal_append_syncs_after_unlock(self, temp_dir: Path, fsyncs) -> None:
+        storage = JsonFileStorage(temp_dir, durability="file")
+        storage.enable_journal()
+        with storage.locked():
+            self.put(storage)
+            self.put(storage)
+            assert fsyncs.call_count == 0
+        assert fsyncs.call_count == 1
+        assert storage.sync_path.read_text() == "2"
+        assert storage.syncs == 1
+
+    def test_journal_not_synced_without_durability(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir)
+        storage.enable_journal()
+        self.put(storage)
+        assert not storage.sync_path.exists()
+
+    def test_covered_generation_skips_fsync(self, temp_dir: Path, fsyncs) -> None:
+        storage = JsonFileStorage(temp_dir, durability="file")
+        storage.enable_journal()
+        storage.sync_path.write_text("5")
+        self.put(storage)
+        assert fsyncs.call_count == 0
+        assert storage.shared_syncs == 1
+
+    def test_journal_removed_before_sync(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir, durability="file")
+        storage.enable_journal()
+        with storage.locked():
+            self.put(storage)
+            storage.journal_path.unlink()
+            storage.save({"version": "1.0.0", "projects": []})
+        assert storage.sync_path.read_text() == "1"
+
+    def test_enable_journal_syncs_dir(self, temp_dir: Path, fsyncs) -> None:
+        JsonFileStorage(temp_dir, durability="file+dir").enable_journal()
+        assert fsyncs.call_count == 1
+
+    def test_concurrent_writers_share_fsyncs(self, temp_dir: Path) -> None:
+        import threading
+
+        JsonFileStorage(temp_dir).enable_journal()
+        writers = [
+            JsonFileStorage(temp_dir, durability="file", group_commit_window=0.05) for _ in range(8)
+        ]
+        barrier = threading.Barrier(len(writers))
+
+        def write(storage: JsonFileStorage) -> None:
+            barrier.wait()
+            self.put(storage)
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in writers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        syncs = sum(w.syncs for w in writers)
+        assert syncs + sum(w.shared_syncs for w in writers) == len(writers)
+        assert syncs < len(writers)
+        assert writers[0].sync_path.read_text() == "8"
+        assert len(JsonFileStorage(temp_dir).load()["projects"]) == 8
+
+    @pytest.mark.parametrize(("durability", "level"), [("none", 1), ("file", 2), ("file+dir", 3)])
+    def test_sqlite_synchronous(self, temp_dir: Path, durability: str, level: int) -> None:
+        storage = SqliteStorage(temp_dir, durability)
+        assert storage._connect().execute("PRAGMA synchronous").fetchone()[0] == level
+        storage.close()
+
+    def test_sharded_passes_settings(self, temp_dir: Path) -> None:
+        (temp_dir / ShardedStorage.FILENAME).mkdir()
+        storage = open_storage(temp_dir, durability="file", group_commit_window=0.01)
+        assert isinstance(storage, ShardedStorage)
+        assert {(s.durability, s.group_commit_window) for s in storage.shards} == {("file", 0.01)}
+
+    def test_json_remove_drops_marker(self, temp_dir: Path) -> None:
+        storage = JsonFileStorage(temp_dir, durability="file")
+        storage.enable_journal()
+        self.put(storage)
+        storage.remove()
+        assert not storage.sync_path.exists()
+
+    def test_manager_reads_config(self, temp_dir: Path, tmp_path: Path) -> None:
+        from unittest.mock import patch
+
+        (tmp_path / ".claude").mkdir()
+        (tmp_path / ".claude" / "digitus-Dei.local.md").write_text(
+            "---\nregistry_dir: /x\ndurability: file+dir\ngroup_commit_ms: 2\n---\n"
+        )
+        with patch.object(Path, "home", return_value=tmp_path):
+            manager = RegistryManager(temp_dir)
+        assert manager.storage.durability == "file+dir"
+        assert manager.storage.group_commit_window == 0.002
+
+        manager.migrate("sqlite")
+        assert manager.storage.durability == "file+dir"
+        manager.reshard(2)
+        assert manager.storage.shards[0].durability == "file+dir"
+        assert manager.storage.shards[0].group_commit_window == 0.002
+
+    def test_manager_defaults(self, temp_dir: Path, tmp_path: Path) -> None:
+        from unittest.mock import patch
+
+        with patch.object(Path, "home", return_value=tmp_path):
+            manager = RegistryManager(temp_dir)
+        assert (manager.storage.durability, manager.storage.group_commit_window) == ("none", 0)
+        assert RegistryManager(temp_dir, durability="file", group_commit_ms=1).durability == "file"
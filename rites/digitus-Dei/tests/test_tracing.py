@@ -0,0 +1,82 @@
+"""Tests for tracing module - 100% coverage required."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from tracing import TRACE_ENV, format_summary, span, summarize, trace_file
+
+
+@pytest.fixture
+def trace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setenv(TRACE_ENV, str(path))
+    return path
+
+
+def records(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestSpan:
+    def test_disabled_is_shared_noop(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(TRACE_ENV, raising=False)
+        assert trace_file() is None
+        with span("a", size=1) as s:
+            s.set(size=2)
+        assert span("a") is span("b")
+
+    def test_empty_env_is_disabled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv(TRACE_ENV, "")
+        assert trace_file() is None
+
+    def test_records_duration_and_attrs(self, trace: Path) -> None:
+        with span("json.parse", bytes=10) as s:
+            s.set(records=3)
+        with span("json.parse"):
+            pass
+        first, second = records(trace)
+        assert first["span"] == "json.parse"
+        assert first["bytes"] == 10 and first["records"] == 3
+        assert first["ms"] >= 0 and isinstance(first["pid"], int)
+        assert "error" not in first and "bytes" not in second
+
+    def test_records_error(self, trace: Path) -> None:
+        with pytest.raises(KeyError), span("lock.wait"):
+            raise KeyError("x")
+        assert records(trace)[0]["error"] == "KeyError"
+
+
+class TestSummarize:
+    LINES = [
+        *(json.dumps({"span": "fast", "ms": float(i)}) + "\n" for i in range(1, 101)),
+        "\n",
+        json.dumps({"span": "slow", "ms": 500.0, "bytes": 3}),
+    ]
+
+    def test_percentiles(self) -> None:
+        summary = summarize(self.LINES)
+        assert list(summary) == ["fast", "slow"]
+        fast = summary["fast"]
+        assert fast["count"] == 100
+        assert fast["total_ms"] == 5050.0
+        assert fast["p50_ms"] == 50.5
+        assert fast["p90_ms"] == 91.0
+        assert fast["p99_ms"] == 100.0
+        assert fast["max_ms"] == 100.0
+        assert summary["slow"]["p99_ms"] == 500.0
+
+    def test_format(self) -> None:
+        text = format_summary(summarize(self.LINES))
+        header, fast, slow = text.splitlines()
+        assert header.split() == ["span", "count", "total", "p50", "p90", "p99", "max"]
+        assert fast.split()[:2] == ["fast", "100"]
+        assert slow.split()[0] == "slow"
+
+    def test_empty(self) -> None:
+        assert summarize([]) == {}
+        assert len(format_summary({}).splitlines()) == 1